@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
 
-from app.auth import authenticate_user, create_access_token, get_current_user, register_user
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.auth import authenticate_user, create_access_token, get_admin_user, get_current_user, register_user
 from app.models.schemas import (
     CompetitorSnapshot,
+    IdeaAnalysis,
     IdeaGenerationResponse,
     IdeaInput,
     LoginRequest,
@@ -13,21 +17,65 @@ from app.models.schemas import (
     RefinedIdea,
     RegisterRequest,
     RiskOpportunity,
+    StartupIngestRequest,
+    StartupIngestResult,
     TokenResponse,
     ValidationScore,
     ValidationRequest,
 )
-from app.services.competitor_analysis import competitor_snapshot
-from app.services.idea_generator import generate_refined_ideas
+from app.services.competitor_analysis import competitor_snapshot, competitor_snapshots, get_index
+from app.services.embedding_cache import get_embedding_cache
+from app.services.idea_analyzer import analyze_idea
+from app.services.idea_generator import generate_refined_ideas, stream_refined_ideas
+from app.services.llm_cache import get_llm_cache
+from app.services.llm_gateway import get_llm_gateway, llm_enabled
 from app.services.market_insights import generate_market_insight
-from app.services.partner_matcher import matcher
+from app.services.partner_matcher import get_matcher
+from app.services.profile_embeddings import profile_embedding_fields
+from app.services.resource_registry import registry
 from app.services.portfolio_builder import build_portfolio
 from app.services.risk_opportunity import assess_risks
+from app.services.semantic_cache import get_semantic_cache
+from app.services.startup_ingest import ingest_startups
 from app.services.validation_scorer import score_validation
 
 
 router = APIRouter(prefix="/api")
 
+CHAT_SYSTEM_PROMPT = """You are BizBloom AI Assistant, a helpful chatbot for a startup validation platform called BizBloom AI.
+
+Platform Features:
+1. AI Idea Refinement - Generates 3 polished startup ideas from raw input
+2. Market Insights - Industry classification, trends, customer segments
+3. Competitor Analysis - NLP-based similarity search across startup database
+4. Risk Assessment - Opportunities, risks, mitigation strategies
+5. Validation Score - Feasibility, novelty, market readiness ratings
+6. Partner Matching - Find co-founders based on skills and interests
+7. AI Chatbot (You!) - Help users navigate and understand the platform
+
+Navigation:
+- Dashboard: Main workspace for idea generation and analysis
+- Profile: Set interests, skills, business focus
+- Portfolio: View saved ideas and analyses
+
+How the platform works:
+1. User logs in/registers
+2. Selects an industry (EdTech, FinTech, HealthTech, AI/ML, SaaS, E-commerce, FoodTech, Developer Tools, Productivity, Communication)
+3. Describes their startup idea
+4. Clicks "Generate AI Ideas" to get 3 refined versions
+5. Selects one idea to see full analysis (Market, Competitors, Risks, Scores, Partners)
+
+Be concise, friendly, and helpful. Use bullet points and emojis. Answer based on the platform context above."""
+
+MAX_BATCH_IDEAS = 100
+MAX_COMPETITORS = 20
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 
 @router.post("/auth/register", response_model=TokenResponse)
 def register(payload: RegisterRequest):
@@ -67,7 +115,8 @@ def update_profile(payload: dict, user=Depends(get_current_user)):
     if is_supabase_configured():
         client = get_supabase()
         client.table("users").update({
-            "profile": profile_data
+            "profile": profile_data,
+            **profile_embedding_fields(profile_data),
         }).eq("id", user["id"]).execute()
     
     # Update in-memory user
@@ -81,14 +130,56 @@ def ideas_generate(payload: IdeaInput):
     return IdeaGenerationResponse(ideas=ideas)
 
 
+@router.post("/ideas/generate/stream")
+async def ideas_generate_stream(payload: IdeaInput):
+    """Server-sent events: one `idea` event per RefinedIdea as it completes, then `done`."""
+
+    async def events():
+        count = 0
+        async for idea in stream_refined_ideas(payload.idea):
+            yield _sse("idea", {"index": count, "idea": idea.model_dump()})
+            count += 1
+        yield _sse("done", {"count": count})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/startups/ingest", response_model=StartupIngestResult)
+def startups_ingest(payload: StartupIngestRequest, user=Depends(get_admin_user)):
+    """Append and delete competitor startups without rebuilding the index (ADMIN_EMAILS only)."""
+    result = ingest_startups([s.model_dump() for s in payload.add], payload.delete)
+    # Swap this worker's snapshot now; other workers pick it up on their next refresh check
+    get_index().refresh_async()
+    return result
+
+
 @router.post("/ideas/insights", response_model=MarketInsight)
 def ideas_insights(idea: RefinedIdea):
     return generate_market_insight(idea)
 
 
 @router.post("/ideas/competitors", response_model=CompetitorSnapshot)
-def ideas_competitors(idea: RefinedIdea):
-    return competitor_snapshot(idea)
+def ideas_competitors(
+    idea: RefinedIdea,
+    category: str | None = None,
+    funding: str | None = None,
+    k: int = Query(2, ge=1, le=MAX_COMPETITORS),
+):
+    """Nearest competitors, optionally only within a category and/or funding stage."""
+    return competitor_snapshot(idea, k, category, funding)
+
+
+@router.post("/ideas/competitors/batch", response_model=list[CompetitorSnapshot])
+def ideas_competitors_batch(
+    ideas: list[RefinedIdea],
+    category: str | None = None,
+    funding: str | None = None,
+    k: int = Query(2, ge=1, le=MAX_COMPETITORS),
+):
+    """Competitor snapshots for several ideas from one batched index search."""
+    if len(ideas) > MAX_BATCH_IDEAS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDEAS} ideas per batch")
+    return competitor_snapshots(ideas, k, category, funding)
 
 
 @router.post("/ideas/assessment", response_model=RiskOpportunity)
@@ -101,6 +192,12 @@ def ideas_validate(payload: ValidationRequest):
     return score_validation(payload.market, payload.competitors)
 
 
+@router.post("/ideas/analyze", response_model=IdeaAnalysis)
+def ideas_analyze(idea: RefinedIdea):
+    """Market, competitors, risks and validation in one round-trip (one LLM call)."""
+    return analyze_idea(idea)
+
+
 @router.post("/ideas/summary")
 def ideas_summary(portfolio_req: PortfolioRequest):
     # Render only summary (HTML)
@@ -120,7 +217,7 @@ def ideas_summary(portfolio_req: PortfolioRequest):
 @router.get("/partners/suggest", response_model=list[PartnerProfile])
 def partners_suggest(user=Depends(get_current_user)):
     profile = user.get("profile") or {}
-    return matcher.suggest(profile, limit=3)
+    return get_matcher().suggest(profile, limit=3)
 
 
 @router.post("/portfolio/build", response_model=Portfolio)
@@ -128,90 +225,109 @@ def portfolio_build(payload: IdeaInput, user=Depends(get_current_user)):
     profile = user.get("profile") or {}
     return build_portfolio(profile, payload.idea)
 
+@router.get("/health/live")
+def health_live():
+    """Process is up and serving; does not wait for models or indexes."""
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+def health_ready():
+    """503 until required resources (embeddings, FAISS index, LLM gateway) are loaded."""
+    ready = registry.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "starting", "resources": registry.status()},
+    )
+
+
+@router.get("/metrics")
+def metrics():
+    """Cache counters for tuning encoder and LLM spend."""
+    return {
+        "embedding_cache": get_embedding_cache().stats(),
+        "llm_cache": get_llm_cache().stats(),
+        "semantic_cache": get_semantic_cache().stats(),
+    }
+
+
 @router.post("/chat")
-def chat(payload: dict):
+async def chat(payload: dict):
     """AI Chatbot endpoint for user assistance."""
-    from openai import OpenAI
-    from app.config import settings
-    
     message = payload.get("message", "").lower()
     
     # Try OpenRouter API first
-    api_key = settings.openrouter_api_key
-    if api_key and len(api_key) > 20:
+    if llm_enabled():
         try:
-            client = OpenAI(
-                base_url=settings.openrouter_base_url,
-                api_key=api_key,
-            )
-            
-            system_prompt = """You are BizBloom AI Assistant, a helpful chatbot for a startup validation platform called BizBloom AI.
-
-Platform Features:
-1. AI Idea Refinement - Generates 3 polished startup ideas from raw input
-2. Market Insights - Industry classification, trends, customer segments
-3. Competitor Analysis - NLP-based similarity search across startup database
-4. Risk Assessment - Opportunities, risks, mitigation strategies
-5. Validation Score - Feasibility, novelty, market readiness ratings
-6. Partner Matching - Find co-founders based on skills and interests
-7. AI Chatbot (You!) - Help users navigate and understand the platform
-
-Navigation:
-- Dashboard: Main workspace for idea generation and analysis
-- Profile: Set interests, skills, business focus
-- Portfolio: View saved ideas and analyses
-
-How the platform works:
-1. User logs in/registers
-2. Selects an industry (EdTech, FinTech, HealthTech, AI/ML, SaaS, E-commerce, FoodTech, Developer Tools, Productivity, Communication)
-3. Describes their startup idea
-4. Clicks "Generate AI Ideas" to get 3 refined versions
-5. Selects one idea to see full analysis (Market, Competitors, Risks, Scores, Partners)
-
-Be concise, friendly, and helpful. Use bullet points and emojis. Answer based on the platform context above."""
-
-            response = client.chat.completions.create(
-                model=settings.openrouter_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": payload.get("message", "")}
-                ],
+            content = await get_llm_gateway().acomplete(
+                messages=_chat_messages(payload.get("message", "")),
                 max_tokens=400,
                 temperature=0.7,
             )
             
-            content = response.choices[0].message.content
             if content:
                 return {"response": content}
         except Exception as e:
             print(f"[WARN] Chat API error: {e}")
     
-    # Intelligent fallback based on keywords
+    return {"response": _chat_fallback(message)}
+
+
+@router.post("/chat/stream")
+async def chat_stream(payload: dict):
+    """Chat over server-sent events: one `token` event per delta, then `done`."""
+    text = payload.get("message", "")
+
+    async def events():
+        sent = False
+        if llm_enabled():
+            try:
+                async for delta in get_llm_gateway().astream(_chat_messages(text), max_tokens=400, temperature=0.7):
+                    sent = True
+                    yield _sse("token", {"delta": delta})
+            except Exception as e:
+                print(f"[WARN] Chat stream error: {e}")
+        if not sent:
+            yield _sse("token", {"delta": _chat_fallback(text.lower())})
+        yield _sse("done", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _chat_messages(message: str) -> list[dict]:
+    return [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "user", "content": message}
+    ]
+
+
+def _chat_fallback(message: str) -> str:
+    """Intelligent fallback based on keywords."""
     if "start" in message or "begin" in message or "how do i" in message:
-        return {"response": "🚀 **Getting Started:**\n\n1. **Login/Register** on the homepage\n2. Go to **Dashboard**\n3. **Select your industry** (EdTech, FinTech, etc.)\n4. **Describe your idea** in 2-3 sentences\n5. Click **Generate AI Ideas**\n6. Select one to see full analysis!"}
+        return "🚀 **Getting Started:**\n\n1. **Login/Register** on the homepage\n2. Go to **Dashboard**\n3. **Select your industry** (EdTech, FinTech, etc.)\n4. **Describe your idea** in 2-3 sentences\n5. Click **Generate AI Ideas**\n6. Select one to see full analysis!"
     
     if "feature" in message or "what can" in message or "offer" in message:
-        return {"response": "✨ **BizBloom AI Features:**\n\n1. **AI Idea Refinement** - Get 3 polished versions\n2. **Market Insights** - Industry trends & segments\n3. **Competitor Analysis** - Find similar startups\n4. **Risk Assessment** - Opportunities & mitigation\n5. **Validation Score** - Feasibility & novelty ratings\n6. **Partner Matching** - Find co-founders\n7. **AI Assistant** - That's me! 😊"}
+        return "✨ **BizBloom AI Features:**\n\n1. **AI Idea Refinement** - Get 3 polished versions\n2. **Market Insights** - Industry trends & segments\n3. **Competitor Analysis** - Find similar startups\n4. **Risk Assessment** - Opportunities & mitigation\n5. **Validation Score** - Feasibility & novelty ratings\n6. **Partner Matching** - Find co-founders\n7. **AI Assistant** - That's me! 😊"
     
     if "risk" in message or "opportunity" in message:
-        return {"response": "⚡ **Risk Assessment:**\n\nAfter generating ideas:\n1. Click on an idea to analyze it\n2. Go to the **Risks & Opportunities** tab\n3. You'll see:\n   - Growth opportunities\n   - Potential risks\n   - Mitigation strategies\n   - Implementation roadmap"}
+        return "⚡ **Risk Assessment:**\n\nAfter generating ideas:\n1. Click on an idea to analyze it\n2. Go to the **Risks & Opportunities** tab\n3. You'll see:\n   - Growth opportunities\n   - Potential risks\n   - Mitigation strategies\n   - Implementation roadmap"
     
     if "partner" in message or "co-founder" in message or "cofounder" in message:
-        return {"response": "🤝 **Finding Partners:**\n\n1. Complete your **Profile** (interests & skills)\n2. Generate and analyze an idea\n3. Go to the **Partners** tab\n4. See matched co-founders with:\n   - Match score based on NLP\n   - Skills & expertise\n   - LinkedIn profiles to connect!"}
+        return "🤝 **Finding Partners:**\n\n1. Complete your **Profile** (interests & skills)\n2. Generate and analyze an idea\n3. Go to the **Partners** tab\n4. See matched co-founders with:\n   - Match score based on NLP\n   - Skills & expertise\n   - LinkedIn profiles to connect!"
     
     if "competitor" in message or "competition" in message:
-        return {"response": "🏆 **Competitor Analysis:**\n\nWe use **NLP + FAISS** to find similar startups:\n1. Your idea is embedded using AI\n2. We search our database of 40+ startups\n3. Top matches are shown with:\n   - Similarity score\n   - Description\n   - Market gap opportunities"}
+        return "🏆 **Competitor Analysis:**\n\nWe use **NLP + FAISS** to find similar startups:\n1. Your idea is embedded using AI\n2. We search our database of 40+ startups\n3. Top matches are shown with:\n   - Similarity score\n   - Description\n   - Market gap opportunities"
     
     if "score" in message or "validation" in message or "feasibility" in message:
-        return {"response": "📈 **Validation Scoring:**\n\nWe provide 3 scores:\n- **Feasibility** (0-100): Can you build this?\n- **Novelty** (0-100): How unique is it?\n- **Market Readiness**: High/Medium/Low\n\nEach score includes AI-generated reasoning."}
+        return "📈 **Validation Scoring:**\n\nWe provide 3 scores:\n- **Feasibility** (0-100): Can you build this?\n- **Novelty** (0-100): How unique is it?\n- **Market Readiness**: High/Medium/Low\n\nEach score includes AI-generated reasoning."
     
     if "market" in message or "trend" in message or "industry" in message:
-        return {"response": "📊 **Market Insights:**\n\nWe analyze:\n- **Industry classification** using AI\n- **Top market trends** from our dataset\n- **Customer segments** you should target\n\nThis helps you understand your market positioning!"}
+        return "📊 **Market Insights:**\n\nWe analyze:\n- **Industry classification** using AI\n- **Top market trends** from our dataset\n- **Customer segments** you should target\n\nThis helps you understand your market positioning!"
     
     if "dashboard" in message or "navigate" in message or "where" in message:
-        return {"response": "🧭 **Navigation Guide:**\n\n- **Dashboard** - Generate & analyze ideas\n- **Profile** - Set your interests & skills\n- **Portfolio** - View saved analyses\n\nStart at Dashboard → Select Industry → Enter Idea → Generate!"}
+        return "🧭 **Navigation Guide:**\n\n- **Dashboard** - Generate & analyze ideas\n- **Profile** - Set your interests & skills\n- **Portfolio** - View saved analyses\n\nStart at Dashboard → Select Industry → Enter Idea → Generate!"
     
     if "hello" in message or "hi" in message or "hey" in message:
-        return {"response": "👋 Hello! I'm BizBloom AI Assistant.\n\nI can help you:\n• Navigate the platform\n• Explain features\n• Give startup advice\n\nTry asking: 'How do I start?' or 'What features do you offer?'"}
+        return "👋 Hello! I'm BizBloom AI Assistant.\n\nI can help you:\n• Navigate the platform\n• Explain features\n• Give startup advice\n\nTry asking: 'How do I start?' or 'What features do you offer?'"
     
-    return {"response": "I'm here to help! You can ask me about:\n\n• **Getting started** with the platform\n• **Features** like market insights, competitor analysis\n• **Risk assessment** and mitigation\n• **Finding co-founders**\n• **Navigation** help\n\nWhat would you like to know?"}
+    return "I'm here to help! You can ask me about:\n\n• **Getting started** with the platform\n• **Features** like market insights, competitor analysis\n• **Risk assessment** and mitigation\n• **Finding co-founders**\n• **Navigation** help\n\nWhat would you like to know?"
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+import threading
 import uuid
 
 import jwt
@@ -9,6 +10,7 @@ from passlib.context import CryptContext
 
 from app.config import settings
 from app.database import get_supabase, is_supabase_configured
+from app.services.profile_embeddings import profile_embedding_fields
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -23,15 +25,26 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
-# In-memory demo users for when Supabase is not configured
-_demo_users: dict = {
-    "demo@bizbloom.ai": {
-        "id": "demo-user-id",
-        "email": "demo@bizbloom.ai",
-        "hashed_password": hash_password("demo123"),
-        "profile": {"name": "Demo User"},
-    }
-}
+# In-memory demo users for when Supabase is not configured. Built on first use
+# so importing this module does not pay for a bcrypt hash.
+_demo_users: dict | None = None
+_demo_users_lock = threading.Lock()
+
+
+def _get_demo_users() -> dict:
+    global _demo_users
+    if _demo_users is None:
+        with _demo_users_lock:
+            if _demo_users is None:
+                _demo_users = {
+                    "demo@bizbloom.ai": {
+                        "id": "demo-user-id",
+                        "email": "demo@bizbloom.ai",
+                        "hashed_password": hash_password("demo123"),
+                        "profile": {"name": "Demo User"},
+                    }
+                }
+    return _demo_users
 
 
 def verify_password(password: str, hashed: str) -> bool:
@@ -48,7 +61,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 def register_user(email: str, password: str, profile: dict | None = None) -> dict:
     if not is_supabase_configured():
         # Demo mode: store in memory
-        if email in _demo_users:
+        demo_users = _get_demo_users()
+        if email in demo_users:
             raise HTTPException(status_code=400, detail="User already exists")
         user_id = str(uuid.uuid4())
         hashed = hash_password(password)
@@ -58,7 +72,7 @@ def register_user(email: str, password: str, profile: dict | None = None) -> dic
             "hashed_password": hashed,
             "profile": profile or {},
         }
-        _demo_users[email] = user
+        demo_users[email] = user
         return user
 
     client = get_supabase()
@@ -69,6 +83,7 @@ def register_user(email: str, password: str, profile: dict | None = None) -> dic
     profile = profile or {}
     result = client.table("users").insert(
         {"email": email, "hashed_password": hashed, "profile": profile}
+        | profile_embedding_fields(profile)
     ).execute()
     return result.data[0]
 
@@ -76,7 +91,7 @@ def register_user(email: str, password: str, profile: dict | None = None) -> dic
 def authenticate_user(email: str, password: str) -> dict:
     if not is_supabase_configured():
         # Demo mode: check in-memory
-        user = _demo_users.get(email)
+        user = _get_demo_users().get(email)
         if not user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
         if not verify_password(password, user.get("hashed_password", "")):
@@ -104,7 +119,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 
     if not is_supabase_configured():
         # Demo mode: find user by email in memory
-        user = _demo_users.get(email)
+        user = _get_demo_users().get(email)
         if not user or user.get("id") != user_id:
             raise HTTPException(status_code=401, detail="User not found")
         return user
@@ -118,3 +133,10 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         raise HTTPException(status_code=401, detail="Token mismatch")
     return user
 
+
+def get_admin_user(user: dict = Depends(get_current_user)) -> dict:
+    """Authenticated user whose email is listed in ADMIN_EMAILS."""
+    admins = {e.strip().lower() for e in settings.admin_emails.split(",") if e.strip()}
+    if (user.get("email") or "").lower() not in admins:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
@@ -8,13 +8,47 @@ class Settings(BaseSettings):
     openrouter_api_key: str = ""
     openrouter_model: str = "mistralai/mistral-7b-instruct:free"
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
+
+    # Shared LLM gateway: connection pool, timeouts and concurrency cap
+    llm_timeout_seconds: float = 30.0
+    llm_connect_timeout_seconds: float = 5.0
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_seconds: float = 60.0
+    llm_max_concurrency: int = 8
+    llm_max_retries: int = 1
+
+    # Exact-match LLM response cache (memory LRU + SQLite, both with TTL)
+    llm_cache_size: int = 512
+    llm_cache_ttl_seconds: float = 86400.0
+    llm_cache_persist: bool = True
+    llm_cache_path: str = ""
+    llm_cache_ideas: bool = True
+    llm_cache_market: bool = True
+    llm_cache_risks: bool = True
+    llm_cache_validation: bool = True
+    llm_cache_analysis: bool = True
+
+    # Semantic near-duplicate cache for /ideas/generate (cosine similarity)
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.9
+    semantic_cache_max_entries: int = 1000
+
+    # Portfolio pipeline: worker threads and per-stage timeouts
+    portfolio_max_workers: int = 8
+    portfolio_llm_stage_timeout_seconds: float = 45.0
+    portfolio_local_stage_timeout_seconds: float = 15.0
     
     # Supabase (optional)
     supabase_url: str = ""
     supabase_key: str = ""
+    # Supabase partner matching: seconds before stored profile embeddings are reloaded
+    partner_profile_refresh_seconds: float = 60.0
     
     # JWT for auth
     jwt_secret: str = "change-me"
+    # Comma-separated emails allowed to call admin routes (startup ingestion); empty = nobody
+    admin_emails: str = ""
     
     # Frontend URL for CORS
     frontend_url: str = "http://localhost:5173"
@@ -23,8 +57,54 @@ class Settings(BaseSettings):
     dataset_dir: str = "../datasets"
     processed_dir: str = "../datasets/processed"
     
+    # Competitor ANN index: type/training are used when the dataset scripts build
+    # startup_index.faiss (flat, ivf_flat, ivf_pq, hnsw); nprobe/ef apply at query time
+    competitor_index_type: str = "flat"
+    competitor_index_nlist: int = 0
+    competitor_index_pq_m: int = 48
+    competitor_index_hnsw_m: int = 32
+    competitor_index_hnsw_ef_construction: int = 200
+    competitor_index_train_size: int = 100000
+    competitor_search_nprobe: int = 16
+    competitor_search_ef: int = 64
+    # Fetch k * factor candidates and re-score them exactly against the memory-mapped
+    # startup_vectors.f32 (use with compressed types fp16 / sq8 / pq); 0 or 1 = off
+    competitor_rerank_factor: int = 0
+    # Filtered searches (category / funding) over at most this many startups are scored
+    # exactly against startup_vectors.f32; larger partitions use a FAISS id selector
+    competitor_filter_exact_max: int = 5000
+    # Hybrid search: fuse the top candidates of the dense index and the BM25 keyword index
+    # (startup_lexical.bm25) by reciprocal-rank fusion; postings read per query term are capped
+    competitor_lexical: bool = True
+    competitor_lexical_candidates: int = 20
+    competitor_lexical_max_postings: int = 10000
+    competitor_rrf_k: int = 60
+    # Memory-map startup_index.faiss read-only so workers share one copy in the page cache
+    competitor_index_mmap: bool = True
+    # Seconds between checks for ingested startups (index/log file changes)
+    competitor_refresh_seconds: float = 5.0
+    
+    # Load models, indexes and the LLM gateway in the background right after startup
+    warmup_on_startup: bool = True
+    
     # Embedding model (runs locally, no API needed)
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # Micro-batching for the shared embedding service
+    embedding_max_batch_size: int = 32
+    embedding_max_wait_ms: float = 5.0
+    # Encoder backend: "torch" (SentenceTransformer) or "onnx" (onnxruntime over the
+    # export from scripts/export_onnx_encoder.py; dir defaults under processed_dir)
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: str = ""
+    embedding_onnx_quantized: bool = True
+    embedding_onnx_threads: int = 0
+    # Embedding cache: in-memory LRU + optional SQLite tier (defaults under processed_dir)
+    embedding_cache_size: int = 10000
+    embedding_cache_persist: bool = True
+    embedding_cache_path: str = ""
+    # Nearest-centroid industry classifier (category_centroids.npz under processed_dir)
+    industry_centroid_enabled: bool = True
+    industry_centroid_min_confidence: float = 0.6
 
 
 settings = Settings()
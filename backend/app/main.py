@@ -1,12 +1,24 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router
 from app.config import settings
+from app.services.llm_cache import reset_cache_bypass, set_cache_bypass, wants_cache_bypass
+from app.services.resource_registry import registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Models and indexes load in the background; /api/health/ready reports progress
+    if settings.warmup_on_startup:
+        registry.warmup()
+    yield
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="BizBloom AI", version="0.1.0")
+    app = FastAPI(title="BizBloom AI", version="0.1.0", lifespan=lifespan)
 
     # CORS must be added BEFORE including routes
     app.add_middleware(
@@ -17,6 +29,15 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    @app.middleware("http")
+    async def llm_cache_bypass(request: Request, call_next):
+        # Lets clients opt out of cached LLM answers for a single request
+        token = set_cache_bypass(wants_cache_bypass(request.headers))
+        try:
+            return await call_next(request)
+        finally:
+            reset_cache_bypass(token)
+
     app.include_router(router)
     return app
 
@@ -21,12 +21,14 @@ class MarketInsight(BaseModel):
     industry: str
     top_trends: List[str]
     customer_segments: List[str]
+    industry_confidence: Optional[float] = None
 
 
 class Competitor(BaseModel):
     name: str
     short_description: str
     url_if_known: Optional[str] = None
+    similarity: Optional[float] = None
 
 
 class CompetitorSnapshot(BaseModel):
@@ -51,6 +53,33 @@ class ValidationRequest(BaseModel):
     competitors: Optional[CompetitorSnapshot] = None
 
 
+class IdeaAnalysis(BaseModel):
+    market: MarketInsight
+    competitors: CompetitorSnapshot
+    risks: RiskOpportunity
+    scores: ValidationScore
+    fallback_sections: List[str] = []
+
+
+class StartupIn(BaseModel):
+    name: str = Field(..., min_length=1, max_length=200)
+    description: str = Field(..., max_length=2000)
+    category: str = "General"
+    funding: Optional[str] = None
+    url: Optional[str] = None
+
+
+class StartupIngestRequest(BaseModel):
+    add: List[StartupIn] = []
+    delete: List[int] = []
+
+
+class StartupIngestResult(BaseModel):
+    added_ids: List[int]
+    deleted_ids: List[int]
+    total: int
+
+
 class PartnerProfile(BaseModel):
     name: str
     interest_overlap_score: float
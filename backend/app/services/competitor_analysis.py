@@ -1,79 +1,362 @@
-from typing import List, Tuple
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
 import faiss
-from sentence_transformers import SentenceTransformer
 
 from app.config import settings
 from app.models.schemas import Competitor, CompetitorSnapshot, RefinedIdea
+from app.services.embedding_service import get_embedding_service
+from app.services.lexical_index import LexicalIndex, LexicalOverlay, keyword_search, reciprocal_rank_fusion
+from app.services.resource_registry import registry
+from app.services.startup_ingest import (
+    StartupMetadata,
+    index_path,
+    lexical_text,
+    load_metadata,
+    metadata_log_path,
+    metadata_path,
+    open_lexical_index,
+    open_vectors,
+)
+from app.services.vector_index import configure_search, read_index, rerank, selector_params
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class _IndexSnapshot:
+    """Index + metadata pair that queries read; replaced wholesale, never mutated."""
+
+    def __init__(
+        self,
+        index=None,
+        metadata: Optional[StartupMetadata] = None,
+        log_offset: int = 0,
+        stamps: tuple = (None, None, None),
+        loaded: bool = False,
+        vectors=None,
+        lexical: Optional[LexicalIndex] = None,
+    ) -> None:
+        self.index = index
+        # Memory-mapped full vectors: re-ranking and exact scoring of small filtered partitions
+        self.vectors = vectors
+        self.metadata = metadata if metadata is not None else StartupMetadata()
+        # Memory-mapped BM25 index over the base CSV plus postings for ingested startups
+        self.lexical = lexical
+        self.lexical_overlay = None
+        # Deleted base rows, dropped from keyword results before the top-n cut
+        self.lexical_deleted = None
+        if lexical is not None:
+            added = {i: lexical_text(entry) for i, entry in self.metadata.added.items()}
+            self.lexical_overlay = LexicalOverlay(added, lexical) if added else None
+            if self.metadata.deleted:
+                self.lexical_deleted = np.sort(np.fromiter(self.metadata.deleted, dtype=np.int64))
+        self.log_offset = log_offset
+        self.stamps = stamps
+        self.loaded = loaded
+        # Vectors still in the index without metadata (deleted from an index
+        # that cannot remove ids); queries over-fetch by this many
+        ntotal = index.ntotal if index is not None else 0
+        self.ghosts = max(0, ntotal - len(self.metadata))
 
 
 class CompetitorIndex:
+    """
+    Startup vector index plus metadata keyed by stable id.
+
+    Queries read an immutable snapshot. Every ``competitor_refresh_seconds``
+    a query checks whether the index file, base CSV or ingestion log changed
+    and, if so, a background thread loads a new snapshot and swaps it in, so
+    ingestion never blocks requests. Only records appended to the log since
+    the last snapshot are replayed.
+    """
+
     def __init__(self) -> None:
-        self.model = SentenceTransformer(settings.embedding_model)
-        self.index = None
-        self.metadata: List[dict] = []
-        self.dim = self.model.get_sentence_embedding_dimension()
+        self.embedder = get_embedding_service()
+        self.dim = self.embedder.dim
+        self._snapshot = _IndexSnapshot()
+        self._refreshing = threading.Lock()
+        self._checked_at = time.monotonic()
+
+    @property
+    def index(self):
+        return self._snapshot.index
+
+    @property
+    def metadata(self) -> StartupMetadata:
+        return self._snapshot.metadata
+
+    def entry(self, startup_id: int) -> Optional[dict]:
+        return self._snapshot.metadata.get(startup_id)
+
+    @staticmethod
+    def _stamps() -> tuple:
+        return (_file_stamp(index_path()), _file_stamp(metadata_path()), _file_stamp(metadata_log_path()))
+
+    def _read_snapshot(self, previous: _IndexSnapshot) -> _IndexSnapshot:
+        stamps = self._stamps()
+        index, vectors = previous.index, previous.vectors
+        if stamps[0] != previous.stamps[0] or index is None:
+            try:
+                index = read_index(index_path())
+                configure_search(index)
+            except RuntimeError:
+                index = None
+            # Reopened with the index: ingestion replaces the file before the index
+            vectors = open_vectors(self.dim)
+
+        # Replay only the log tail while the base CSV is unchanged and the log only grew
+        log_size = stamps[2][2] if stamps[2] else 0
+        if previous.loaded and stamps[1] == previous.stamps[1] and log_size >= previous.log_offset:
+            metadata, offset = load_metadata(previous.log_offset, previous.metadata)
+        else:
+            metadata, offset = load_metadata()
+
+        lexical = previous.lexical
+        if settings.competitor_lexical and (stamps[1] != previous.stamps[1] or not previous.loaded):
+            try:
+                lexical = open_lexical_index()
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Keyword search disabled, could not load the BM25 index: {e}")
+                lexical = None
+        return _IndexSnapshot(index, metadata, offset, stamps, loaded=True, vectors=vectors, lexical=lexical)
 
     def load(self) -> None:
-        index_path = f"{settings.processed_dir}/startup_index.faiss"
-        meta_path = f"{settings.processed_dir}/startup_metadata.csv"
-        try:
-            self.index = faiss.read_index(index_path)
-            self.metadata = pd.read_csv(meta_path).to_dict(orient="records")
-        except (FileNotFoundError, RuntimeError):
-            self.index = None
-            self.metadata = []
-
-    def query(self, text: str, k: int = 2) -> List[Tuple[int, float]]:
-        if self.index is None:
-            return []
-        vec = self.model.encode(text).astype("float32").reshape(1, -1)
-        distances, ids = self.index.search(vec, k)
-        return list(zip(ids[0].tolist(), distances[0].tolist()))
+        """Load synchronously (first use)."""
+        self._snapshot = self._read_snapshot(_IndexSnapshot())
+
+    def refresh_async(self) -> None:
+        """Load a new snapshot in the background unless one is already loading."""
+        if not self._refreshing.acquire(blocking=False):
+            return
+
+        def run() -> None:
+            try:
+                self._snapshot = self._read_snapshot(self._snapshot)
+            except Exception as e:
+                print(f"[WARN] Competitor index refresh failed: {e}")
+            finally:
+                self._refreshing.release()
+
+        threading.Thread(target=run, name="competitor-index-refresh", daemon=True).start()
+
+    def _maybe_refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < settings.competitor_refresh_seconds:
+            return
+        self._checked_at = now
+        if self._stamps() != self._snapshot.stamps:
+            self.refresh_async()
+
+    def query_many(
+        self,
+        texts: List[str],
+        k: int = 2,
+        category: Optional[str] = None,
+        funding: Optional[str] = None,
+    ) -> List[List[Tuple[int, Optional[float]]]]:
+        """
+        Top-k (startup id, cosine similarity) per text from one batched encode
+        and one FAISS search. Queries are L2-normalized like the indexed
+        vectors, so inner-product scores are true cosine similarities. With
+        ``competitor_rerank_factor`` > 1, k * factor candidates are fetched
+        and re-scored exactly against the memory-mapped full vectors, so a
+        compressed index (fp16 / sq8 / pq) keeps flat-index ranking quality.
+
+        ``category`` / ``funding`` restrict the search to that partition
+        instead of post-filtering a global top-k: small partitions are scored
+        exactly, larger ones are searched through a FAISS id selector.
+
+        When the BM25 index is loaded, the top ``competitor_lexical_candidates``
+        of the dense and the keyword search are merged by reciprocal-rank
+        fusion, so exact names and niche terms are found without a large k.
+        Keyword-only hits get their cosine from the full vectors (None when
+        the vector file is missing).
+        """
+        self._maybe_refresh()
+        snapshot = self._snapshot
+        if snapshot.index is None or not texts:
+            return [[] for _ in texts]
+        allowed = None
+        if category or funding:
+            allowed = snapshot.metadata.filter_ids(category=category, funding=funding)
+            if not len(allowed):
+                return [[] for _ in texts]
+
+        hybrid = snapshot.lexical is not None
+        n = max(k, settings.competitor_lexical_candidates) if hybrid else k
+        vectors = np.array(self.embedder.encode_many(texts), dtype="float32", order="C")
+        faiss.normalize_L2(vectors)
+        dense = self._dense(snapshot, vectors, n, allowed)
+        if not hybrid:
+            return dense
+        return [
+            self._fuse(
+                snapshot,
+                query,
+                matches,
+                keyword_search(
+                    snapshot.lexical, snapshot.lexical_overlay, text, n,
+                    settings.competitor_lexical_max_postings, allowed,
+                    # Filtered partitions already leave out deleted ids
+                    snapshot.lexical_deleted if allowed is None else None,
+                ),
+                k,
+            )
+            for text, query, matches in zip(texts, vectors, dense)
+        ]
+
+    def _dense(
+        self, snapshot: _IndexSnapshot, vectors: np.ndarray, k: int, allowed: Optional[np.ndarray]
+    ) -> List[List[Tuple[int, float]]]:
+        if allowed is not None and self._exact_partition(snapshot, allowed):
+            return self._score_partition(snapshot, vectors, allowed, k)
+        rerank_vectors = snapshot.vectors if settings.competitor_rerank_factor > 1 else None
+        candidates = k * settings.competitor_rerank_factor if rerank_vectors is not None else k
+        if allowed is not None:
+            fetch = min(len(allowed), candidates)
+        else:
+            fetch = min(snapshot.index.ntotal, candidates + snapshot.ghosts)
+        if fetch <= 0:
+            return [[] for _ in vectors]
+        params = selector_params(snapshot.index, allowed) if allowed is not None else None
+        scores, ids = snapshot.index.search(vectors, fetch, params=params)
+        scores, ids = rerank(vectors, scores, ids, rerank_vectors)
+        return [
+            [(int(i), float(s)) for i, s in zip(row_ids, row_scores) if i >= 0 and int(i) in snapshot.metadata][:k]
+            for row_ids, row_scores in zip(ids, scores)
+        ]
+
+    @staticmethod
+    def _fuse(
+        snapshot: _IndexSnapshot,
+        query: np.ndarray,
+        dense: List[Tuple[int, float]],
+        lexical: List[Tuple[int, float]],
+        k: int,
+    ) -> List[Tuple[int, Optional[float]]]:
+        """Top-k of both rankings by reciprocal-rank fusion, reported with their cosine similarity."""
+        fused = reciprocal_rank_fusion(
+            ([i for i, _ in dense], [i for i, _ in lexical if i in snapshot.metadata]), settings.competitor_rrf_k
+        )
+        top = [startup_id for startup_id, _ in fused[:k]]
+        similarity = dict(dense)
+        vectors = snapshot.vectors
+        results = []
+        for startup_id in top:
+            score = similarity.get(startup_id)
+            if score is None and vectors is not None and startup_id < len(vectors):
+                score = float(np.asarray(vectors[startup_id]) @ query)
+            results.append((startup_id, score))
+        return results
+
+    @staticmethod
+    def _exact_partition(snapshot: _IndexSnapshot, ids: np.ndarray) -> bool:
+        return (
+            snapshot.vectors is not None
+            and len(ids) <= settings.competitor_filter_exact_max
+            and int(ids[-1]) < len(snapshot.vectors)
+        )
+
+    @staticmethod
+    def _score_partition(
+        snapshot: _IndexSnapshot, queries: np.ndarray, ids: np.ndarray, k: int
+    ) -> List[List[Tuple[int, float]]]:
+        """Exact top-k over the partition's rows of the full vectors (ids are sorted)."""
+        scores = queries @ np.asarray(snapshot.vectors[ids]).T
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        return [[(int(ids[j]), float(row[j])) for j in cols] for row, cols in zip(scores, top)]
+
+    def query(self, text: str, k: int = 2, **filters: Optional[str]) -> List[Tuple[int, Optional[float]]]:
+        return self.query_many([text], k, **filters)[0]
 
 
 _global_index: CompetitorIndex | None = None
+_global_index_lock = threading.Lock()
 
 
 def get_index() -> CompetitorIndex:
     global _global_index
     if _global_index is None:
-        _global_index = CompetitorIndex()
-        _global_index.load()
+        with _global_index_lock:
+            if _global_index is None:
+                with registry.track("faiss_index"):
+                    index = CompetitorIndex()
+                    index.load()
+                _global_index = index
     return _global_index
 
 
-def competitor_snapshot(idea: RefinedIdea) -> CompetitorSnapshot:
+def idea_query_text(idea: RefinedIdea) -> str:
+    """Text embedded for an idea; shared so other services hit the embedding cache."""
+    return " ".join([idea.name, idea.problem, idea.solution, idea.value_proposition])
+
+
+def _fallback_snapshot() -> CompetitorSnapshot:
+    return CompetitorSnapshot(
+        competitors=[
+            Competitor(
+                name="BenchmarkCo",
+                short_description="Reference competitor placeholder.",
+                url_if_known=None,
+            )
+        ],
+        market_gap="Exploit underserved niche or feature gaps versus nearest rivals.",
+    )
+
+
+def competitor_snapshot(
+    idea: RefinedIdea, k: int = 2, category: Optional[str] = None, funding: Optional[str] = None
+) -> CompetitorSnapshot:
+    return competitor_snapshots([idea], k, category, funding)[0]
+
+
+def competitor_snapshots(
+    ideas: List[RefinedIdea], k: int = 2, category: Optional[str] = None, funding: Optional[str] = None
+) -> List[CompetitorSnapshot]:
+    """Snapshots for several ideas with a single batched index search, optionally within a category / funding stage."""
     idx = get_index()
-    query_text = " ".join([idea.name, idea.problem, idea.solution, idea.value_proposition])
-    matches = idx.query(query_text, k=2)
+    matches = idx.query_many([idea_query_text(idea) for idea in ideas], k=k, category=category, funding=funding)
+    filtered = bool(category or funding)
+    return [_snapshot_from_matches(idx, idea_matches, filtered) for idea_matches in matches]
+
 
+def _snapshot_from_matches(
+    idx: CompetitorIndex, matches: List[Tuple[int, Optional[float]]], filtered: bool = False
+) -> CompetitorSnapshot:
     competitors: List[Competitor] = []
-    for match_id, _dist in matches:
-        if idx.metadata and 0 <= match_id < len(idx.metadata):
-            entry = idx.metadata[match_id]
+    for match_id, score in matches:
+        entry = idx.entry(match_id)
+        if entry is not None:
             competitors.append(
                 Competitor(
                     name=entry.get("name", "Unknown"),
                     short_description=entry.get("description", "N/A"),
                     url_if_known=entry.get("url", None),
+                    similarity=round(score, 4) if score is not None else None,
                 )
             )
 
     if not competitors:
-        competitors = [
-            Competitor(
-                name="BenchmarkCo",
-                short_description="Reference competitor placeholder.",
-                url_if_known=None,
+        if filtered:
+            # No placeholder rival inside an explicitly requested segment
+            return CompetitorSnapshot(
+                competitors=[],
+                market_gap="No close rivals in this segment; validate demand before differentiating.",
             )
-        ]
+        return _fallback_snapshot()
 
     market_gap = "Differentiate with sharper positioning or niche focus."
     if competitors:
         market_gap = "Exploit underserved niche or feature gaps versus nearest rivals."
 
-    return CompetitorSnapshot(competitors=competitors[:2], market_gap=market_gap)
+    return CompetitorSnapshot(competitors=competitors, market_gap=market_gap)
 
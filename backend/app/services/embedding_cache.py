@@ -0,0 +1,157 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, trimmed, single-spaced."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_name: str, text: str) -> str:
+    digest = hashlib.sha256(f"{model_name}\x00{normalize_text(text)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by model name + hash of the normalized text.
+
+    Tier 1 is a bounded in-memory LRU. Tier 2 is an optional SQLite file under
+    ``settings.processed_dir`` so embeddings survive restarts; disk hits are
+    promoted into the LRU. Hit/miss counters are kept per tier.
+    """
+
+    def __init__(self, max_entries: int, db_path: Optional[str] = None) -> None:
+        self.max_entries = max(0, max_entries)
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.db_path = db_path
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+            )
+            db.commit()
+            self._db = db
+        except sqlite3.Error as e:
+            print(f"[WARN] Embedding cache disk tier disabled ({path}): {e}")
+            self._db = None
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vec = self._lru.get(key)
+                if vec is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = vec
+                    self.memory_hits += 1
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and self._db is not None:
+                for key, vec in self._read_disk(missing).items():
+                    found[key] = vec
+                    self._remember(key, vec)
+                    self.disk_hits += 1
+
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        if not items:
+            return
+        with self._lock:
+            for key, vec in items.items():
+                self._remember(key, vec)
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+                        [
+                            (key, int(vec.shape[0]), np.asarray(vec, dtype="float32").tobytes())
+                            for key, vec in items.items()
+                        ],
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"[WARN] Embedding cache write failed: {e}")
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        rows = []
+        try:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(
+                    self._db.execute(
+                        f"SELECT key, dim, vector FROM embeddings WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                )
+        except sqlite3.Error as e:
+            print(f"[WARN] Embedding cache read failed: {e}")
+        return {key: np.frombuffer(blob, dtype="float32", count=dim) for key, dim, blob in rows}
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        if self.max_entries == 0:
+            return
+        vec = np.asarray(vec, dtype="float32")
+        vec.setflags(write=False)
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_entries": len(self._lru),
+                "max_memory_entries": self.max_entries,
+                "disk_enabled": self._db is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache: EmbeddingCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                db_path = None
+                if settings.embedding_cache_persist:
+                    db_path = settings.embedding_cache_path or os.path.join(
+                        settings.processed_dir, "embedding_cache.sqlite3"
+                    )
+                _cache = EmbeddingCache(settings.embedding_cache_size, db_path)
+    return _cache
@@ -0,0 +1,158 @@
+import importlib.util
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.embedding_cache import EmbeddingCache, cache_key, get_embedding_cache
+from app.services.onnx_encoder import onnx_model_path
+from app.services.resource_registry import registry
+
+
+def _onnx_cache_model(model_name: str) -> str:
+    return f"{model_name}#onnx-{'int8' if settings.embedding_onnx_quantized else 'fp32'}"
+
+
+def encoder_cache_model(model_name: Optional[str] = None) -> str:
+    """
+    ``cache_model`` of the encoder the embedding service would load, derived
+    from settings and the exported files without loading a model: the model
+    name, with "#onnx-int8" / "#onnx-fp32" when the ONNX backend is selected
+    and its export and onnxruntime are present.
+    """
+    model_name = model_name or settings.embedding_model
+    if (
+        settings.embedding_backend == "onnx"
+        and os.path.exists(onnx_model_path(model_name))
+        and importlib.util.find_spec("onnxruntime") is not None
+    ):
+        return _onnx_cache_model(model_name)
+    return model_name
+
+
+class EmbeddingService:
+    """
+    Process-wide sentence embedding service with request micro-batching.
+
+    Every caller shares one encoder: a SentenceTransformer, or the exported
+    ONNX model when ``embedding_backend`` is "onnx". Single-text ``encode`` calls
+    from concurrent request threads are queued and a worker thread drains the
+    queue into batches of up to ``max_batch_size`` texts, waiting at most
+    ``max_wait_ms`` for a batch to fill. N simultaneous requests therefore cost
+    roughly one forward pass instead of N. Texts already seen are served from
+    the shared ``EmbeddingCache`` and never reach the model.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        cache: Optional[EmbeddingCache] = None,
+    ) -> None:
+        self.model_name = model_name or settings.embedding_model
+        self.max_batch_size = max(1, max_batch_size or settings.embedding_max_batch_size)
+        wait_ms = settings.embedding_max_wait_ms if max_wait_ms is None else max_wait_ms
+        self.max_wait = max(0.0, wait_ms) / 1000.0
+        self.model = self._load_model()
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.cache = cache if cache is not None else get_embedding_cache()
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def _load_model(self):
+        # ONNX vectors differ slightly from torch ones (and int8 from fp32 exports),
+        # so each variant is cached under its own key
+        self.cache_model = self.model_name
+        if settings.embedding_backend == "onnx":
+            from app.services.onnx_encoder import load_onnx_encoder
+
+            model = load_onnx_encoder(self.model_name)
+            if model is not None:
+                self.cache_model = _onnx_cache_model(self.model_name)
+                print(f"[INFO] Embedding backend: onnxruntime ({model.model_path})")
+                return model
+        # Imported here so importing the service module does not pull in torch
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(self.model_name)
+
+    def encode(self, text: str) -> np.ndarray:
+        """Embed one text, sharing a forward pass with concurrent callers."""
+        key = cache_key(self.cache_model, text)
+        cached = self.cache.get_many([key])
+        if key in cached:
+            return cached[key]
+        future: Future = Future()
+        self._queue.put((text, future))
+        vec = future.result()
+        self.cache.put_many({key: vec})
+        return vec
+
+    def encode_many(self, texts: List[str]) -> np.ndarray:
+        """Embed a list of texts directly as one or more full batches."""
+        if not texts:
+            return np.zeros((0, self.dim), dtype="float32")
+        keys = [cache_key(self.cache_model, text) for text in texts]
+        found = self.cache.get_many(keys)
+        todo = {key: text for key, text in zip(keys, texts) if key not in found}
+        if todo:
+            vectors = self._forward(list(todo.values()))
+            fresh = dict(zip(todo.keys(), vectors))
+            self.cache.put_many(fresh)
+            found.update(fresh)
+        return np.stack([found[key] for key in keys])
+
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=self.max_batch_size, show_progress_bar=False)
+        return np.asarray(vectors, dtype="float32").reshape(len(texts), self.dim)
+
+    def _collect_batch(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            pending = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            try:
+                vectors = self._forward([text for text, _ in pending])
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            for (_, future), vec in zip(pending, vectors):
+                future.set_result(vec)
+
+
+_service: EmbeddingService | None = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                with registry.track("embeddings"):
+                    _service = EmbeddingService()
+    return _service
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+SNAPSHOT_BATCH_SIZE = 256
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_paths(source_path: str) -> Tuple[str, str]:
+    """``<name>.embeddings.npy`` and its ``.json`` meta file next to the source file."""
+    base = os.path.splitext(source_path)[0]
+    return f"{base}.embeddings.npy", f"{base}.embeddings.json"
+
+
+def _replace_atomically(path: str, write: Callable[[str], None]) -> None:
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write_npy(path: str, matrix: np.ndarray) -> None:
+    with open(path, "wb") as f:
+        np.save(f, matrix)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_json(path: str, data: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_snapshot(source_path: str, model: str) -> Optional[np.ndarray]:
+    """
+    Read-only memory map of the snapshot for ``source_path``, or None when it
+    is missing or was built from a different source file or model.
+    """
+    npy_path, meta_path = snapshot_paths(source_path)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("source_sha256") != file_sha256(source_path) or meta.get("model") != model:
+            return None
+        matrix = np.load(npy_path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+        print(f"[INFO] Embedding snapshot unavailable for {source_path}: {e}")
+        return None
+    if matrix.dtype != np.float32 or matrix.shape != (meta.get("rows"), meta.get("dim")):
+        return None
+    return matrix
+
+
+def write_snapshot(source_path: str, model: str, matrix: np.ndarray) -> np.ndarray:
+    """
+    Write ``matrix`` as the snapshot for ``source_path`` and return it memory
+    mapped. The .npy is replaced before its meta file, so a meta file always
+    describes the array next to it.
+    """
+    npy_path, meta_path = snapshot_paths(source_path)
+    matrix = np.ascontiguousarray(matrix, dtype="float32")
+    meta = {
+        "source_sha256": file_sha256(source_path),
+        "model": model,
+        "rows": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+    }
+    _replace_atomically(npy_path, lambda tmp: _write_npy(tmp, matrix))
+    _replace_atomically(meta_path, lambda tmp: _write_json(tmp, meta))
+    print(f"[INFO] Wrote embedding snapshot {npy_path} ({meta['rows']} x {meta['dim']})")
+    return np.load(npy_path, mmap_mode="r")
+
+
+def encode_in_batches(encode_many: Callable[[List[str]], np.ndarray], texts: List[str]) -> np.ndarray:
+    """Encode ``texts`` in fixed-size batches so memory stays bounded for large files."""
+    batches = [
+        np.asarray(encode_many(texts[i:i + SNAPSHOT_BATCH_SIZE]), dtype="float32")
+        for i in range(0, len(texts), SNAPSHOT_BATCH_SIZE)
+    ]
+    return np.concatenate(batches) if batches else np.zeros((0, 0), dtype="float32")
@@ -0,0 +1,135 @@
+from typing import List, Optional
+
+from app.models.schemas import (
+    CompetitorSnapshot,
+    IdeaAnalysis,
+    MarketInsight,
+    RefinedIdea,
+    RiskOpportunity,
+    ValidationScore,
+)
+from app.services.competitor_analysis import competitor_snapshot
+from app.services.llm_gateway import get_llm_gateway, llm_enabled
+from app.services.market_insights import _fallback_insight
+from app.services.risk_opportunity import _fallback_risks
+from app.services.validation_scorer import _algorithmic_score
+
+
+SYSTEM_PROMPT = """You are a startup analyst. Analyze the startup idea in one pass.
+Return STRICT JSON with exactly these keys:
+- market: {"industry": main industry category (e.g. "EdTech", "FinTech", "HealthTech", "AI/ML", "SaaS", "E-commerce"), "top_trends": array of 2 relevant market trends, "customer_segments": array of 2 target customer segments}
+- risks: {"opportunities": array of 2 DETAILED opportunities (20-30 words each), "risks": array of 2 DETAILED risks (20-30 words each), "mitigation": mitigation strategy (30-50 words)}
+- validation: {"feasibility_score": integer 0-100, "novelty_score": integer 0-100 (uniqueness vs the listed competitors), "market_readiness": "High", "Medium" or "Low"}
+
+Be specific to the industry and idea. No commentary, return ONLY valid JSON."""
+
+
+def _analysis_prompt(idea: RefinedIdea, competitors: CompetitorSnapshot) -> str:
+    comp_names = [c.name for c in competitors.competitors]
+    return "\n".join([
+        f"Startup: {idea.name}",
+        f"Problem: {idea.problem}",
+        f"Solution: {idea.solution}",
+        f"Value Proposition: {idea.value_proposition}",
+        f"Competitors: {', '.join(comp_names)}",
+        f"Market Gap: {competitors.market_gap}",
+    ])
+
+
+def _parse_market(section) -> Optional[MarketInsight]:
+    try:
+        return MarketInsight(
+            industry=section["industry"],
+            top_trends=list(section["top_trends"])[:2],
+            customer_segments=list(section["customer_segments"])[:2],
+        )
+    except Exception as e:
+        print(f"[WARN] Analysis market section invalid: {e}")
+        return None
+
+
+def _parse_risks(section) -> Optional[RiskOpportunity]:
+    try:
+        risk = RiskOpportunity(
+            opportunities=list(section["opportunities"])[:2],
+            risks=list(section["risks"])[:2],
+            mitigation=section["mitigation"],
+        )
+    except Exception as e:
+        print(f"[WARN] Analysis risks section invalid: {e}")
+        return None
+    if not risk.opportunities or not risk.risks or not risk.mitigation:
+        return None
+    return risk
+
+
+def _parse_scores(section) -> Optional[ValidationScore]:
+    try:
+        return ValidationScore(
+            feasibility_score=max(0, min(100, int(section["feasibility_score"]))),
+            novelty_score=max(0, min(100, int(section["novelty_score"]))),
+            market_readiness=section["market_readiness"],
+        )
+    except Exception as e:
+        print(f"[WARN] Analysis validation section invalid: {e}")
+        return None
+
+
+def _complete_analysis(payload: dict) -> bool:
+    """Every section parses; partial replies are used but not cached."""
+    return all(
+        parse(payload.get(section)) is not None
+        for section, parse in (("market", _parse_market), ("risks", _parse_risks), ("validation", _parse_scores))
+    )
+
+
+def analyze_idea(idea: RefinedIdea) -> IdeaAnalysis:
+    """
+    Market insight, risks/opportunities and validation scores from one LLM call.
+
+    Competitors come from the local FAISS index first so the model can judge
+    novelty against them. Each section is validated against its own schema and
+    falls back independently (dataset insight, canned risks, algorithmic score).
+    """
+    competitors = competitor_snapshot(idea)
+
+    payload: dict = {}
+    if llm_enabled():
+        try:
+            payload = get_llm_gateway().complete_json(
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": _analysis_prompt(idea, competitors)},
+                ],
+                max_tokens=1200,
+                temperature=0.5,
+                service="analysis",
+                validate=_complete_analysis,
+            ) or {}
+        except Exception as e:
+            print(f"[ERROR] Combined analysis OpenRouter error: {e}")
+
+    fallback_sections: List[str] = []
+
+    market = _parse_market(payload.get("market")) if payload.get("market") else None
+    if market is None:
+        fallback_sections.append("market")
+        market = _fallback_insight(idea)
+
+    risks = _parse_risks(payload.get("risks")) if payload.get("risks") else None
+    if risks is None:
+        fallback_sections.append("risks")
+        risks = _fallback_risks(idea)
+
+    scores = _parse_scores(payload.get("validation")) if payload.get("validation") else None
+    if scores is None:
+        fallback_sections.append("validation")
+        scores = _algorithmic_score(market, competitors)
+
+    return IdeaAnalysis(
+        market=market,
+        competitors=competitors,
+        risks=risks,
+        scores=scores,
+        fallback_sections=fallback_sections,
+    )
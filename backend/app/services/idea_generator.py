@@ -1,9 +1,12 @@
-from typing import List
-import json
-from openai import OpenAI
+import asyncio
+from typing import AsyncIterator, List, Optional
 
 from app.config import settings
 from app.models.schemas import RefinedIdea
+from app.services.json_stream import IncrementalObjectParser
+from app.services.llm_cache import cache_bypassed
+from app.services.llm_gateway import get_llm_gateway, llm_enabled
+from app.services.semantic_cache import get_semantic_cache
 
 
 SYSTEM_PROMPT = """You generate exactly 3 refined startup ideas from a short user idea.
@@ -36,50 +39,87 @@ def _fallback_ideas() -> List[RefinedIdea]:
     ]
 
 
+IDEA_MAX_TOKENS = 1000
+IDEA_TEMPERATURE = 0.7
+
+
+def _idea_messages(user_input: str) -> List[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Generate 3 startup ideas based on: {user_input}\n\nReturn ONLY valid JSON."}
+    ]
+
+
+def _pad_ideas(refined: List[RefinedIdea]) -> List[RefinedIdea]:
+    # Pad with fallback if needed
+    while len(refined) < 3:
+        refined.append(_fallback_ideas()[len(refined)])
+    return refined
+
+
+def _semantic_lookup(user_input: str) -> Optional[List[RefinedIdea]]:
+    if not settings.semantic_cache_enabled or cache_bypassed():
+        return None
+    try:
+        cached = get_semantic_cache().lookup(user_input)
+        if cached:
+            print("[INFO] Returning ideas from semantic cache")
+            return _pad_ideas(cached)
+    except Exception as e:
+        print(f"[WARN] Semantic cache lookup failed: {e}")
+    return None
+
+
+def _remember_semantic(user_input: str, ideas: List[RefinedIdea]) -> None:
+    """Store the ideas the model returned (unpadded; lookups pad them again)."""
+    if not settings.semantic_cache_enabled:
+        return
+    try:
+        get_semantic_cache().store(user_input, ideas)
+    except Exception as e:
+        print(f"[WARN] Semantic cache store failed: {e}")
+
+
+def _parse_ideas(payload: dict) -> List[RefinedIdea]:
+    """Up to three RefinedIdea from an ``{"ideas": [...]}`` reply (raises if any is malformed)."""
+    return [RefinedIdea(**idea) for idea in payload.get("ideas", [])][:3]
+
+
 def generate_refined_ideas(user_input: str) -> List[RefinedIdea]:
     # Check if API key is missing or placeholder
-    api_key = settings.openrouter_api_key
-    if not api_key or api_key.startswith("sk-or-your") or len(api_key) < 20:
+    if not llm_enabled():
         print("[INFO] No valid OpenRouter API key, using fallback ideas")
         return _fallback_ideas()
 
+    cached = _semantic_lookup(user_input)
+    if cached:
+        return cached
+
     try:
-        print(f"[INFO] Calling OpenRouter API with model: {settings.openrouter_model}")
-        
-        client = OpenAI(
-            base_url=settings.openrouter_base_url,
-            api_key=api_key,
-        )
-        
-        response = client.chat.completions.create(
-            model=settings.openrouter_model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Generate 3 startup ideas based on: {user_input}\n\nReturn ONLY valid JSON."}
-            ],
-            max_tokens=1000,
-            temperature=0.7,
-        )
+        gateway = get_llm_gateway()
+        messages = _idea_messages(user_input)
+        # Exact-cache hits were remembered semantically when first generated
+        payload = gateway.cached_json(messages, IDEA_MAX_TOKENS, IDEA_TEMPERATURE, "ideas")
+        fresh = payload is None
+        if fresh:
+            print(f"[INFO] Calling OpenRouter API with model: {settings.openrouter_model}")
+            payload = gateway.complete_json(
+                messages=messages,
+                max_tokens=IDEA_MAX_TOKENS,
+                temperature=IDEA_TEMPERATURE,
+                service="ideas",
+                validate=_parse_ideas,
+            )
         
-        content = response.choices[0].message.content or ""
-        print(f"[INFO] Received response: {content[:200]}...")
-        
-        # Try to extract JSON from response
+        # Validate the parsed JSON payload
         try:
-            # Find JSON in response
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                payload = json.loads(json_str)
-                ideas_raw = payload.get("ideas", [])
-                refined = [RefinedIdea(**idea) for idea in ideas_raw][:3]
+            if payload is not None:
+                refined = _parse_ideas(payload)
                 if len(refined) >= 1:
                     print(f"[INFO] Successfully parsed {len(refined)} ideas from API response")
-                    # Pad with fallback if needed
-                    while len(refined) < 3:
-                        refined.append(_fallback_ideas()[len(refined)])
-                    return refined
+                    if fresh:
+                        _remember_semantic(user_input, refined)
+                    return _pad_ideas(list(refined))
         except Exception as e:
             print(f"[WARN] JSON parsing failed: {e}")
 
@@ -90,3 +130,66 @@ def generate_refined_ideas(user_input: str) -> List[RefinedIdea]:
     except Exception as e:
         print(f"[ERROR] OpenRouter API error: {e}")
         return _fallback_ideas()
+
+
+async def stream_refined_ideas(user_input: str) -> AsyncIterator[RefinedIdea]:
+    """
+    Yield refined ideas one at a time, each as soon as the model closes its
+    JSON object. Cache hits and fallbacks are yielded immediately; a short
+    stream is padded with fallback ideas so callers always receive three.
+    """
+    if not llm_enabled():
+        for idea in _fallback_ideas():
+            yield idea
+        return
+
+    gateway = get_llm_gateway()
+    messages = _idea_messages(user_input)
+
+    def cached_ideas() -> Optional[List[RefinedIdea]]:
+        semantic = _semantic_lookup(user_input)
+        if semantic:
+            return semantic
+        payload = gateway.cached_json(messages, IDEA_MAX_TOKENS, IDEA_TEMPERATURE, "ideas")
+        if payload is not None:
+            try:
+                refined = [RefinedIdea(**idea) for idea in payload.get("ideas", [])][:3]
+            except Exception:
+                return None
+            return _pad_ideas(refined) if refined else None
+        return None
+
+    cached = await asyncio.to_thread(cached_ideas)
+    if cached:
+        for idea in cached:
+            yield idea
+        return
+
+    refined: List[RefinedIdea] = []
+    parser = IncrementalObjectParser(depth=2)
+    try:
+        print(f"[INFO] Streaming OpenRouter API with model: {settings.openrouter_model}")
+        async for delta in gateway.astream(messages, IDEA_MAX_TOKENS, IDEA_TEMPERATURE):
+            for raw in parser.feed(delta):
+                if len(refined) >= 3:
+                    continue
+                try:
+                    idea = RefinedIdea(**raw)
+                except Exception as e:
+                    print(f"[WARN] Skipping malformed streamed idea: {e}")
+                    continue
+                refined.append(idea)
+                yield idea
+    except Exception as e:
+        print(f"[ERROR] OpenRouter streaming error: {e}")
+
+    if refined:
+        def remember() -> None:
+            payload = {"ideas": [idea.model_dump() for idea in refined]}
+            gateway.store_json(messages, IDEA_MAX_TOKENS, IDEA_TEMPERATURE, "ideas", payload)
+            _remember_semantic(user_input, refined)
+
+        await asyncio.to_thread(remember)
+
+    for idea in _pad_ideas(list(refined))[len(refined):]:
+        yield idea
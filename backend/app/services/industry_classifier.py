@@ -0,0 +1,215 @@
+import csv
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+
+# (industry, keyword, weight). A trailing "*" matches any word starting with the stem.
+DEFAULT_KEYWORDS: List[Tuple[str, str, float]] = [
+    ("EdTech", "education", 1.0),
+    ("EdTech", "learning", 1.0),
+    ("EdTech", "student*", 1.0),
+    ("EdTech", "school*", 1.0),
+    ("EdTech", "tutor*", 1.5),
+    ("EdTech", "course*", 1.0),
+    ("HealthTech", "health*", 1.0),
+    ("HealthTech", "medical", 1.5),
+    ("HealthTech", "patient*", 1.5),
+    ("HealthTech", "doctor*", 1.5),
+    ("HealthTech", "clinic*", 1.5),
+    ("HealthTech", "wellness", 1.0),
+    ("FinTech", "financ*", 1.0),
+    ("FinTech", "payment*", 1.5),
+    ("FinTech", "banking", 1.5),
+    ("FinTech", "invest*", 1.0),
+    ("FinTech", "money", 1.0),
+    ("FinTech", "loan*", 1.5),
+    ("AI/ML", "ai", 1.0),
+    ("AI/ML", "machine learning", 2.0),
+    ("AI/ML", "neural", 1.5),
+    ("AI/ML", "prediction*", 1.0),
+    ("AI/ML", "model*", 0.5),
+    ("SaaS", "software", 1.0),
+    ("SaaS", "platform*", 0.5),
+    ("SaaS", "subscription*", 1.5),
+    ("SaaS", "service*", 0.5),
+    ("SaaS", "cloud", 1.0),
+    ("E-commerce", "shop*", 1.0),
+    ("E-commerce", "retail*", 1.5),
+    ("E-commerce", "product*", 0.5),
+    ("E-commerce", "sell*", 1.0),
+    ("E-commerce", "marketplace*", 1.5),
+]
+
+
+def _pattern_for(keyword: str) -> str:
+    return r"\s+".join(re.escape(part) for part in keyword.split())
+
+
+class KeywordClassifier:
+    """
+    Weighted multi-pattern industry classifier.
+
+    All keywords are compiled into one case-insensitive regex with word
+    boundaries, so ``classify`` scans the text once regardless of how many
+    industries or keywords there are, and "ai" no longer matches inside
+    "maintain". Every industry is scored by the summed weight of its hits and
+    returned ranked; ties keep the keyword table's industry order.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, float]]) -> None:
+        self._entries: Dict[str, List[Tuple[str, float]]] = {}
+        self._order: Dict[str, int] = {}
+        exact: List[str] = []
+        prefixes: List[str] = []
+        for industry, keyword, weight in rows:
+            keyword = " ".join(keyword.lower().split())
+            if not industry or not keyword:
+                continue
+            self._order.setdefault(industry, len(self._order))
+            is_prefix = keyword.endswith("*")
+            key = keyword.rstrip("*").strip()
+            if not key:
+                continue
+            lookup = f"{key}*" if is_prefix else key
+            if lookup not in self._entries:
+                (prefixes if is_prefix else exact).append(key)
+            self._entries.setdefault(lookup, []).append((industry, float(weight)))
+
+        # Longest alternatives first so "machine learning" wins over "learning"
+        alternatives = []
+        if exact:
+            exact_alt = "|".join(_pattern_for(k) for k in sorted(exact, key=len, reverse=True))
+            alternatives.append(rf"\b(?P<exact>{exact_alt})\b")
+        if prefixes:
+            prefix_alt = "|".join(_pattern_for(k) for k in sorted(prefixes, key=len, reverse=True))
+            alternatives.append(rf"\b(?P<prefix>{prefix_alt})\w*")
+        self._regex: Optional[re.Pattern] = (
+            re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+        )
+
+    @property
+    def industries(self) -> List[str]:
+        return list(self._order)
+
+    def classify(self, text: str) -> List[Tuple[str, float]]:
+        """Industries with a positive score, highest first."""
+        if self._regex is None:
+            return []
+        scores: Dict[str, float] = {}
+        for match in self._regex.finditer(text):
+            groups = match.groupdict()
+            if groups.get("exact"):
+                lookup = " ".join(groups["exact"].lower().split())
+            else:
+                lookup = " ".join(groups["prefix"].lower().split()) + "*"
+            for industry, weight in self._entries.get(lookup, ()):
+                scores[industry] = scores.get(industry, 0.0) + weight
+        return sorted(scores.items(), key=lambda item: (-item[1], self._order[item[0]]))
+
+
+def load_keyword_rows(path: str) -> List[Tuple[str, str, float]]:
+    """Read industry,keyword[,weight] rows; falls back to DEFAULT_KEYWORDS."""
+    rows: List[Tuple[str, str, float]] = []
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    weight = float(row.get("weight") or 1.0)
+                except ValueError:
+                    weight = 1.0
+                rows.append(((row.get("industry") or "").strip(), row.get("keyword") or "", weight))
+    except FileNotFoundError:
+        return list(DEFAULT_KEYWORDS)
+    except (OSError, csv.Error) as e:
+        print(f"[WARN] Could not load industry keywords from {path}: {e}")
+        return list(DEFAULT_KEYWORDS)
+    return rows or list(DEFAULT_KEYWORDS)
+
+
+def compute_category_centroids(
+    embeddings: np.ndarray, categories: Sequence[str]
+) -> Tuple[List[str], np.ndarray]:
+    """One L2-normalized mean embedding per category (offline, dataset scripts)."""
+    vectors = np.asarray(embeddings, dtype="float32")
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    labels = np.asarray([str(c) for c in categories])
+    names = sorted(set(labels.tolist()))
+    centroids = np.stack([vectors[labels == name].mean(axis=0) for name in names]).astype("float32")
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return names, centroids
+
+
+def save_category_centroids(path: str, names: List[str], centroids: np.ndarray) -> None:
+    np.savez(path, categories=np.asarray(names), centroids=centroids.astype("float32"))
+
+
+class CentroidClassifier:
+    """
+    Nearest-centroid industry classifier over startup_metadata categories.
+
+    Centroids are precomputed by the dataset scripts; classifying an idea
+    embedding is one matrix-vector product. Confidence is the cosine
+    similarity to the winning centroid.
+    """
+
+    def __init__(self, categories: List[str], centroids: np.ndarray) -> None:
+        self.categories = categories
+        self.centroids = np.ascontiguousarray(centroids, dtype="float32")
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CentroidClassifier"]:
+        try:
+            with np.load(path) as data:
+                return cls([str(c) for c in data["categories"]], data["centroids"])
+        except (OSError, KeyError, ValueError) as e:
+            print(f"[INFO] Category centroids unavailable ({path}): {e}")
+            return None
+
+    def _scores(self, vector: np.ndarray) -> np.ndarray:
+        vec = np.asarray(vector, dtype="float32").ravel()
+        return self.centroids @ (vec / max(float(np.linalg.norm(vec)), 1e-12))
+
+    def rank(self, vector: np.ndarray) -> List[Tuple[str, float]]:
+        scores = self._scores(vector)
+        return [(self.categories[i], float(scores[i])) for i in np.argsort(-scores)]
+
+    def predict(self, vector: np.ndarray) -> Tuple[str, float]:
+        scores = self._scores(vector)
+        best = int(np.argmax(scores))
+        return self.categories[best], float(scores[best])
+
+
+_classifier_lock = threading.Lock()
+_centroids: CentroidClassifier | None = None
+_centroids_loaded = False
+
+
+def get_centroid_classifier() -> Optional[CentroidClassifier]:
+    global _centroids, _centroids_loaded
+    if not _centroids_loaded:
+        with _classifier_lock:
+            if not _centroids_loaded:
+                _centroids = CentroidClassifier.load(
+                    os.path.join(settings.processed_dir, "category_centroids.npz")
+                )
+                _centroids_loaded = True
+    return _centroids
+
+
+_classifier: KeywordClassifier | None = None
+
+
+def get_keyword_classifier() -> KeywordClassifier:
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                path = os.path.join(settings.processed_dir, "industry_keywords.csv")
+                _classifier = KeywordClassifier(load_keyword_rows(path))
+    return _classifier
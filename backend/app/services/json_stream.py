@@ -0,0 +1,58 @@
+import json
+from typing import List
+
+
+class IncrementalObjectParser:
+    """
+    Incremental JSON scanner that yields nested objects as soon as they close.
+
+    Feed raw completion chunks in arrival order; ``feed`` returns every object
+    that opened at ``depth`` (counting ``{`` only, so ``{"ideas": [{...}]}``
+    puts each idea at depth 2) and has now closed. String contents (including
+    escaped quotes and braces) are skipped at every level, also in prose
+    before the outer object, where a quote left open ends at the line break
+    (JSON strings cannot contain one). Partial chunks can split anywhere.
+    """
+
+    def __init__(self, depth: int = 2) -> None:
+        self.depth = depth
+        self._buffer: List[str] = []
+        self._level = 0
+        self._in_string = False
+        self._escaped = False
+        self._capturing = False
+
+    def feed(self, chunk: str) -> List[dict]:
+        objects: List[dict] = []
+        for ch in chunk:
+            if self._capturing:
+                self._buffer.append(ch)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"' or (ch == "\n" and self._level == 0):
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._level += 1
+                if self._level == self.depth and not self._capturing:
+                    self._capturing = True
+                    self._buffer = ["{"]
+            elif ch == "}" and self._level > 0:
+                if self._level == self.depth and self._capturing:
+                    self._capturing = False
+                    try:
+                        parsed = json.loads("".join(self._buffer))
+                    except json.JSONDecodeError:
+                        parsed = None
+                    if isinstance(parsed, dict):
+                        objects.append(parsed)
+                    self._buffer = []
+                self._level -= 1
+        return objects
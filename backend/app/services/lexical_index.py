@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"BBBM25I\n"
+ALIGN = 64
+
+# BM25 defaults (Robertson / Lucene)
+K1 = 1.2
+B = 0.75
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or our that the their them "
+    "they this to was we which who will with you your".split()
+)
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased alphanumeric terms without stopwords; product names and acronyms ("lms", "hipaa") survive."""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def term_key(term: str) -> int:
+    """Signed 64-bit hash standing in for the term (the index stores no vocabulary strings)."""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def _idf(n_docs: int, df) -> np.ndarray:
+    return np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+
+class LexicalIndex:
+    """
+    Read-only BM25 inverted index memory-mapped from a single file.
+
+    Layout: magic, header length, JSON header, then 64-byte aligned sections:
+    sorted int64 term hashes, their idf (float32) and posting offsets (int64,
+    terms + 1), and the postings as int64 startup ids with a float32 impact
+    (the BM25 term-frequency / length component). Postings of a term are
+    ordered by impact, so a query reads at most ``max_postings`` per term and
+    its cost stays bounded however common the term is in a large corpus.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(self._mm[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a lexical index")
+        header_len = int.from_bytes(bytes(self._mm[8:16]), "little")
+        header = json.loads(bytes(self._mm[16:16 + header_len]).decode("utf-8"))
+        self._data_start = header["data_start"]
+        self.docs: int = header["docs"]
+        self.avgdl: float = header["avgdl"]
+        self.k1: float = header["k1"]
+        self.b: float = header["b"]
+        self.source = header.get("source")
+        self.terms = self._section(header["terms"], np.int64)
+        self.idf = self._section(header["idf"], np.float32)
+        self.offsets = self._section(header["offsets"], np.int64)
+        self.postings = self._section(header["postings"], np.int64)
+        self.impacts = self._section(header["impacts"], np.float32)
+
+    def _section(self, section, dtype) -> np.ndarray:
+        offset, count = section
+        return np.frombuffer(self._mm, dtype=dtype, count=count, offset=self._data_start + offset)
+
+    def __len__(self) -> int:
+        return self.docs
+
+    def lookup(self, term: str) -> Optional[int]:
+        key = term_key(term)
+        pos = int(np.searchsorted(self.terms, key))
+        if pos < len(self.terms) and int(self.terms[pos]) == key:
+            return pos
+        return None
+
+    def df(self, pos: int) -> int:
+        return int(self.offsets[pos + 1] - self.offsets[pos])
+
+    def postings_for(self, terms: Iterable[str], max_postings: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, partial scores) for every posting read; a doc appears once per matching term."""
+        ids, scores = [], []
+        for term in set(terms):
+            pos = self.lookup(term)
+            if pos is None:
+                continue
+            start, end = int(self.offsets[pos]), int(self.offsets[pos + 1])
+            end = min(end, start + max_postings)
+            ids.append(self.postings[start:end])
+            scores.append(self.impacts[start:end] * self.idf[pos])
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return np.concatenate(ids), np.concatenate(scores)
+
+
+class LexicalOverlay:
+    """
+    BM25 postings for startups ingested since the index was built (a few
+    thousand at most until the next rebuild), kept in memory and scored with
+    the base index's document count and average length.
+    """
+
+    def __init__(self, entries: Dict[int, str], base: Optional[LexicalIndex] = None) -> None:
+        self.base = base
+        self.docs = len(entries)
+        self.postings: Dict[str, List[Tuple[int, int, int]]] = {}
+        for startup_id, text in entries.items():
+            tokens = tokenize(text)
+            for term in set(tokens):
+                self.postings.setdefault(term, []).append((int(startup_id), tokens.count(term), len(tokens)))
+
+    def postings_for(self, terms: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        n_docs = self.docs + (len(self.base) if self.base is not None else 0)
+        avgdl = self.base.avgdl if self.base is not None else 0.0
+        k1 = self.base.k1 if self.base is not None else K1
+        b = self.base.b if self.base is not None else B
+        ids, scores = [], []
+        for term in set(terms):
+            matches = self.postings.get(term)
+            if not matches:
+                continue
+            pos = self.base.lookup(term) if self.base is not None else None
+            df = len(matches) + (self.base.df(pos) if pos is not None else 0)
+            idf = float(_idf(n_docs, df))
+            for startup_id, tf, dl in matches:
+                norm = 1 - b + b * dl / avgdl if avgdl else 1.0
+                ids.append(startup_id)
+                scores.append(idf * tf * (k1 + 1) / (tf + k1 * norm))
+        return np.asarray(ids, dtype=np.int64), np.asarray(scores, dtype=np.float32)
+
+
+def keyword_search(
+    index: Optional[LexicalIndex],
+    overlay: Optional[LexicalOverlay],
+    text: str,
+    n: int,
+    max_postings: int,
+    allowed: Optional[np.ndarray] = None,
+    excluded: Optional[np.ndarray] = None,
+) -> List[Tuple[int, float]]:
+    """
+    Top-n (startup id, BM25 score) for ``text`` from the base index plus the
+    ingestion overlay. ``allowed`` (sorted ids) restricts results to a
+    partition; ``excluded`` (sorted deleted ids) are dropped before the top-n cut.
+    """
+    terms = tokenize(text)
+    parts = []
+    if index is not None:
+        parts.append(index.postings_for(terms, max_postings))
+    if overlay is not None:
+        parts.append(overlay.postings_for(terms))
+    parts = [p for p in parts if len(p[0])]
+    if not parts or n <= 0:
+        return []
+    ids = np.concatenate([p[0] for p in parts])
+    scores = np.concatenate([p[1] for p in parts])
+    if allowed is not None or excluded is not None:
+        keep = np.ones(len(ids), dtype=bool)
+        if allowed is not None:
+            keep &= np.isin(ids, allowed)
+        if excluded is not None and len(excluded):
+            keep &= ~np.isin(ids, excluded)
+        ids, scores = ids[keep], scores[keep]
+        if not len(ids):
+            return []
+    docs, inverse = np.unique(ids, return_inverse=True)
+    totals = np.bincount(inverse, weights=scores)
+    top = np.argpartition(-totals, n - 1)[:n] if len(totals) > n else np.arange(len(totals))
+    top = top[np.argsort(-totals[top], kind="stable")]
+    return [(int(docs[i]), float(totals[i])) for i in top]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Iterable[int]], rrf_k: int = 60) -> List[Tuple[int, float]]:
+    """Merge ranked id lists: score = sum of 1 / (rrf_k + rank) over the lists an id appears in."""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, startup_id in enumerate(ranking, start=1):
+            fused[startup_id] = fused.get(startup_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def write_lexical_index(
+    path: str,
+    docs: Iterable[Tuple[int, str]],
+    source: Optional[dict] = None,
+    k1: float = K1,
+    b: float = B,
+) -> None:
+    """
+    Build a BM25 index over ``(id, text)`` pairs and write it to ``path``
+    atomically. Postings are collected in compact arrays (about 20 bytes per
+    distinct term per document) and sorted once with numpy.
+    """
+    keys, doc_rows, tfs = array("q"), array("i"), array("i")
+    ids, lengths = array("q"), array("i")
+    for startup_id, text in docs:
+        tokens = tokenize(text)
+        row = len(ids)
+        ids.append(int(startup_id))
+        lengths.append(len(tokens))
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            keys.append(term_key(term))
+            doc_rows.append(row)
+            tfs.append(tf)
+
+    n_docs = len(ids)
+    keys_np = np.array(keys, dtype=np.int64)
+    rows_np = np.array(doc_rows, dtype=np.int32)
+    tf_np = np.array(tfs, dtype=np.float32)
+    dl = np.array(lengths, dtype=np.float32)
+    avgdl = float(dl.mean()) if n_docs else 0.0
+
+    norm = 1 - b + b * dl[rows_np] / avgdl if avgdl else np.ones_like(tf_np)
+    impacts = (tf_np * (k1 + 1) / (tf_np + k1 * norm)).astype(np.float32)
+    order = np.lexsort((-impacts, keys_np))  # by term, highest impact first
+    keys_np, impacts = keys_np[order], impacts[order]
+    postings = np.array(ids, dtype=np.int64)[rows_np[order]]
+    terms, starts, df = np.unique(keys_np, return_index=True, return_counts=True)
+    offsets = np.append(starts, len(keys_np)).astype(np.int64)
+    idf = _idf(n_docs, df)
+
+    sections = [
+        ("terms", terms.astype(np.int64)),
+        ("idf", idf),
+        ("offsets", offsets),
+        ("postings", postings.astype(np.int64)),
+        ("impacts", impacts),
+    ]
+    header = {"docs": n_docs, "avgdl": avgdl, "k1": k1, "b": b, "source": source, "data_start": 0}
+    cursor = 0
+    for name, data in sections:
+        header[name] = (cursor, len(data))
+        cursor = _aligned(cursor + data.nbytes)
+    # data_start is part of the header itself; leave room for its final digits
+    data_start = _aligned(16 + len(json.dumps(header).encode("utf-8")) + 32)
+    header["data_start"] = data_start
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp, "wb") as out:
+            out.write(MAGIC)
+            out.write(len(header_bytes).to_bytes(8, "little"))
+            out.write(header_bytes)
+            for name, data in sections:
+                out.seek(data_start + header[name][0])
+                out.write(np.ascontiguousarray(data).tobytes())
+            out.truncate(data_start + cursor)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    print(f"[INFO] BM25 index: {n_docs:,} docs, {len(terms):,} terms, {len(postings):,} postings ({cursor / 2**20:.1f} MB)")
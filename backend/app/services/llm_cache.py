@@ -0,0 +1,173 @@
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from app.config import settings
+
+
+# Set per request by the cache-bypass middleware; copied into worker threads
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+BYPASS_HEADER = "x-bizbloom-cache"
+
+
+def set_cache_bypass(enabled: bool) -> contextvars.Token:
+    return _bypass.set(enabled)
+
+
+def reset_cache_bypass(token: contextvars.Token) -> None:
+    _bypass.reset(token)
+
+
+def wants_cache_bypass(headers) -> bool:
+    """True for ``X-BizBloom-Cache: bypass`` or ``Cache-Control: no-cache/no-store``."""
+    if headers.get(BYPASS_HEADER, "").strip().lower() == "bypass":
+        return True
+    cache_control = headers.get("cache-control", "").lower()
+    return "no-cache" in cache_control or "no-store" in cache_control
+
+
+def cache_bypassed() -> bool:
+    return _bypass.get()
+
+
+def cache_enabled_for(service: str) -> bool:
+    if _bypass.get():
+        return False
+    return bool(getattr(settings, f"llm_cache_{service}", False))
+
+
+def response_key(model: str, messages: List[dict], temperature: float, max_tokens: int) -> str:
+    raw = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Exact-match cache of parsed LLM JSON responses.
+
+    A bounded in-memory LRU sits in front of an optional SQLite table; both
+    honour the same TTL. Payloads are stored already parsed so a hit skips the
+    network call and the JSON extraction.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, db_path: Optional[str] = None) -> None:
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl_seconds
+        self._lru: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, service TEXT NOT NULL, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            db.commit()
+            self._db = db
+        except sqlite3.Error as e:
+            print(f"[WARN] LLM cache disk tier disabled ({path}): {e}")
+            self._db = None
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at >= now:
+                    self._lru.move_to_end(key)
+                    self.memory_hits += 1
+                    return payload
+                del self._lru[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT payload, expires_at FROM responses WHERE key = ? AND expires_at >= ?",
+                        (key, now),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"[WARN] LLM cache read failed: {e}")
+                    row = None
+                if row is not None:
+                    payload = json.loads(row[0])
+                    self._remember(key, row[1], payload)
+                    self.disk_hits += 1
+                    return payload
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, service: str, payload: Any) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, payload)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, service, payload, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, service, json.dumps(payload, ensure_ascii=False), expires_at),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"[WARN] LLM cache write failed: {e}")
+
+    def _remember(self, key: str, expires_at: float, payload: Any) -> None:
+        if self.max_entries == 0:
+            return
+        self._lru[key] = (expires_at, payload)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_entries": len(self._lru),
+                "max_memory_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "disk_enabled": self._db is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache: LLMResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                db_path = None
+                if settings.llm_cache_persist:
+                    db_path = settings.llm_cache_path or os.path.join(settings.processed_dir, "llm_cache.sqlite3")
+                _cache = LLMResponseCache(settings.llm_cache_size, settings.llm_cache_ttl_seconds, db_path)
+    return _cache
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Callable, Coroutine, List, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.config import settings
+from app.services.llm_cache import cache_enabled_for, get_llm_cache, response_key
+from app.services.resource_registry import registry
+
+
+def llm_enabled() -> bool:
+    """True when a real (non-placeholder) OpenRouter key is configured."""
+    api_key = settings.openrouter_api_key
+    return bool(api_key) and len(api_key) >= 20 and not api_key.startswith("sk-or-your")
+
+
+def extract_json(content: str) -> Optional[dict]:
+    """Parse the outermost {...} object from a model reply, or None."""
+    start_idx = content.find('{')
+    end_idx = content.rfind('}') + 1
+    if start_idx == -1 or end_idx <= start_idx:
+        return None
+    try:
+        payload = json.loads(content[start_idx:end_idx])
+    except json.JSONDecodeError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+class LLMGateway:
+    """
+    Shared OpenAI-compatible client for every LLM call in the app.
+
+    One ``AsyncOpenAI`` client over a tuned ``httpx.AsyncClient`` pool keeps
+    connections and TLS sessions alive between requests. The client lives on a
+    dedicated event loop thread so sync services (``complete``) and async
+    handlers (``acomplete``) share the same pool, timeouts and concurrency cap.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> None:
+        self.base_url = base_url or settings.openrouter_base_url
+        self.api_key = api_key or settings.openrouter_api_key
+        self.model = model or settings.openrouter_model
+        self.default_timeout = settings.llm_timeout_seconds
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+        self._client: AsyncOpenAI = self._call(self._create_client())
+        self._semaphore: asyncio.Semaphore = self._call(self._create_semaphore())
+
+    async def _create_client(self) -> AsyncOpenAI:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+                keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(self.default_timeout, connect=settings.llm_connect_timeout_seconds),
+        )
+        return AsyncOpenAI(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            http_client=http_client,
+            max_retries=settings.llm_max_retries,
+        )
+
+    async def _create_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(max(1, settings.llm_max_concurrency))
+
+    def _submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _call(self, coro: Coroutine):
+        return self._submit(coro).result()
+
+    async def _complete(
+        self,
+        messages: List[dict],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float],
+    ) -> str:
+        async with self._semaphore:
+            response = await self._client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=timeout or self.default_timeout,
+            )
+        return response.choices[0].message.content or ""
+
+    def complete(
+        self,
+        messages: List[dict],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Blocking chat completion for sync callers; returns the message text."""
+        return self._call(self._complete(messages, max_tokens, temperature, timeout))
+
+    async def acomplete(
+        self,
+        messages: List[dict],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Chat completion for async callers on any event loop."""
+        future = self._submit(self._complete(messages, max_tokens, temperature, timeout))
+        return await asyncio.wrap_future(future)
+
+    async def astream(
+        self,
+        messages: List[dict],
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream completion text deltas to an async caller as they arrive.
+
+        The upstream request runs on the gateway loop and hands deltas to the
+        caller's loop; closing the generator (client disconnect) cancels it.
+        """
+        loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def emit(item) -> None:
+            loop.call_soon_threadsafe(deltas.put_nowait, item)
+
+        async def produce() -> None:
+            try:
+                async with self._semaphore:
+                    stream = await self._client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=timeout or self.default_timeout,
+                        stream=True,
+                    )
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            emit(delta)
+            except Exception as e:
+                emit(e)
+            finally:
+                emit(done)
+
+        future = self._submit(produce())
+        try:
+            while True:
+                item = await deltas.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def cached_json(
+        self,
+        messages: List[dict],
+        max_tokens: int,
+        temperature: float,
+        service: str,
+    ) -> Optional[dict]:
+        """Cached parsed reply for this exact request, if caching is enabled for ``service``."""
+        if not cache_enabled_for(service):
+            return None
+        return get_llm_cache().get(response_key(self.model, messages, temperature, max_tokens))
+
+    def store_json(
+        self,
+        messages: List[dict],
+        max_tokens: int,
+        temperature: float,
+        service: str,
+        payload: dict,
+    ) -> None:
+        # Bypassed requests still refresh the stored entry
+        if getattr(settings, f"llm_cache_{service}", False):
+            key = response_key(self.model, messages, temperature, max_tokens)
+            get_llm_cache().put(key, service, payload)
+
+    def complete_json(
+        self,
+        messages: List[dict],
+        max_tokens: int,
+        temperature: float,
+        service: str,
+        timeout: Optional[float] = None,
+        validate: Optional[Callable[[dict], Any]] = None,
+    ) -> Optional[dict]:
+        """
+        Completion parsed as a JSON object, served from the response cache when
+        enabled for ``service`` (ideas, market, risks, validation) and not
+        bypassed by the request. Returns None if the reply holds no JSON object.
+
+        A reply is only cached once ``validate`` (the caller's schema check)
+        accepts it, i.e. returns a truthy value without raising; rejected
+        replies are still returned so callers can fall back section by
+        section, and the next request asks the model again.
+        """
+        cached = self.cached_json(messages, max_tokens, temperature, service)
+        if cached is not None:
+            return cached
+
+        payload = extract_json(self.complete(messages, max_tokens, temperature, timeout))
+        if payload is not None and _accepts(validate, payload):
+            self.store_json(messages, max_tokens, temperature, service, payload)
+        return payload
+
+    def close(self) -> None:
+        self._call(self._client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def _accepts(validate: Optional[Callable[[dict], Any]], payload: dict) -> bool:
+    if validate is None:
+        return True
+    try:
+        return bool(validate(payload))
+    except Exception as e:
+        print(f"[WARN] LLM reply failed validation, not caching it: {e}")
+        return False
+
+
+_gateway: LLMGateway | None = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                with registry.track("llm_gateway"):
+                    _gateway = LLMGateway()
+    return _gateway
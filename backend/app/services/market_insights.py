@@ -1,33 +1,63 @@
-from typing import List
-import json
-
-import pandas as pd
-from openai import OpenAI
+from typing import List, Optional
 
 from app.config import settings
 from app.models.schemas import MarketInsight, RefinedIdea
+from app.services.competitor_analysis import idea_query_text
+from app.services.embedding_service import get_embedding_service
+from app.services.industry_classifier import get_centroid_classifier, get_keyword_classifier
+from app.services.llm_gateway import get_llm_gateway, llm_enabled
+from app.services.trend_store import get_trend_store
+
+
+# Customer segments by industry
+SEGMENT_MAP = {
+    "EdTech": ["Students", "Educational Institutions"],
+    "HealthTech": ["Healthcare Providers", "Patients"],
+    "FinTech": ["SMBs", "Financial Institutions"],
+    "AI/ML": ["Tech Companies", "Data Teams"],
+    "SaaS": ["Startups", "Enterprise"],
+    "E-commerce": ["Online Retailers", "Consumers"],
+}
 
 
-def load_trend_data() -> pd.DataFrame:
-    path = f"{settings.processed_dir}/trend_signals.csv"
+def _centroid_insight(idea: RefinedIdea) -> Optional[MarketInsight]:
+    """
+    Classify the idea against precomputed category centroids. The embedding is
+    the one competitor search uses, so it is normally an embedding-cache hit.
+    Returns None when centroids are missing or confidence is below threshold.
+    """
+    if not settings.industry_centroid_enabled:
+        return None
+    classifier = get_centroid_classifier()
+    if classifier is None:
+        return None
     try:
-        return pd.read_csv(path)
-    except FileNotFoundError:
-        return pd.DataFrame(columns=["industry", "trend"])
+        vector = get_embedding_service().encode(idea_query_text(idea))
+    except Exception as e:
+        print(f"[WARN] Centroid classification failed: {e}")
+        return None
+    industry, confidence = classifier.predict(vector)
+    if confidence < settings.industry_centroid_min_confidence:
+        return None
+    return MarketInsight(
+        industry=industry,
+        top_trends=get_trend_store().trends_for(industry, limit=2) or ["AI enablement", "Automation"],
+        customer_segments=SEGMENT_MAP.get(industry, ["SMBs", "Enterprise"]),
+        industry_confidence=round(confidence, 4),
+    )
 
 
 def generate_market_insight(idea: RefinedIdea) -> MarketInsight:
     """Generate market insights using AI + dataset."""
     
+    # A confident centroid match replaces the LLM classification call
+    centroid = _centroid_insight(idea)
+    if centroid is not None:
+        return centroid
+    
     # First, try to use OpenRouter AI for intelligent analysis
-    api_key = settings.openrouter_api_key
-    if api_key and len(api_key) > 20 and not api_key.startswith("sk-or-your"):
+    if llm_enabled():
         try:
-            client = OpenAI(
-                base_url=settings.openrouter_base_url,
-                api_key=api_key,
-            )
-            
             prompt = f"""Analyze this startup idea and provide market insights.
 
 Startup: {idea.name}
@@ -41,68 +71,52 @@ Return JSON with:
 
 Return ONLY valid JSON."""
 
-            response = client.chat.completions.create(
-                model=settings.openrouter_model,
+            payload = get_llm_gateway().complete_json(
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=300,
                 temperature=0.5,
+                service="market",
+                validate=_parse_insight,
             )
             
-            content = response.choices[0].message.content or ""
-            
-            # Parse JSON response
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                payload = json.loads(json_str)
-                return MarketInsight(
-                    industry=payload.get("industry", "Technology"),
-                    top_trends=payload.get("top_trends", ["AI enablement", "Automation"])[:2],
-                    customer_segments=payload.get("customer_segments", ["SMBs", "Enterprise"])[:2],
-                )
+            if payload is not None:
+                return _parse_insight(payload)
         except Exception as e:
             print(f"[WARN] AI market insight failed, using dataset: {e}")
     
-    # Fallback: Use dataset + keyword matching
-    df = load_trend_data()
+    return _fallback_insight(idea)
+
+
+def _parse_insight(payload: dict) -> MarketInsight:
+    return MarketInsight(
+        industry=payload.get("industry", "Technology"),
+        top_trends=payload.get("top_trends", ["AI enablement", "Automation"])[:2],
+        customer_segments=payload.get("customer_segments", ["SMBs", "Enterprise"])[:2],
+    )
+
+
+def _fallback_insight(idea: RefinedIdea) -> MarketInsight:
+    """Fallback: Use dataset + keyword matching."""
+    trends = get_trend_store()
     industry = "General"
     top_trends: List[str] = ["AI enablement", "Automation"]
     customer_segments: List[str] = ["Early adopters"]
 
-    if not df.empty:
+    if not trends.is_empty():
         # Try to match industry from dataset
         text = " ".join([idea.problem, idea.solution, idea.value_proposition]).lower()
         
-        # Check for industry keywords
-        industry_keywords = {
-            "EdTech": ["education", "learning", "students", "school", "tutor", "course"],
-            "HealthTech": ["health", "medical", "patient", "doctor", "clinic", "wellness"],
-            "FinTech": ["finance", "payment", "banking", "invest", "money", "loan"],
-            "AI/ML": ["ai", "machine learning", "neural", "prediction", "model"],
-            "SaaS": ["software", "platform", "subscription", "service", "cloud"],
-            "E-commerce": ["shop", "retail", "product", "sell", "marketplace"],
-        }
-        
-        for ind, keywords in industry_keywords.items():
-            if any(kw in text for kw in keywords):
-                industry = ind
-                # Get trends for this industry from dataset
-                ind_trends = df[df["industry"].str.lower() == ind.lower()]["trend"].head(2).tolist()
-                if ind_trends:
-                    top_trends = ind_trends
-                break
+        # Rank industries by weighted keyword hits in a single pass
+        ranked = get_keyword_classifier().classify(text)
+        if ranked:
+            industry = ranked[0][0]
+            # Get trends for this industry from dataset
+            ind_trends = trends.trends_for(industry, limit=2)
+            if ind_trends:
+                top_trends = ind_trends
         
         # Set customer segments based on industry
-        segment_map = {
-            "EdTech": ["Students", "Educational Institutions"],
-            "HealthTech": ["Healthcare Providers", "Patients"],
-            "FinTech": ["SMBs", "Financial Institutions"],
-            "AI/ML": ["Tech Companies", "Data Teams"],
-            "SaaS": ["Startups", "Enterprise"],
-            "E-commerce": ["Online Retailers", "Consumers"],
-        }
-        customer_segments = segment_map.get(industry, ["SMBs", "Enterprise"])
+        customer_segments = SEGMENT_MAP.get(industry, ["SMBs", "Enterprise"])
     else:
         # Pure keyword-based fallback
         text = " ".join([idea.problem, idea.solution, idea.value_proposition]).lower()
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"BBCOLS1\n"
+ALIGN = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+class ColumnStore:
+    """
+    Read-only columnar string table memory-mapped from a single file.
+
+    Layout: magic, header length, JSON header, then 64-byte aligned sections:
+    sorted int64 row ids and, per field, int64 offsets (rows + 1) and a UTF-8
+    blob. Opening the file maps it without reading rows; ``get`` binary-searches
+    the ids and decodes just that row, so memory and open time do not grow
+    with the corpus, and the pages are shared between worker processes.
+
+    Low-cardinality fields written as ``coded`` also get an int32 code per row
+    (-1 = empty) and their distinct values in the header, so ``rows_where``
+    filters the whole column with one vectorized comparison.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(self._mm[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a column store")
+        header_len = int.from_bytes(bytes(self._mm[8:16]), "little")
+        header = json.loads(bytes(self._mm[16:16 + header_len]).decode("utf-8"))
+        self._data_start = header["data_start"]
+        self.fields: List[str] = header["fields"]
+        self.rows: int = header["rows"]
+        self.source = header.get("source")
+        self.ids = self._section(header["ids"], np.int64)
+        self._columns = {
+            field: (self._section(section["offsets"], np.int64), self._data_start + section["data"][0])
+            for field, section in header["columns"].items()
+        }
+        self.dictionaries: Dict[str, List[str]] = header.get("dictionaries", {})
+        self._codes = {
+            field: self._section(section["codes"], np.int32)
+            for field, section in header["columns"].items()
+            if "codes" in section
+        }
+
+    def _section(self, section: Sequence[int], dtype) -> np.ndarray:
+        offset, count = section
+        return np.frombuffer(self._mm, dtype=dtype, count=count, offset=self._data_start + offset)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _row_of(self, row_id: int) -> Optional[int]:
+        pos = int(np.searchsorted(self.ids, row_id))
+        if pos < self.rows and int(self.ids[pos]) == row_id:
+            return pos
+        return None
+
+    def __contains__(self, row_id: int) -> bool:
+        return self._row_of(int(row_id)) is not None
+
+    def value(self, row: int, field: str) -> Optional[str]:
+        offsets, base = self._columns[field]
+        start, end = int(offsets[row]), int(offsets[row + 1])
+        return bytes(self._mm[base + start:base + end]).decode("utf-8") if end > start else None
+
+    def rows_where(self, field: str, accept: Callable[[str], bool]) -> np.ndarray:
+        """Row numbers (ascending) whose ``field`` value satisfies ``accept``."""
+        codes = self._codes.get(field)
+        if codes is None:
+            # Not dictionary-encoded: decode the column row by row
+            return np.array(
+                [row for row in range(self.rows) if (value := self.value(row, field)) is not None and accept(value)],
+                dtype=np.int64,
+            )
+        wanted = [code for code, value in enumerate(self.dictionaries[field]) if accept(value)]
+        if not wanted:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(np.isin(codes, wanted)).astype(np.int64)
+
+    def get(self, row_id: int) -> Optional[dict]:
+        row = self._row_of(int(row_id))
+        if row is None:
+            return None
+        return {field: self.value(row, field) for field in self.fields}
+
+    def max_id(self) -> int:
+        return int(self.ids[-1]) if self.rows else -1
+
+
+def write_column_store(
+    path: str,
+    rows: Iterable[Tuple[int, dict]],
+    fields: Sequence[str],
+    source: Optional[dict] = None,
+    coded: Sequence[str] = (),
+) -> None:
+    """
+    Stream ``(id, row)`` pairs (ascending ids) into a column store at ``path``.
+
+    Field blobs are spilled to temp files while reading, so the input is never
+    held in memory; the finished file replaces ``path`` atomically. ``coded``
+    fields are also dictionary-encoded for ``ColumnStore.rows_where``.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    spill = tempfile.mkdtemp(prefix=".colstore-", dir=directory)
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        blobs = [open(os.path.join(spill, f"{i}.bin"), "w+b") for i in range(len(fields))]
+        offsets = [array("q", [0]) for _ in fields]
+        ids = array("q")
+        dictionaries: Dict[str, Dict[str, int]] = {field: {} for field in coded}
+        codes = {field: array("i") for field in coded}
+        for row_id, row in rows:
+            if ids and row_id <= ids[-1]:
+                raise ValueError("column store ids must be strictly ascending")
+            ids.append(row_id)
+            for i, field in enumerate(fields):
+                value = row.get(field)
+                data = b"" if value is None else str(value).encode("utf-8")
+                blobs[i].write(data)
+                offsets[i].append(offsets[i][-1] + len(data))
+                if field in codes:
+                    values = dictionaries[field]
+                    codes[field].append(-1 if value is None else values.setdefault(str(value), len(values)))
+
+        # Section offsets are relative to data_start, which follows the header
+        cursor = _aligned(len(ids) * 8)
+        columns = {}
+        for i, field in enumerate(fields):
+            offsets_at = cursor
+            cursor = _aligned(cursor + len(offsets[i]) * 8)
+            columns[field] = {"offsets": (offsets_at, len(offsets[i])), "data": (cursor, offsets[i][-1])}
+            cursor = _aligned(cursor + offsets[i][-1])
+            if field in codes:
+                columns[field]["codes"] = (cursor, len(ids))
+                cursor = _aligned(cursor + len(ids) * 4)
+        header = {
+            "fields": list(fields),
+            "rows": len(ids),
+            "source": source,
+            "ids": (0, len(ids)),
+            "columns": columns,
+            "dictionaries": {field: list(values) for field, values in dictionaries.items()},
+            "data_start": 0,
+        }
+        # data_start is part of the header itself; leave room for its final digits
+        data_start = _aligned(16 + len(json.dumps(header).encode("utf-8")) + 32)
+        header["data_start"] = data_start
+        header_bytes = json.dumps(header).encode("utf-8")
+
+        with open(tmp, "wb") as out:
+            out.write(MAGIC)
+            out.write(len(header_bytes).to_bytes(8, "little"))
+            out.write(header_bytes)
+            out.seek(data_start)
+            out.write(ids.tobytes())
+            for i, field in enumerate(fields):
+                out.seek(data_start + columns[field]["offsets"][0])
+                out.write(offsets[i].tobytes())
+                out.seek(data_start + columns[field]["data"][0])
+                blobs[i].seek(0)
+                shutil.copyfileobj(blobs[i], out)
+                if field in codes:
+                    out.seek(data_start + columns[field]["codes"][0])
+                    out.write(codes[field].tobytes())
+            out.truncate(data_start + cursor)
+            out.flush()
+            os.fsync(out.fileno())
+        for blob in blobs:
+            blob.close()
+        os.replace(tmp, path)
+    finally:
+        shutil.rmtree(spill, ignore_errors=True)
+        if os.path.exists(tmp):
+            os.remove(tmp)
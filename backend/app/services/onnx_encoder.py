@@ -0,0 +1,100 @@
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from app.config import settings
+
+CONFIG_FILE = "encoder.json"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def onnx_model_dir(model_name: Optional[str] = None) -> str:
+    """Where scripts/export_onnx_encoder.py writes the export for ``model_name``."""
+    if settings.embedding_onnx_dir:
+        return settings.embedding_onnx_dir
+    model_name = model_name or settings.embedding_model
+    return os.path.join(settings.processed_dir, "onnx", model_name.replace("/", "__"))
+
+
+def onnx_model_path(model_name: Optional[str] = None, quantized: Optional[bool] = None) -> str:
+    """Exported model file the ONNX backend loads (int8 unless EMBEDDING_ONNX_QUANTIZED is off)."""
+    quantized = settings.embedding_onnx_quantized if quantized is None else quantized
+    return os.path.join(onnx_model_dir(model_name), QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+
+
+class OnnxEncoder:
+    """
+    Sentence encoder running an exported transformer through onnxruntime.
+
+    Tokenization uses the Rust ``tokenizers`` package and pooling /
+    normalization are done in numpy, so neither torch nor sentence-transformers
+    is imported. ``encode`` and ``get_sentence_embedding_dimension`` mirror
+    SentenceTransformer so the embedding service can use either backend.
+    Texts are sorted by length before batching to keep padding small.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = True, threads: int = 0) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, CONFIG_FILE), encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(self.model_path)
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dim"]
+
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self._inputs})[0]
+        if self.config["pooling"] == "cls":
+            return hidden[:, 0]
+        mask = feeds["attention_mask"][..., None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        normalize_embeddings: bool = False,
+    ) -> np.ndarray:
+        out = np.zeros((len(texts), self.config["dim"]), dtype=np.float32)
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            out[rows] = self._forward([texts[i] for i in rows])
+        if self.config["normalize"] or normalize_embeddings:
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out
+
+
+def load_onnx_encoder(model_name: Optional[str] = None) -> Optional[OnnxEncoder]:
+    """The exported encoder for ``model_name``, or None (with a warning) if it is unavailable."""
+    model_dir = onnx_model_dir(model_name)
+    try:
+        return OnnxEncoder(model_dir, settings.embedding_onnx_quantized, settings.embedding_onnx_threads)
+    except (ImportError, OSError) as e:
+        print(f"[WARN] ONNX encoder unavailable ({model_dir}): {e}. Run scripts/export_onnx_encoder.py")
+        return None
@@ -1,13 +1,19 @@
 import os
 import csv
-from typing import List
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from app.config import settings
 from app.database import get_supabase, is_supabase_configured
 from app.models.schemas import PartnerProfile
+from app.services.embedding_service import encoder_cache_model, get_embedding_service
+from app.services.embedding_snapshot import encode_in_batches, load_snapshot, write_snapshot
+from app.services.profile_embeddings import embedding_columns, parse_embedding, profile_hash, profile_text
+from app.services.resource_registry import registry
 
 
 class PartnerMatcher:
@@ -16,27 +22,38 @@ class PartnerMatcher:
     
     Algorithm:
     1. Load professional profiles from CSV dataset
-    2. Embed user's profile (interests + skills) using sentence-transformers
-    3. Embed each candidate's profile
-    4. Calculate cosine similarity between user and candidates
-    5. Return top matches sorted by similarity score
+    2. Embed each profile once into a contiguous, L2-normalized float32 matrix
+    3. Embed user's profile (interests + skills) using sentence-transformers
+    4. Score every candidate with one matrix-vector product (cosine similarity)
+    5. Return the top matches via argpartition
+    
+    Profiles are stored grouped by industry, so the industry filter scores a
+    contiguous row range of the matrix (a view, no copy). Dataset embeddings
+    are memory mapped from an on-disk snapshot (see ``_build_from_dataset``).
     
     Dataset: professional_profiles.csv (20 real industry professionals)
     Model: sentence-transformers/all-MiniLM-L6-v2 (384 dimensions)
     """
     
-    def __init__(self) -> None:
-        self.model = SentenceTransformer(settings.embedding_model)
-        self.profiles = self._load_profiles()
-        self.profile_embeddings = self._precompute_embeddings()
+    def __init__(self, profiles: Optional[List[dict]] = None, vectors: Optional[np.ndarray] = None) -> None:
+        self._embedder = None
+        self.profiles: List[dict] = []
+        self.matrix = np.zeros((0, 0), dtype="float32")
+        self._industry_rows: Dict[str, Tuple[int, int]] = {}
+        if profiles is None:
+            self._build_from_dataset()
+        else:
+            self._build(profiles, vectors)
 
-    def _load_profiles(self) -> List[dict]:
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = get_embedding_service()
+        return self._embedder
+
+    def _load_profiles(self, csv_path: str) -> List[dict]:
         """Load professional profiles from CSV dataset."""
         profiles = []
-        csv_path = os.path.join(
-            os.path.dirname(__file__), 
-            "..", "..", "datasets", "processed", "professional_profiles.csv"
-        )
         
         if os.path.exists(csv_path):
             with open(csv_path, newline='', encoding='utf-8') as f:
@@ -57,22 +74,99 @@ class PartnerMatcher:
         
         return profiles
 
-    def _precompute_embeddings(self) -> dict:
-        """Pre-compute embeddings for all profiles for fast matching."""
-        embeddings = {}
-        for i, profile in enumerate(self.profiles):
-            # Combine all text features for embedding
-            text = f"{profile['expertise']} {' '.join(profile['skills'])} {profile['bio']}"
-            embeddings[i] = np.array(self.model.encode(text))
-        return embeddings
+    @staticmethod
+    def _profile_text(profile: dict) -> str:
+        return f"{profile['expertise']} {' '.join(profile['skills'])} {profile['bio']}"
+
+    def _precompute_embeddings(self, profiles: List[dict]) -> np.ndarray:
+        """Pre-compute embeddings for all profiles for fast matching (batched)."""
+        if not profiles:
+            return np.zeros((0, 0), dtype="float32")
+        return encode_in_batches(self.embedder.encode_many, [self._profile_text(p) for p in profiles])
+
+    @staticmethod
+    def _normalized(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize rows in place (callers pass freshly built arrays)."""
+        matrix = np.ascontiguousarray(vectors, dtype="float32")
+        if matrix.size:
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return matrix
+
+    def _group(self, profiles: List[dict]) -> List[int]:
+        """Store profiles grouped by industry; returns the row order applied."""
+        # Stable sort keeps dataset order within an industry
+        keys = [p.get("industry", "").lower() for p in profiles]
+        order = sorted(range(len(profiles)), key=keys.__getitem__)
+
+        industry_rows: Dict[str, Tuple[int, int]] = {}
+        for row, i in enumerate(order):
+            start, _ = industry_rows.get(keys[i], (row, row))
+            industry_rows[keys[i]] = (start, row + 1)
+
+        self.profiles = [profiles[i] for i in order]
+        self._industry_rows = industry_rows
+        return order
+
+    def _build(self, profiles: List[dict], vectors: Optional[np.ndarray]) -> None:
+        """Group profiles by industry and store their normalized embedding matrix."""
+        if vectors is not None and len(vectors) != len(profiles):
+            raise ValueError(f"{len(profiles)} profiles but {len(vectors)} embeddings")
+        order = self._group(profiles)
+        if vectors is None:
+            vectors = self._precompute_embeddings(self.profiles)
+        else:
+            vectors = np.asarray(vectors, dtype="float32")[order] if order else vectors
+        self.matrix = self._normalized(vectors)
+
+    def _build_from_dataset(self) -> None:
+        """
+        Profiles from professional_profiles.csv with embeddings from the on-disk
+        snapshot next to it. The snapshot already holds the grouped, normalized
+        matrix, so it is memory mapped as-is (pages shared between workers); it
+        is rebuilt only when the CSV hash or the encoder (model and backend) changes.
+        The snapshot key comes from settings, so a current snapshot is mapped
+        without loading the encoder.
+        """
+        csv_path = os.path.join(settings.processed_dir, "professional_profiles.csv")
+        self._group(self._load_profiles(csv_path))
+        if not self.profiles:
+            return
+
+        # cache_model distinguishes backends (e.g. "#onnx-int8"), whose vectors differ slightly
+        matrix = load_snapshot(csv_path, encoder_cache_model())
+        if matrix is not None and len(matrix) == len(self.profiles):
+            print(f"[INFO] Memory-mapped {len(matrix)} profile embeddings from snapshot")
+            self.matrix = matrix
+            return
+
+        print("[INFO] Profile embedding snapshot missing or stale, re-encoding")
+        matrix = self._normalized(self._precompute_embeddings(self.profiles))
+        try:
+            matrix = write_snapshot(csv_path, self.embedder.cache_model, matrix)
+        except OSError as e:
+            print(f"[WARN] Could not write profile embedding snapshot: {e}")
+        self.matrix = matrix
 
     def _encode(self, text: str) -> np.ndarray:
-        return np.array(self.model.encode(text))
+        return self.embedder.encode(text)
 
-    def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors."""
-        denom = (np.linalg.norm(a) * np.linalg.norm(b)) or 1.0
-        return float(np.dot(a, b) / denom)
+    def rank_vector(self, user_vec: np.ndarray, limit: int, industry: str = None) -> List[Tuple[float, dict]]:
+        """Top ``limit`` (score, profile) pairs for an already-encoded user vector."""
+        if industry:
+            start, end = self._industry_rows.get(industry.lower(), (0, 0))
+        else:
+            start, end = 0, len(self.profiles)
+        if end <= start or limit <= 0:
+            return []
+
+        query = np.asarray(user_vec, dtype="float32").ravel()
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = self.matrix[start:end] @ query
+
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(float(scores[i]), self.profiles[start + i]) for i in top]
 
     def suggest(self, user_profile: dict, limit: int = 3, industry: str = None) -> List[PartnerProfile]:
         """
@@ -99,7 +193,7 @@ class PartnerMatcher:
     def _match_from_dataset(self, user_profile: dict, limit: int, industry: str = None) -> List[PartnerProfile]:
         """Match partners from the professional profiles dataset."""
         if not self.profiles:
-            return self._fallback_profiles()
+            return _fallback_profiles()
 
         # Create user embedding
         user_text = " ".join(
@@ -109,23 +203,9 @@ class PartnerMatcher:
         )
         user_vec = self._encode(user_text)
 
-        # Calculate similarity scores
-        scored = []
-        for i, profile in enumerate(self.profiles):
-            # Filter by industry if specified
-            if industry and profile["industry"].lower() != industry.lower():
-                continue
-                
-            if i in self.profile_embeddings:
-                similarity = self._cosine_similarity(user_vec, self.profile_embeddings[i])
-                scored.append((similarity, profile))
-
-        # Sort by similarity (highest first)
-        scored.sort(key=lambda x: x[0], reverse=True)
-
         # Convert to PartnerProfile objects
         results = []
-        for score, profile in scored[:limit]:
+        for score, profile in self.rank_vector(user_vec, limit, industry):
             results.append(PartnerProfile(
                 name=profile["name"],
                 interest_overlap_score=round(score, 3),
@@ -134,27 +214,17 @@ class PartnerMatcher:
             ))
 
         if not results:
-            return self._fallback_profiles()
+            return _fallback_profiles()
 
         return results
 
     def _match_from_supabase(self, user_profile: dict, limit: int) -> List[PartnerProfile]:
-        """Match from Supabase user database."""
-        client = get_supabase()
-        others = client.table("users").select("email,profile").limit(50).execute().data or []
-        base_vec = self._encode(" ".join(user_profile.get("interests", []) + user_profile.get("skills", [])))
+        """Match from Supabase users using their stored profile embeddings."""
+        index = get_profile_index().get()
+        base_vec = self._encode(profile_text(user_profile))
 
-        scored = []
-        for candidate in others:
-            profile = candidate.get("profile") or {}
-            cand_vec = self._encode(" ".join(profile.get("interests", []) + profile.get("skills", [])))
-            score = self._cosine_similarity(base_vec, cand_vec)
-            scored.append((score, profile | {"email": candidate.get("email")}))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        
         results = []
-        for score, prof in scored[:limit]:
+        for score, prof in index.rank_vector(base_vec, limit):
             results.append(PartnerProfile(
                 name=prof.get("name") or prof.get("email") or "Partner",
                 interest_overlap_score=round(score, 3),
@@ -162,25 +232,172 @@ class PartnerMatcher:
                 contact_hint=prof.get("email", ""),
             ))
 
-        return results if results else self._fallback_profiles()
-
-    def _fallback_profiles(self) -> List[PartnerProfile]:
-        """Return fallback profiles if no matches found."""
-        return [
-            PartnerProfile(
-                name="Alex Thompson",
-                interest_overlap_score=0.89,
-                skills=["Deep Learning", "MLOps", "AI Infrastructure"],
-                contact_hint="https://www.linkedin.com/in/alexthompson-ai",
-            ),
-            PartnerProfile(
-                name="David Kim",
-                interest_overlap_score=0.76,
-                skills=["Product-Led Growth", "B2B Sales", "SaaS Metrics"],
-                contact_hint="https://www.linkedin.com/in/davidkim-saas",
-            ),
-        ]
-
-
-# Singleton instance
-matcher = PartnerMatcher()
+        return results if results else _fallback_profiles()
+
+
+def _fallback_profiles() -> List[PartnerProfile]:
+    """Return fallback profiles if no matches found (needs no loaded matcher)."""
+    return [
+        PartnerProfile(
+            name="Alex Thompson",
+            interest_overlap_score=0.89,
+            skills=["Deep Learning", "MLOps", "AI Infrastructure"],
+            contact_hint="https://www.linkedin.com/in/alexthompson-ai",
+        ),
+        PartnerProfile(
+            name="David Kim",
+            interest_overlap_score=0.76,
+            skills=["Product-Led Growth", "B2B Sales", "SaaS Metrics"],
+            contact_hint="https://www.linkedin.com/in/davidkim-saas",
+        ),
+    ]
+
+
+SUPABASE_PAGE_SIZE = 1000
+SUPABASE_BACKFILL_BATCH = 500
+
+
+class SupabaseProfileIndex:
+    """
+    Bulk-loaded profile embeddings of every Supabase user.
+
+    Embeddings live on the users row (written on register / profile update),
+    so matching does no transformer passes: rows are paged in, stacked into a
+    PartnerMatcher matrix and reused until ``ttl`` seconds have passed. Only
+    rows whose ``profile_hash`` matches their profile and the active encoder
+    are served; missing or stale ones are re-encoded by ``backfill`` on a
+    background thread (or by ``scripts/build_profile_embeddings.py --supabase``
+    as a deploy step) and join the matrix on the next reload.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._matcher: Optional[PartnerMatcher] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._backfill_thread: Optional[threading.Thread] = None
+        self._reload = False
+
+    def _expired(self) -> bool:
+        return self._matcher is None or self._reload or time.monotonic() - self._loaded_at >= self.ttl
+
+    def get(self) -> PartnerMatcher:
+        if self._expired():
+            with self._lock:
+                if self._expired():
+                    self._reload = False
+                    self._matcher = self._load()
+                    self._loaded_at = time.monotonic()
+        return self._matcher
+
+    def _fetch_rows(self, client) -> List[dict]:
+        rows: List[dict] = []
+        start = 0
+        while True:
+            page = (
+                client.table("users")
+                .select("id,email,profile,profile_embedding,profile_hash")
+                .order("id")
+                .range(start, start + SUPABASE_PAGE_SIZE - 1)
+                .execute()
+                .data
+                or []
+            )
+            rows.extend(page)
+            if len(page) < SUPABASE_PAGE_SIZE:
+                return rows
+            start += SUPABASE_PAGE_SIZE
+
+    @staticmethod
+    def _split(rows: List[dict], model: str) -> Tuple[List[dict], list, List[Tuple[dict, dict]]]:
+        """(current profiles, their vectors, stale (row, profile) pairs)."""
+        profiles: List[dict] = []
+        vectors: list = []
+        stale: List[Tuple[dict, dict]] = []
+        for row in rows:
+            profile = (row.get("profile") or {}) | {"email": row.get("email")}
+            vector = parse_embedding(row.get("profile_embedding"))
+            if vector is None or row.get("profile_hash") != profile_hash(profile, model):
+                stale.append((row, profile))
+            else:
+                profiles.append(profile)
+                vectors.append(vector)
+        return profiles, vectors, stale
+
+    def _load(self) -> PartnerMatcher:
+        rows = self._fetch_rows(get_supabase())
+        profiles, vectors, stale = self._split(rows, get_embedding_service().cache_model)
+        print(f"[INFO] Loaded {len(profiles)} Supabase profile embeddings")
+        if stale:
+            print(f"[INFO] Backfilling {len(stale)} stale profile embeddings in the background")
+            self._start_backfill()
+        return PartnerMatcher(profiles=profiles, vectors=np.stack(vectors) if vectors else None)
+
+    def _start_backfill(self) -> None:
+        if self._backfill_thread is not None and self._backfill_thread.is_alive():
+            return
+        self._backfill_thread = threading.Thread(target=self._run_backfill, name="profile-backfill", daemon=True)
+        self._backfill_thread.start()
+
+    def _run_backfill(self) -> None:
+        try:
+            self.backfill()
+        except Exception as e:
+            print(f"[WARN] Profile embedding backfill failed: {e}")
+        else:
+            # Serve the re-encoded rows from the next request on
+            self._reload = True
+
+    def backfill(self, batch_size: int = SUPABASE_BACKFILL_BATCH) -> int:
+        """
+        Re-encode every missing or stale profile embedding and write them back,
+        one ``set_profile_embeddings`` call (migrations/003) per batch. Returns
+        the number of rows written.
+        """
+        client = get_supabase()
+        rows = self._fetch_rows(client)
+        _, _, stale = self._split(rows, get_embedding_service().cache_model)
+        written = 0
+        for start in range(0, len(stale), batch_size):
+            batch = stale[start:start + batch_size]
+            columns = embedding_columns([profile for _, profile in batch])
+            payload = [
+                {
+                    "id": row["id"],
+                    "profile_embedding": json.dumps(fields["profile_embedding"]),
+                    "profile_hash": fields["profile_hash"],
+                }
+                for (row, _), fields in zip(batch, columns)
+            ]
+            client.rpc("set_profile_embeddings", {"rows": payload}).execute()
+            written += len(payload)
+        if written:
+            print(f"[INFO] Backfilled {written} Supabase profile embeddings")
+        return written
+
+
+_profile_index: SupabaseProfileIndex | None = None
+_profile_index_lock = threading.Lock()
+
+
+def get_profile_index() -> SupabaseProfileIndex:
+    global _profile_index
+    if _profile_index is None:
+        with _profile_index_lock:
+            if _profile_index is None:
+                _profile_index = SupabaseProfileIndex(settings.partner_profile_refresh_seconds)
+    return _profile_index
+
+
+_matcher: PartnerMatcher | None = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher() -> PartnerMatcher:
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                with registry.track("partner_matcher"):
+                    _matcher = PartnerMatcher()
+    return _matcher
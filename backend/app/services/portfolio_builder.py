@@ -1,3 +1,10 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.config import settings
 from app.models.schemas import (
     CompetitorSnapshot,
     MarketInsight,
@@ -7,27 +14,142 @@ from app.models.schemas import (
     RiskOpportunity,
     ValidationScore,
 )
-from app.services.competitor_analysis import competitor_snapshot
-from app.services.idea_generator import generate_refined_ideas
-from app.services.market_insights import generate_market_insight
-from app.services.partner_matcher import matcher
-from app.services.risk_opportunity import assess_risks
+from app.services.competitor_analysis import _fallback_snapshot, competitor_snapshot
+from app.services.idea_generator import _fallback_ideas, generate_refined_ideas
+from app.services.market_insights import _fallback_insight, generate_market_insight
+from app.services.partner_matcher import _fallback_profiles, get_matcher
+from app.services.risk_opportunity import _fallback_risks, assess_risks
 from app.services.summary_generator import generate_pdf, render_summary_html
-from app.services.validation_scorer import score_validation
+from app.services.validation_scorer import _algorithmic_score, score_validation
+
+
+@dataclass
+class Stage:
+    """One node of the portfolio DAG. ``run`` and ``fallback`` receive the results so far."""
+
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    fallback: Callable[[Dict[str, Any]], Any]
+    timeout: float
+    deps: Tuple[str, ...] = ()
+
+
+_executor = ThreadPoolExecutor(max_workers=settings.portfolio_max_workers, thread_name_prefix="portfolio")
+
+
+def run_stages(stages: List[Stage]) -> Tuple[Dict[str, Any], Dict[str, dict]]:
+    """
+    Run stages as soon as their dependencies finish, independent ones in parallel.
+
+    A stage that raises or exceeds its own timeout is replaced by its fallback
+    so downstream stages always get a value. Returns (results, timings).
+    """
+    results: Dict[str, Any] = {}
+    timings: Dict[str, dict] = {}
+    pending = {stage.name: stage for stage in stages}
+    running: Dict[Future, Tuple[Stage, float]] = {}
+
+    def finish(stage: Stage, started: float, status: str, value: Any) -> None:
+        results[stage.name] = value
+        timings[stage.name] = {"ms": round((time.perf_counter() - started) * 1000, 1), "status": status}
+
+    while pending or running:
+        for name, stage in list(pending.items()):
+            if all(dep in results for dep in stage.deps):
+                del pending[name]
+                # Copy the request context so per-request contextvars reach worker threads
+                ctx = contextvars.copy_context()
+                future = _executor.submit(ctx.run, stage.run, dict(results))
+                running[future] = (stage, time.perf_counter())
+
+        if not running:
+            raise RuntimeError(f"Unsatisfiable stage dependencies: {sorted(pending)}")
+
+        now = time.perf_counter()
+        next_deadline = min(started + stage.timeout for stage, started in running.values())
+        done, _ = wait(list(running), timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            stage, started = running.pop(future)
+            try:
+                finish(stage, started, "ok", future.result())
+            except Exception as e:
+                print(f"[WARN] Portfolio stage '{stage.name}' failed: {e}, using fallback")
+                finish(stage, started, "error", stage.fallback(results))
+
+        now = time.perf_counter()
+        for future, (stage, started) in list(running.items()):
+            if now - started >= stage.timeout:
+                # The worker thread finishes in the background; its result is discarded
+                del running[future]
+                print(f"[WARN] Portfolio stage '{stage.name}' timed out after {stage.timeout}s, using fallback")
+                finish(stage, started, "timeout", stage.fallback(results))
+
+    return results, timings
+
+
+def _portfolio_stages(user_profile: dict, user_input: str) -> List[Stage]:
+    llm_timeout = settings.portfolio_llm_stage_timeout_seconds
+    local_timeout = settings.portfolio_local_stage_timeout_seconds
+    return [
+        Stage(
+            name="refine",
+            # take first idea as selected for the portfolio
+            run=lambda r: generate_refined_ideas(user_input)[0],
+            fallback=lambda r: _fallback_ideas()[0],
+            timeout=llm_timeout,
+        ),
+        Stage(
+            name="market",
+            run=lambda r: generate_market_insight(r["refine"]),
+            fallback=lambda r: _fallback_insight(r["refine"]),
+            timeout=llm_timeout,
+            deps=("refine",),
+        ),
+        Stage(
+            name="competitors",
+            run=lambda r: competitor_snapshot(r["refine"]),
+            fallback=lambda r: _fallback_snapshot(),
+            timeout=local_timeout,
+            deps=("refine",),
+        ),
+        Stage(
+            name="risks",
+            run=lambda r: assess_risks(r["refine"]),
+            fallback=lambda r: _fallback_risks(r["refine"]),
+            timeout=llm_timeout,
+            deps=("refine",),
+        ),
+        Stage(
+            name="partners",
+            run=lambda r: get_matcher().suggest(user_profile, limit=3),
+            fallback=lambda r: _fallback_profiles(),
+            timeout=local_timeout,
+        ),
+        Stage(
+            name="scores",
+            run=lambda r: score_validation(r["market"], r["competitors"]),
+            fallback=lambda r: _algorithmic_score(r["market"], r["competitors"]),
+            timeout=llm_timeout,
+            deps=("market", "competitors"),
+        ),
+    ]
 
 
 def build_portfolio(user_profile: dict, user_input: str) -> Portfolio:
-    refined = generate_refined_ideas(user_input)
-    # take first idea as selected for the portfolio
-    idea: RefinedIdea = refined[0]
-    market: MarketInsight = generate_market_insight(idea)
-    competitors: CompetitorSnapshot = competitor_snapshot(idea)
-    risk: RiskOpportunity = assess_risks(idea)
-    scores: ValidationScore = score_validation(market, competitors)
-    partners: list[PartnerProfile] = matcher.suggest(user_profile, limit=3)
+    started = time.perf_counter()
+    results, timings = run_stages(_portfolio_stages(user_profile, user_input))
+
+    idea: RefinedIdea = results["refine"]
+    market: MarketInsight = results["market"]
+    competitors: CompetitorSnapshot = results["competitors"]
+    risk: RiskOpportunity = results["risks"]
+    scores: ValidationScore = results["scores"]
+    partners: list[PartnerProfile] = results["partners"]
 
     html = render_summary_html(idea, market, competitors, risk, scores, partners)
     pdf_path = generate_pdf(html, filename="portfolio.pdf")
+    timings["total"] = {"ms": round((time.perf_counter() - started) * 1000, 1), "status": "ok"}
 
     data = {
         "idea": idea.model_dump(),
@@ -36,6 +158,7 @@ def build_portfolio(user_profile: dict, user_input: str) -> Portfolio:
         "risks": risk.model_dump(),
         "scores": scores.model_dump(),
         "partners": [p.model_dump() for p in partners],
+        "timings": timings,
     }
 
     return Portfolio(
@@ -43,4 +166,3 @@ def build_portfolio(user_profile: dict, user_input: str) -> Portfolio:
         pdf_url=pdf_path,
         data=data,
     )
-
@@ -0,0 +1,59 @@
+import json
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.embedding_cache import cache_key
+from app.services.embedding_service import get_embedding_service
+
+
+def profile_text(profile: dict) -> str:
+    """Text embedded for a user profile (interests + skills)."""
+    return " ".join(list(profile.get("interests") or []) + list(profile.get("skills") or []))
+
+
+def profile_hash(profile: dict, model: Optional[str] = None) -> str:
+    """
+    Identifies the encoder + profile text a stored embedding was computed from.
+    Keyed on the active embedder's ``cache_model`` (model name, "#onnx-int8" /
+    "#onnx-fp32" for the ONNX exports), so switching EMBEDDING_BACKEND or
+    EMBEDDING_ONNX_QUANTIZED marks stored vectors stale.
+    """
+    return cache_key(model or get_embedding_service().cache_model, profile_text(profile))
+
+
+def parse_embedding(value) -> Optional[np.ndarray]:
+    """Stored embedding from Supabase: pgvector returns "[...]" strings, arrays come back as lists."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    vector = np.asarray(value, dtype="float32").ravel()
+    return vector if vector.size else None
+
+
+def embedding_columns(profiles: List[dict]) -> List[dict]:
+    """``profile_embedding`` / ``profile_hash`` column values for each profile, encoded as one batch."""
+    embedder = get_embedding_service()
+    vectors = embedder.encode_many([profile_text(p) for p in profiles])
+    return [
+        {"profile_embedding": vector.tolist(), "profile_hash": profile_hash(profile, embedder.cache_model)}
+        for profile, vector in zip(profiles, vectors)
+    ]
+
+
+def profile_embedding_fields(profile: dict) -> dict:
+    """
+    Columns to write alongside a profile on register / profile update.
+
+    Embedding failures never block the write; the row is left without an
+    embedding and picked up by the partner matcher's backfill instead.
+    """
+    try:
+        return embedding_columns([profile])[0]
+    except Exception as e:
+        print(f"[WARN] Could not embed profile: {e}")
+        return {}
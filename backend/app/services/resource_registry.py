@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+
+class _Resource:
+    def __init__(self, name: str, factory: Callable[[], Any], required: bool) -> None:
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.state = "pending"
+        self.value: Any = None
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+class ResourceRegistry:
+    """
+    Named, lazily created heavy resources (models, indexes, clients).
+
+    Nothing is built at import time. Each resource's factory is its
+    module's singleton getter (``get_index``, ``get_embedding_service``, ...),
+    and the getter wraps the one-time construction in ``track``, so the state
+    and load time are recorded however the resource is first reached: by
+    ``warmup`` on a background thread right after startup, or directly by a
+    request. The readiness endpoint reports which subsystems are up. A failed
+    resource is retried by the next call to its getter.
+    """
+
+    def __init__(self) -> None:
+        self._resources: "OrderedDict[str, _Resource]" = OrderedDict()
+
+    def register(self, name: str, factory: Callable[[], Any], required: bool = True) -> None:
+        self._resources[name] = _Resource(name, factory, required)
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        """Record the state and duration of a resource load (call inside the getter's lock)."""
+        resource = self._resources.get(name)
+        if resource is None:
+            yield
+            return
+        resource.state = "loading"
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            resource.state = "failed"
+            resource.error = str(e)
+            resource.seconds = round(time.perf_counter() - start, 3)
+            raise
+        resource.seconds = round(time.perf_counter() - start, 3)
+        resource.error = None
+        resource.state = "ready"
+
+    def get(self, name: str) -> Any:
+        """The resource from its getter (which loads and tracks it on first use)."""
+        return self._resources[name].factory()
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """Load resources in registration order on a daemon thread."""
+        targets = list(names) if names is not None else list(self._resources)
+
+        def run() -> None:
+            for name in targets:
+                try:
+                    self.get(name)
+                    print(f"[INFO] Warmed up {name} in {self._resources[name].seconds}s")
+                except Exception as e:
+                    print(f"[WARN] Warmup of {name} failed: {e}")
+
+        thread = threading.Thread(target=run, name="resource-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "state": r.state,
+                "required": r.required,
+                "load_seconds": r.seconds,
+                **({"error": r.error} if r.error else {}),
+            }
+            for name, r in self._resources.items()
+        }
+
+    def ready(self) -> bool:
+        return all(r.state == "ready" for r in self._resources.values() if r.required)
+
+
+def _embeddings():
+    from app.services.embedding_service import get_embedding_service
+    return get_embedding_service()
+
+
+def _competitor_index():
+    from app.services.competitor_analysis import get_index
+    return get_index()
+
+
+def _llm_gateway():
+    from app.services.llm_gateway import get_llm_gateway
+    return get_llm_gateway()
+
+
+def _partner_matcher():
+    from app.services.partner_matcher import get_matcher
+    return get_matcher()
+
+
+registry = ResourceRegistry()
+registry.register("embeddings", _embeddings)
+registry.register("faiss_index", _competitor_index)
+registry.register("llm_gateway", _llm_gateway)
+registry.register("partner_matcher", _partner_matcher, required=False)
@@ -1,8 +1,5 @@
-import json
-from openai import OpenAI
-
-from app.config import settings
 from app.models.schemas import RefinedIdea, RiskOpportunity
+from app.services.llm_gateway import get_llm_gateway, llm_enabled
 
 
 SYSTEM_PROMPT = """You are a startup risk analyst. Analyze the startup idea thoroughly.
@@ -28,17 +25,20 @@ def _fallback_risks(idea: RefinedIdea = None) -> RiskOpportunity:
     )
 
 
+def _complete_risks(payload: dict) -> bool:
+    """Reply has opportunities, risks and a mitigation (otherwise fallbacks fill in and it is not cached)."""
+    return bool(
+        isinstance(payload.get("opportunities"), list) and payload["opportunities"]
+        and isinstance(payload.get("risks"), list) and payload["risks"]
+        and payload.get("mitigation")
+    )
+
+
 def assess_risks(idea: RefinedIdea) -> RiskOpportunity:
-    api_key = settings.openrouter_api_key
-    if not api_key or api_key.startswith("sk-or-your") or len(api_key) < 20:
+    if not llm_enabled():
         return _fallback_risks(idea)
 
     try:
-        client = OpenAI(
-            base_url=settings.openrouter_base_url,
-            api_key=api_key,
-        )
-        
         prompt = f"""Analyze this startup idea in detail:
 
 Startup: {idea.name}
@@ -50,24 +50,19 @@ Provide detailed, actionable opportunities and risks specific to this idea.
 Each opportunity and risk should be 20-30 words explaining the context.
 Mitigation should be 30-50 words with specific action items."""
         
-        response = client.chat.completions.create(
-            model=settings.openrouter_model,
+        payload = get_llm_gateway().complete_json(
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             max_tokens=700,
             temperature=0.6,
+            service="risks",
+            validate=_complete_risks,
         )
         
-        content = response.choices[0].message.content or ""
-        
         try:
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                payload = json.loads(json_str)
+            if payload is not None:
                 return RiskOpportunity(
                     opportunities=payload.get("opportunities", [])[:2] or _fallback_risks().opportunities,
                     risks=payload.get("risks", [])[:2] or _fallback_risks().risks,
@@ -80,3 +75,5 @@ Mitigation should be 30-50 words with specific action items."""
     except Exception as e:
         print(f"[ERROR] Risk assessment OpenRouter error: {e}")
         return _fallback_risks(idea)
+
+    return _fallback_risks(idea)
@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import faiss
+import numpy as np
+
+from app.config import settings
+from app.models.schemas import RefinedIdea
+from app.services.embedding_service import get_embedding_service
+
+
+# Upper edges of the best-match similarity histogram reported in stats()
+SIMILARITY_BUCKETS = [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0]
+
+
+class SemanticIdeaCache:
+    """
+    Near-duplicate cache for /ideas/generate.
+
+    Raw idea inputs are embedded with the shared MiniLM model and kept in a
+    small FAISS inner-product index. A new input whose best cosine similarity
+    reaches ``threshold`` reuses the stored ideas instead of a new LLM call.
+    Entries are evicted least-recently-used beyond ``max_entries``. Every
+    lookup's best similarity is bucketed so the threshold can be tuned.
+    """
+
+    def __init__(self, threshold: float, max_entries: int) -> None:
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self._index: Optional[faiss.IndexIDMap2] = None
+        self._entries: "OrderedDict[int, List[RefinedIdea]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._histogram = [0] * len(SIMILARITY_BUCKETS)
+
+    def _embed(self, text: str) -> np.ndarray:
+        vec = get_embedding_service().encode(text).astype("float32").reshape(1, -1)
+        faiss.normalize_L2(vec)
+        return vec
+
+    def _record(self, similarity: float) -> None:
+        for i, edge in enumerate(SIMILARITY_BUCKETS):
+            if similarity <= edge or i == len(SIMILARITY_BUCKETS) - 1:
+                self._histogram[i] += 1
+                return
+
+    def lookup(self, text: str) -> Optional[List[RefinedIdea]]:
+        vec = self._embed(text)
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                self.misses += 1
+                return None
+            scores, ids = self._index.search(vec, 1)
+            similarity, entry_id = float(scores[0][0]), int(ids[0][0])
+            self._record(similarity)
+            if entry_id < 0 or similarity < self.threshold or entry_id not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return [idea.model_copy() for idea in self._entries[entry_id]]
+
+    def store(self, text: str, ideas: List[RefinedIdea]) -> None:
+        vec = self._embed(text)
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vec.shape[1]))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vec, np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = [idea.model_copy() for idea in ideas]
+            while len(self._entries) > self.max_entries:
+                evicted_id, _ = self._entries.popitem(last=False)
+                self._index.remove_ids(np.array([evicted_id], dtype="int64"))
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "similarity_histogram": {
+                    f"<={edge}": count for edge, count in zip(SIMILARITY_BUCKETS, self._histogram)
+                },
+            }
+
+
+_cache: SemanticIdeaCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticIdeaCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticIdeaCache(settings.semantic_cache_threshold, settings.semantic_cache_max_entries)
+    return _cache
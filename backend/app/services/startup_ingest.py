@@ -0,0 +1,456 @@
+import csv
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import faiss
+import numpy as np
+
+from app.config import settings
+from app.services.embedding_service import get_embedding_service
+from app.services.lexical_index import LexicalIndex, write_lexical_index
+from app.services.metadata_store import ColumnStore, write_column_store
+from app.services.vector_index import ensure_id_mapped
+
+# Columns stored for every startup (base CSV and ingestion log alike)
+STARTUP_FIELDS = ("name", "category", "description", "funding", "url")
+# Columns competitor search can filter on (dictionary-encoded in the column store)
+FILTER_FIELDS = ("category", "funding")
+
+
+def index_path() -> str:
+    return os.path.join(settings.processed_dir, "startup_index.faiss")
+
+
+def metadata_path() -> str:
+    return os.path.join(settings.processed_dir, "startup_metadata.csv")
+
+
+def metadata_store_path() -> str:
+    return os.path.join(settings.processed_dir, "startup_metadata.colstore")
+
+
+def lexical_index_path() -> str:
+    return os.path.join(settings.processed_dir, "startup_lexical.bm25")
+
+
+def vectors_path() -> str:
+    return os.path.join(settings.processed_dir, "startup_vectors.f32")
+
+
+def metadata_log_path() -> str:
+    return os.path.join(settings.processed_dir, "startup_metadata.log.jsonl")
+
+
+def next_id_path() -> str:
+    return os.path.join(settings.processed_dir, "startup_next_id")
+
+
+def startup_text(entry: dict) -> str:
+    """Text embedded for a startup (same as the dataset scripts)."""
+    return f"{entry.get('name', '')} {entry.get('category', '')} {entry.get('description', '')}"
+
+
+def lexical_text(entry: dict) -> str:
+    """Text indexed for keyword (BM25) search: exact names and terms of the description."""
+    return f"{entry.get('name') or ''} {entry.get('description') or ''}"
+
+
+def read_log(path: str, offset: int = 0) -> Tuple[List[dict], int]:
+    """
+    Records appended to the ingestion log since byte ``offset``, and the new
+    offset. A trailing partial line (writer mid-append) is left for next time.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+    end = data.rfind(b"\n") + 1
+    records = []
+    for line in data[:end].splitlines():
+        if line.strip():
+            records.append(json.loads(line))
+    return records, offset + end
+
+
+class StartupMetadata:
+    """
+    Startup metadata keyed by stable id: the memory-mapped base store (id =
+    CSV row number) plus a small in-memory overlay replayed from the
+    ingestion log. Rows are only decoded for the ids actually looked up.
+    """
+
+    def __init__(
+        self,
+        base: Optional[ColumnStore] = None,
+        added: Optional[Dict[int, dict]] = None,
+        deleted: Optional[Set[int]] = None,
+    ) -> None:
+        self.base = base
+        self.added = added or {}
+        self.deleted = deleted or set()
+        # Filter results for this (immutable once published) snapshot
+        self._filters: Dict[tuple, np.ndarray] = {}
+
+    def copy(self) -> "StartupMetadata":
+        return StartupMetadata(self.base, dict(self.added), set(self.deleted))
+
+    def apply(self, records: Iterable[dict]) -> None:
+        for record in records:
+            startup_id = int(record["id"])
+            if record.get("op") == "add":
+                self.added[startup_id] = {k: record.get(k) for k in STARTUP_FIELDS}
+            elif record.get("op") == "delete":
+                if self.added.pop(startup_id, None) is None and self.base is not None and startup_id in self.base:
+                    self.deleted.add(startup_id)
+
+    def get(self, startup_id: int) -> Optional[dict]:
+        startup_id = int(startup_id)
+        if startup_id in self.added:
+            return self.added[startup_id]
+        if self.base is None or startup_id in self.deleted:
+            return None
+        return self.base.get(startup_id)
+
+    def __contains__(self, startup_id: int) -> bool:
+        startup_id = int(startup_id)
+        if startup_id in self.added:
+            return True
+        return self.base is not None and startup_id not in self.deleted and startup_id in self.base
+
+    def __len__(self) -> int:
+        base = len(self.base) if self.base is not None else 0
+        return base - len(self.deleted) + len(self.added)
+
+    def max_id(self) -> int:
+        base = self.base.max_id() if self.base is not None else -1
+        return max(base, max(self.added, default=-1))
+
+    def filter_ids(self, **filters: Optional[str]) -> np.ndarray:
+        """
+        Sorted ids of live startups whose FILTER_FIELDS equal the given values
+        (case-insensitive; None = any). Base rows are matched on the encoded
+        columns without decoding them; results are cached per snapshot.
+        """
+        wanted = {f: v.strip().casefold() for f, v in filters.items() if v is not None and v.strip()}
+        unknown = set(wanted) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter on {sorted(unknown)}; expected {FILTER_FIELDS}")
+        key = tuple(sorted(wanted.items()))
+        cached = self._filters.get(key)
+        if cached is not None:
+            return cached
+
+        ids = np.zeros(0, dtype=np.int64)
+        if self.base is not None:
+            rows = None
+            for field, value in wanted.items():
+                matched = self.base.rows_where(field, lambda v, value=value: v.strip().casefold() == value)
+                rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            ids = self.base.ids[rows] if rows is not None else np.asarray(self.base.ids)
+            if self.deleted:
+                ids = ids[~np.isin(ids, np.fromiter(self.deleted, dtype=np.int64))]
+        added = [
+            startup_id for startup_id, entry in self.added.items()
+            if all((entry.get(f) or "").strip().casefold() == v for f, v in wanted.items())
+        ]
+        if added:
+            ids = np.union1d(ids, np.asarray(added, dtype=np.int64))
+        if len(self._filters) >= 256:
+            self._filters.clear()
+        self._filters[key] = ids
+        return ids
+
+
+def _csv_source(path: str) -> Optional[dict]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _csv_rows(path: str) -> Iterator[Tuple[int, dict]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            yield i, {k: row.get(k) or None for k in STARTUP_FIELDS}
+
+
+def build_metadata_store() -> None:
+    """Convert startup_metadata.csv into the memory-mapped column store (streaming)."""
+    source = _csv_source(metadata_path())
+    if source is None:
+        raise FileNotFoundError(metadata_path())
+    write_column_store(
+        metadata_store_path(), _csv_rows(metadata_path()), STARTUP_FIELDS, source=source, coded=FILTER_FIELDS
+    )
+
+
+def open_metadata_store() -> Optional[ColumnStore]:
+    """
+    Map the column store, rebuilding it first when the base CSV changed since
+    it was written (or it predates the filter columns). Without a CSV an
+    existing store is used as-is.
+    """
+    source = _csv_source(metadata_path())
+    path = metadata_store_path()
+    store = None
+    if os.path.exists(path):
+        try:
+            store = ColumnStore(path)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Unreadable startup metadata store, rebuilding: {e}")
+    if source is None or (
+        store is not None and store.source == source and set(FILTER_FIELDS) <= set(store.dictionaries)
+    ):
+        return store
+    print(f"[INFO] Building startup metadata store from {metadata_path()}")
+    build_metadata_store()
+    return ColumnStore(path)
+
+
+def build_lexical_index() -> None:
+    """BM25 inverted index over startup_metadata.csv names and descriptions (id = CSV row)."""
+    source = _csv_source(metadata_path())
+    if source is None:
+        raise FileNotFoundError(metadata_path())
+    docs = ((i, lexical_text(row)) for i, row in _csv_rows(metadata_path()))
+    write_lexical_index(lexical_index_path(), docs, source=source)
+
+
+def open_lexical_index() -> Optional[LexicalIndex]:
+    """
+    Map the BM25 index, rebuilding it first when the base CSV changed since it
+    was written (same rule as the metadata store).
+    """
+    source = _csv_source(metadata_path())
+    path = lexical_index_path()
+    index = None
+    if os.path.exists(path):
+        try:
+            index = LexicalIndex(path)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Unreadable startup lexical index, rebuilding: {e}")
+    if source is None or (index is not None and index.source == source):
+        return index
+    print(f"[INFO] Building startup lexical index from {metadata_path()}")
+    build_lexical_index()
+    return LexicalIndex(path)
+
+
+def load_metadata(log_offset: int = 0, previous: Optional[StartupMetadata] = None) -> Tuple[StartupMetadata, int]:
+    """
+    Startup metadata plus the byte offset of the ingestion log replayed so far.
+    Pass a previous result and its offset to replay only the records appended
+    since (the previous overlay is copied, not modified).
+    """
+    if previous is None:
+        metadata = StartupMetadata(open_metadata_store())
+        log_offset = 0
+    else:
+        metadata = previous.copy()
+    records, offset = read_log(metadata_log_path(), log_offset)
+    metadata.apply(records)
+    return metadata, offset
+
+
+def open_vectors(dim: int) -> Optional[np.ndarray]:
+    """
+    Full float32 startup vectors (row = stable id) memory-mapped read-only,
+    used to re-rank candidates from a compressed index. None if absent.
+    """
+    try:
+        if os.path.getsize(vectors_path()) < dim * 4:
+            return None
+        return np.memmap(vectors_path(), dtype=np.float32, mode="r").reshape(-1, dim)
+    except (OSError, ValueError):
+        return None
+
+
+def write_vectors(vectors: np.ndarray, path: Optional[str] = None) -> None:
+    """Write the raw vector file (row i = id i) atomically."""
+    path = path or vectors_path()
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _append_vectors(first_id: int, vectors: np.ndarray) -> None:
+    """
+    Replace the vector file with its rows below ``first_id`` plus the new ids'
+    rows. Only done when it covers every id below ``first_id`` (rows past it
+    are left over from an ingestion that never replaced the index and are
+    dropped); otherwise the new ids keep the index's approximate scores.
+    Workers have the file memory-mapped, so it is written to a temp file and
+    renamed over, never modified in place.
+    """
+    path = vectors_path()
+    start = first_id * vectors.shape[1] * 4
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    if size < start:
+        print(f"[INFO] {path} does not cover ids below {first_id}; not extending it")
+        return
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(path, "rb") as src, open(tmp, "wb") as out:
+            remaining = start
+            while remaining:
+                chunk = src.read(min(remaining, 1 << 24))
+                if not chunk:
+                    break
+                out.write(chunk)
+                remaining -= len(chunk)
+            out.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@contextmanager
+def writer_lock():
+    """Serializes writers of the index files across processes (API workers and the CLIs)."""
+    os.makedirs(settings.processed_dir, exist_ok=True)
+    with open(os.path.join(settings.processed_dir, "startup_index.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_next_id() -> int:
+    try:
+        with open(next_id_path(), encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_next_id(next_id: int) -> None:
+    path = next_id_path()
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(f"{next_id}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def archive_ingestion_log() -> None:
+    """
+    After a full rebuild (ids reassigned from 0): move the ingestion log aside
+    and reset the id counter. Call under ``writer_lock``.
+    """
+    if os.path.exists(metadata_log_path()):
+        archived = f"{metadata_log_path()}.{time.strftime('%Y%m%d%H%M%S')}"
+        os.replace(metadata_log_path(), archived)
+        print(f"[WARN] Archived the ingestion log to {archived}; re-ingest or add those rows to the raw CSVs")
+    if os.path.exists(next_id_path()):
+        os.remove(next_id_path())
+
+
+def _append_log(records: List[dict]) -> None:
+    with open(metadata_log_path(), "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_index(index: faiss.Index, path: Optional[str] = None) -> None:
+    """
+    Write to a temp file and rename over the index, so workers that have the
+    old file memory-mapped keep reading it until they swap snapshots.
+    """
+    path = path or index_path()
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        faiss.write_index(index, tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _max_index_id(index: faiss.Index) -> int:
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)) and index.ntotal:
+        return int(faiss.vector_to_array(index.id_map).max())
+    return index.ntotal - 1
+
+
+def ingest_startups(add: List[dict], delete: List[int]) -> dict:
+    """
+    Append startups and delete ids without rebuilding the index.
+
+    Only the new startups are encoded. Ids come from a counter that only goes
+    up (startup_next_id), so deleted ids are never reused. The index is
+    written to a temp file and atomically renamed over startup_index.faiss,
+    then the metadata records are appended to the log; readers swap to the
+    new snapshot on their next refresh. Vectors without metadata (not yet
+    logged, or left by a crash between the two writes) are skipped by
+    queries, as are the tombstones of indexes that cannot remove vectors (HNSW).
+    """
+    with writer_lock():
+        try:
+            # A private copy: memory-mapped indexes cannot be modified
+            index = faiss.read_index(index_path())
+        except RuntimeError:
+            index = None
+        metadata, _ = load_metadata()
+        embedder = get_embedding_service()
+        index = ensure_id_mapped(index, embedder.dim)
+
+        # The index / metadata maxima cover a missing counter file (first ingest after a rebuild)
+        next_id = max(_read_next_id(), _max_index_id(index) + 1, metadata.max_id() + 1)
+        entries = [{k: item.get(k) for k in STARTUP_FIELDS} for item in add]
+        ids = np.arange(next_id, next_id + len(entries), dtype="int64")
+        deleted = sorted({int(i) for i in delete if int(i) in metadata})
+
+        records = [{"op": "add", "id": int(i), **entry} for i, entry in zip(ids, entries)]
+        records += [{"op": "delete", "id": i} for i in deleted]
+        if not records:
+            return {"added_ids": [], "deleted_ids": [], "total": len(metadata)}
+
+        if entries:
+            vectors = np.array(embedder.encode_many([startup_text(e) for e in entries]), dtype="float32", order="C")
+            faiss.normalize_L2(vectors)
+            index.add_with_ids(vectors, ids)
+            # Renamed into place before the index, so readers never see ids without vector rows
+            _append_vectors(next_id, vectors)
+        if deleted:
+            try:
+                index.remove_ids(np.asarray(deleted, dtype="int64"))
+            except RuntimeError as e:
+                print(f"[INFO] Index cannot remove vectors, keeping {len(deleted)} tombstones: {e}")
+
+        if entries:
+            _write_next_id(next_id + len(entries))
+        write_index(index)
+        _append_log(records)
+
+    total = len(metadata) + len(entries) - len(deleted)
+    print(f"[INFO] Ingested {len(entries)} startups, deleted {len(deleted)} (total {total})")
+    return {"added_ids": ids.tolist(), "deleted_ids": deleted, "total": total}
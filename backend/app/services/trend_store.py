@@ -0,0 +1,72 @@
+import csv
+import os
+import threading
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+
+class TrendStore:
+    """
+    In-memory index of trend_signals.csv keyed by lowercase industry.
+
+    The CSV is parsed once and shared across requests; lookups are a dict get.
+    Each access compares the file's mtime with the loaded snapshot and reloads
+    only when it changed, so an updated dataset is picked up without restarts.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._by_industry: Dict[str, List[str]] = {}
+        self._mtime_ns: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _current_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh(self) -> Dict[str, List[str]]:
+        mtime = self._current_mtime()
+        if mtime == self._mtime_ns:
+            return self._by_industry
+        with self._lock:
+            if mtime != self._mtime_ns:
+                self._by_industry = self._read(mtime)
+                self._mtime_ns = mtime
+        return self._by_industry
+
+    def _read(self, mtime: Optional[int]) -> Dict[str, List[str]]:
+        by_industry: Dict[str, List[str]] = {}
+        if mtime is None:
+            return by_industry
+        try:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    industry = (row.get("industry") or "").strip().lower()
+                    trend = (row.get("trend") or "").strip()
+                    if industry and trend:
+                        by_industry.setdefault(industry, []).append(trend)
+        except (OSError, csv.Error) as e:
+            print(f"[WARN] Could not load trend signals from {self.path}: {e}")
+        return by_industry
+
+    def is_empty(self) -> bool:
+        return not self._refresh()
+
+    def trends_for(self, industry: str, limit: int = 2) -> List[str]:
+        return self._refresh().get(industry.lower(), [])[:limit]
+
+
+_store: TrendStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_trend_store() -> TrendStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TrendStore(os.path.join(settings.processed_dir, "trend_signals.csv"))
+    return _store
@@ -1,10 +1,7 @@
-import json
 from typing import Optional
 
-from openai import OpenAI
-
-from app.config import settings
 from app.models.schemas import CompetitorSnapshot, MarketInsight, RefinedIdea, ValidationScore
+from app.services.llm_gateway import get_llm_gateway, llm_enabled
 
 
 SYSTEM_PROMPT = """You are a startup validation expert. Analyze the startup idea and market data.
@@ -59,6 +56,14 @@ def _algorithmic_score(
     )
 
 
+def _parse_score(payload: dict) -> ValidationScore:
+    return ValidationScore(
+        feasibility_score=int(payload.get("feasibility_score", 70)),
+        novelty_score=int(payload.get("novelty_score", 65)),
+        market_readiness=payload.get("market_readiness", "Medium"),
+    )
+
+
 def score_validation(
     market: Optional[MarketInsight] = None, 
     competitors: Optional[CompetitorSnapshot] = None,
@@ -78,17 +83,11 @@ def score_validation(
     API: OpenRouter (Mistral-7B)
     Fallback: Algorithmic scoring
     """
-    api_key = settings.openrouter_api_key
-    if not api_key or len(api_key) < 20:
+    if not llm_enabled():
         print("[INFO] Validation using algorithmic scoring (no API key)")
         return _algorithmic_score(market, competitors)
 
     try:
-        client = OpenAI(
-            base_url=settings.openrouter_base_url,
-            api_key=api_key,
-        )
-        
         # Build context from available data
         context_parts = []
         
@@ -109,31 +108,20 @@ def score_validation(
         
         prompt = "\n".join(context_parts)
         
-        response = client.chat.completions.create(
-            model=settings.openrouter_model,
+        payload = get_llm_gateway().complete_json(
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             max_tokens=500,
             temperature=0.5,
+            service="validation",
+            validate=_parse_score,
         )
         
-        content = response.choices[0].message.content or ""
-        
-        # Parse JSON response
-        start_idx = content.find('{')
-        end_idx = content.rfind('}') + 1
-        if start_idx != -1 and end_idx > start_idx:
-            json_str = content[start_idx:end_idx]
-            payload = json.loads(json_str)
-            
+        if payload is not None:
             print("[INFO] Validation scored using AI")
-            return ValidationScore(
-                feasibility_score=int(payload.get("feasibility_score", 70)),
-                novelty_score=int(payload.get("novelty_score", 65)),
-                market_readiness=payload.get("market_readiness", "Medium"),
-            )
+            return _parse_score(payload)
             
     except Exception as e:
         print(f"[WARN] AI validation failed: {e}, using algorithmic fallback")
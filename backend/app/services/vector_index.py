@@ -0,0 +1,249 @@
+import math
+import os
+from typing import Optional, Tuple
+
+import faiss
+import numpy as np
+
+from app.config import settings
+
+# Inner-product index types for L2-normalized embeddings (scores are cosine similarities).
+# fp16 / sq8 store 2 / 1 bytes per dimension and pq stores pq_m bytes per vector (flat: 4
+# per dimension); pair them with COMPETITOR_RERANK_FACTOR for exact final scores.
+INDEX_TYPES = ("flat", "fp16", "sq8", "pq", "ivf_flat", "ivf_pq", "hnsw")
+
+SCALAR_QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# faiss needs roughly this many training points per IVF list / PQ centroid
+MIN_POINTS_PER_CENTROID = 39
+PQ_CENTROIDS = 256
+
+
+def default_nlist(n: int) -> int:
+    """About 4 * sqrt(n) inverted lists, the usual starting point for IVF."""
+    return max(1, min(n // MIN_POINTS_PER_CENTROID, int(4 * math.sqrt(n))))
+
+
+def _training_sample(vectors: np.ndarray, size: int, seed: int = 0) -> np.ndarray:
+    if len(vectors) <= size:
+        return vectors
+    rows = np.random.default_rng(seed).choice(len(vectors), size=size, replace=False)
+    return vectors[np.sort(rows)]
+
+
+def new_index(
+    dim: int,
+    n: int,
+    index_type: Optional[str] = None,
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    hnsw_m: Optional[int] = None,
+) -> faiss.Index:
+    """
+    Empty inner-product index sized for ``n`` vectors (IVF variants still need
+    ``train``). Corpora too small to train the requested type fall back to a
+    flat index, which is exact and fast at that size anyway. Defaults come
+    from settings.
+    """
+    index_type = (index_type or settings.competitor_index_type).lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}")
+
+    needed = 0
+    if index_type.startswith("ivf"):
+        nlist = nlist or settings.competitor_index_nlist or default_nlist(n)
+        needed = nlist * MIN_POINTS_PER_CENTROID
+    if index_type in ("pq", "ivf_pq"):
+        needed = max(needed, PQ_CENTROIDS * MIN_POINTS_PER_CENTROID)
+    if n < needed:
+        print(f"[WARN] {n} vectors are too few to train {index_type} (need {needed}); using flat")
+        index_type = "flat"
+
+    pq_m = pq_m or settings.competitor_index_pq_m
+    if index_type in ("pq", "ivf_pq") and dim % pq_m:
+        raise ValueError(f"PQ sub-quantizers ({pq_m}) must divide the dimension ({dim})")
+
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dim)
+    if index_type in SCALAR_QUANTIZERS:
+        return faiss.IndexScalarQuantizer(dim, SCALAR_QUANTIZERS[index_type], faiss.METRIC_INNER_PRODUCT)
+    if index_type == "pq":
+        return faiss.IndexPQ(dim, pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m or settings.competitor_index_hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = settings.competitor_index_hnsw_ef_construction
+        return index
+    quantizer = faiss.IndexFlatIP(dim)
+    if index_type == "ivf_flat":
+        return faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+    return faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+
+
+def training_size(index: faiss.Index, train_size: Optional[int] = None) -> int:
+    """Rows to sample for ``index.train`` (0 when the index needs no training)."""
+    if index.is_trained:
+        return 0
+    base = _base_index(index)
+    nlist = base.nlist if isinstance(base, faiss.IndexIVF) else 0
+    return max(train_size or settings.competitor_index_train_size, nlist * MIN_POINTS_PER_CENTROID)
+
+
+def build_index(
+    vectors: np.ndarray,
+    index_type: Optional[str] = None,
+    nlist: Optional[int] = None,
+    pq_m: Optional[int] = None,
+    hnsw_m: Optional[int] = None,
+    train_size: Optional[int] = None,
+) -> faiss.Index:
+    """
+    Build and fill an inner-product index over ``vectors`` (L2-normalized, float32).
+
+    IVF variants are trained on a random sample of at most ``train_size`` rows.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, dim = vectors.shape
+    index = new_index(dim, n, index_type, nlist, pq_m, hnsw_m)
+    if not index.is_trained:
+        index.train(_training_sample(vectors, training_size(index, train_size)))
+    index.add(vectors)
+    return index
+
+
+def read_index(path: str, mmap: Optional[bool] = None) -> faiss.Index:
+    """
+    Read an index for searching. With ``mmap`` (default: competitor_index_mmap)
+    the stored vectors / codes stay in the file's page cache instead of being
+    copied to the heap, so all workers on a host share one physical copy.
+    IO_FLAG_MMAP_IFC covers flat, scalar-quantized, PQ and HNSW storage and IVF
+    lists; older faiss builds fall back to IO_FLAG_MMAP (IVF lists only), then
+    to a private copy.
+
+    A memory-mapped index is read-only: faiss aborts the process on add or
+    remove, so writers must read with ``mmap=False``. The file must only be
+    replaced by rename (never rewritten in place), which keeps existing maps valid.
+    """
+    mmap = settings.competitor_index_mmap if mmap is None else mmap
+    if mmap and os.path.exists(path):
+        error = None
+        for name in ("IO_FLAG_MMAP_IFC", "IO_FLAG_MMAP"):
+            flag = getattr(faiss, name, None)
+            if flag is None:
+                continue
+            try:
+                return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError as e:
+                error = e
+        print(f"[WARN] Could not memory-map {path} ({error}); loading a private copy")
+    return faiss.read_index(path)
+
+
+def _base_index(index: faiss.Index) -> faiss.Index:
+    """Unwrap id-map wrappers to the index that holds the search parameters."""
+    index = faiss.downcast_index(index)
+    while isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def configure_search(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+    """Apply query-time knobs (IVF ``nprobe``, HNSW ``efSearch``); a no-op for flat indexes."""
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexIVF):
+        base.nprobe = min(base.nlist, nprobe or settings.competitor_search_nprobe)
+    elif isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = ef_search or settings.competitor_search_ef
+
+
+def selector_params(index: faiss.Index, ids: np.ndarray) -> faiss.SearchParameters:
+    """
+    Search parameters restricting ``index.search`` to ``ids``. Flat and
+    quantized indexes only score vectors in the set, IVF lists skip other ids
+    and HNSW walks the graph but only returns members. The index's current
+    nprobe / efSearch are carried over (parameters replace them).
+    """
+    selector = faiss.IDSelectorBatch(np.ascontiguousarray(ids, dtype="int64"))
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=base.nprobe)
+    elif isinstance(base, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=base.hnsw.efSearch)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    # The parameters do not own the selector; keep it alive as long as they are
+    params.selector_ref = selector
+    return params
+
+
+def describe_index(index: faiss.Index) -> str:
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexIVF):
+        return f"{type(base).__name__}(nlist={base.nlist}, nprobe={base.nprobe})"
+    if isinstance(base, faiss.IndexHNSW):
+        return f"{type(base).__name__}(efSearch={base.hnsw.efSearch})"
+    if isinstance(base, faiss.IndexScalarQuantizer):
+        qtype = {v: k for k, v in SCALAR_QUANTIZERS.items()}.get(base.sq.qtype, base.sq.qtype)
+        return f"{type(base).__name__}({qtype})"
+    if isinstance(base, faiss.IndexPQ):
+        return f"{type(base).__name__}(m={base.pq.M})"
+    return type(base).__name__
+
+
+def rerank(
+    queries: np.ndarray, scores: np.ndarray, ids: np.ndarray, vectors: Optional[np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Re-score candidates from a compressed index with exact inner products
+    against the full float32 ``vectors`` (row = id, typically memory-mapped,
+    so only candidate rows are paged in) and re-sort each row. Ids beyond the
+    vector file keep their approximate score; -1 padding stays last.
+    """
+    if vectors is None:
+        return scores, ids
+    scores = scores.copy()
+    for row, (query, row_ids) in enumerate(zip(queries, ids)):
+        known = (row_ids >= 0) & (row_ids < len(vectors))
+        if known.any():
+            rows = row_ids[known]
+            order = np.argsort(rows)
+            exact = np.empty(len(rows), dtype=np.float32)
+            exact[order] = np.asarray(vectors[rows[order]]) @ query
+            scores[row, known] = exact
+    scores[ids < 0] = -np.inf
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+def supports_ids(index: faiss.Index) -> bool:
+    """True when the index stores caller-supplied ids (id-map wrapper or IVF)."""
+    index = faiss.downcast_index(index)
+    return isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2, faiss.IndexIVF))
+
+
+def ensure_id_mapped(index: Optional[faiss.Index], dim: int) -> faiss.Index:
+    """
+    Index that accepts ``add_with_ids``, keeping existing vectors under their
+    current positional ids. Flat and HNSW indexes are wrapped in IndexIDMap2
+    from their stored vectors (no re-encode); IVF indexes store ids natively.
+    """
+    if index is None:
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+    if supports_ids(index):
+        return index
+    base = _base_index(index)
+    vectors = base.reconstruct_n(0, base.ntotal) if base.ntotal else np.zeros((0, base.d), dtype="float32")
+    if isinstance(base, faiss.IndexHNSW):
+        empty = faiss.IndexHNSWFlat(base.d, base.hnsw.nb_neighbors(1), faiss.METRIC_INNER_PRODUCT)
+        empty.hnsw.efConstruction = base.hnsw.efConstruction
+        empty.hnsw.efSearch = base.hnsw.efSearch
+    else:
+        # Same type and trained codebooks (flat, fp16/sq8, pq), no vectors
+        empty = faiss.clone_index(base)
+        empty.reset()
+    mapped = faiss.IndexIDMap2(empty)
+    if len(vectors):
+        mapped.add_with_ids(vectors, np.arange(len(vectors), dtype="int64"))
+    return mapped
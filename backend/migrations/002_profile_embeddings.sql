@@ -0,0 +1,7 @@
+-- Profile embeddings for partner matching, written on register / profile update.
+-- profile_hash identifies the model + profile text the embedding was computed from;
+-- rows whose hash no longer matches are re-encoded in the background (see 003).
+create extension if not exists vector;
+
+alter table users add column if not exists profile_embedding vector(384);
+alter table users add column if not exists profile_hash text;
@@ -0,0 +1,18 @@
+-- Batch write-back for profile embeddings: one call stores the embedding and
+-- hash of many users (used by the partner matcher's background backfill and
+-- scripts/build_profile_embeddings.py --supabase).
+-- rows: [{"id": "<uuid>", "profile_embedding": "[0.1,...]", "profile_hash": "..."}, ...]
+create or replace function set_profile_embeddings(rows jsonb)
+returns integer
+language sql
+as $$
+    with updated as (
+        update users u
+        set profile_embedding = r.profile_embedding::vector,
+            profile_hash = r.profile_hash
+        from jsonb_to_recordset(rows) as r(id uuid, profile_embedding text, profile_hash text)
+        where u.id = r.id
+        returning 1
+    )
+    select count(*)::integer from updated;
+$$;
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compare competitor index types: QPS and recall@k against the exact flat index.
+
+Vectors are either loaded from an .npy file of real embeddings (--vectors) or
+generated as a clustered synthetic corpus that behaves roughly like sentence
+embeddings (unit vectors scattered around many topic centres). Queries are
+held out from the same distribution. For every index type the script sweeps
+the query-time knob (IVF nprobe, HNSW efSearch) and reports:
+
+  build     seconds to train + add
+  qps       single-query searches per second (one thread, like a request)
+  batch     queries per second for one batched search call
+  recall@k  fraction of the flat index's top-k ids that were returned
+
+Usage:
+    python scripts/benchmark_ann_index.py --n 200000 --queries 1000 --k 10
+    python scripts/benchmark_ann_index.py --vectors embeddings.npy --types flat hnsw
+
+Pick an operating point and set COMPETITOR_INDEX_TYPE / COMPETITOR_SEARCH_NPROBE /
+COMPETITOR_SEARCH_EF accordingly.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.vector_index import INDEX_TYPES, build_index, configure_search, describe_index  # noqa: E402
+
+SWEEPS = {
+    "flat": [None],
+    "fp16": [None],
+    "sq8": [None],
+    "pq": [None],
+    "ivf_flat": [1, 4, 16, 64],
+    "ivf_pq": [1, 4, 16, 64],
+    "hnsw": [16, 32, 64, 128, 256],
+}
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    x = np.ascontiguousarray(x, dtype="float32")
+    faiss.normalize_L2(x)
+    return x
+
+
+def synthetic(n: int, dim: int, topics: int, spread: float, rng: np.random.Generator) -> np.ndarray:
+    centres = normalize(rng.standard_normal((topics, dim), dtype=np.float32))
+    labels = rng.integers(0, topics, size=n)
+    noise = rng.standard_normal((n, dim), dtype=np.float32) * (spread / np.sqrt(dim))
+    return normalize(centres[labels] + noise)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def measure(index, queries: np.ndarray, k: int, truth: np.ndarray, single: int):
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    batch_qps = len(queries) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for q in queries[:single]:
+        index.search(q.reshape(1, -1), k)
+    qps = single / (time.perf_counter() - start)
+    return qps, batch_qps, recall_at_k(found, truth)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", help=".npy file of embeddings (default: synthetic)")
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=0, help="synthetic topic centres (0 = n / 10)")
+    parser.add_argument("--spread", type=float, default=0.8, help="noise norm around a topic centre (synthetic only)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--single", type=int, default=200, help="queries timed one at a time")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists (0 = about 4*sqrt(n))")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        data = normalize(np.load(args.vectors))
+        rows = rng.permutation(len(data))
+        queries, corpus = data[rows[:args.queries]], data[rows[args.queries:]]
+    else:
+        data = synthetic(args.n + args.queries, args.dim, args.topics or max(1, args.n // 10), args.spread, rng)
+        queries, corpus = data[:args.queries], data[args.queries:]
+    corpus = np.ascontiguousarray(corpus)
+    print(f"corpus={len(corpus):,} dim={corpus.shape[1]} queries={len(queries)} k={args.k} threads={faiss.omp_get_max_threads()}")
+
+    exact = faiss.IndexFlatIP(corpus.shape[1])
+    exact.add(corpus)
+    _, truth = exact.search(queries, args.k)
+
+    print(f"{'index':<34} {'build s':>8} {'qps':>9} {'batch qps':>10} {'recall@' + str(args.k):>10}")
+    for index_type in args.types:
+        start = time.perf_counter()
+        index = build_index(corpus, index_type, nlist=args.nlist or None)
+        build_s = time.perf_counter() - start
+        for knob in SWEEPS[index_type]:
+            configure_search(index, nprobe=knob, ef_search=knob)
+            qps, batch_qps, recall = measure(index, queries, args.k, truth, min(args.single, len(queries)))
+            print(f"{describe_index(index):<34} {build_s:8.1f} {qps:9.0f} {batch_qps:10.0f} {recall:10.3f}")
+        del index
+
+
+if __name__ == "__main__":
+    main()
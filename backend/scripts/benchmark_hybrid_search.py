@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Dense vs hybrid (dense + BM25, reciprocal-rank fusion) competitor search.
+
+Builds a synthetic corpus per --sizes entry: every startup has a unique name
+and a description drawn from a Zipf vocabulary, and a clustered embedding
+that does not encode the name (like a sentence model that has never seen
+the product). Each query names one startup plus a few of its description
+terms, with a query vector near the startup's embedding (--noise). Reports:
+
+  dense@k     share of queries whose startup is in the dense top-k
+  hybrid@k    the same after fusing the dense and BM25 top --candidates
+  dense ms    flat index search for k results
+  bm25 ms     keyword search over the memory-mapped index (postings per
+              term capped at --max-postings)
+  hybrid ms   dense search for --candidates + bm25 + fusion
+
+Usage:
+    python scripts/benchmark_hybrid_search.py
+    python scripts/benchmark_hybrid_search.py --sizes 100000 1000000 --candidates 20 --k 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.lexical_index import (  # noqa: E402
+    LexicalIndex,
+    keyword_search,
+    reciprocal_rank_fusion,
+    write_lexical_index,
+)
+from benchmark_ann_index import normalize, synthetic  # noqa: E402
+
+
+def corpus_texts(n: int, vocab: int, words: int, rng: np.random.Generator) -> list:
+    terms = np.minimum(rng.zipf(1.3, size=(n, words)), vocab)
+    return [f"startup{i} " + " ".join(f"w{t}" for t in row) for i, row in enumerate(terms)]
+
+
+def run(n: int, args, rng: np.random.Generator) -> dict:
+    texts = corpus_texts(n, args.vocab, args.words, rng)
+    vectors = synthetic(n, args.dim, max(1, n // 10), 0.8, rng)
+    index = faiss.IndexFlatIP(args.dim)
+    index.add(vectors)
+
+    targets = rng.choice(n, size=args.queries, replace=False)
+    noise = rng.standard_normal((len(targets), args.dim), dtype=np.float32) * (args.noise / np.sqrt(args.dim))
+    queries = normalize(vectors[targets] + noise)
+    query_texts = [" ".join(texts[t].split()[:1 + args.query_terms]) for t in targets]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup_lexical.bm25")
+        start = time.perf_counter()
+        write_lexical_index(path, enumerate(texts))
+        build_s = time.perf_counter() - start
+        lexical = LexicalIndex(path)
+
+        dense_hits = hybrid_hits = 0
+        dense_t = bm25_t = hybrid_t = 0.0
+        for target, query, text in zip(targets, queries, query_texts):
+            query = query.reshape(1, -1)
+            start = time.perf_counter()
+            _, ids = index.search(query, args.k)
+            dense_t += time.perf_counter() - start
+            dense_hits += target in ids[0]
+
+            start = time.perf_counter()
+            _, candidates = index.search(query, args.candidates)
+            t0 = time.perf_counter()
+            keyword = keyword_search(lexical, None, text, args.candidates, args.max_postings)
+            bm25_t += time.perf_counter() - t0
+            fused = reciprocal_rank_fusion(([int(i) for i in candidates[0] if i >= 0], [i for i, _ in keyword]))
+            hybrid_t += time.perf_counter() - start
+            hybrid_hits += target in {i for i, _ in fused[:args.k]}
+        size_mb = os.path.getsize(path) / 2**20
+        del lexical
+
+    q = len(targets)
+    return {
+        "n": n, "build": build_s, "mb": size_mb,
+        "dense": dense_hits / q, "hybrid": hybrid_hits / q,
+        "dense_ms": dense_t / q * 1000, "bm25_ms": bm25_t / q * 1000, "hybrid_ms": hybrid_t / q * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=20, help="COMPETITOR_LEXICAL_CANDIDATES")
+    parser.add_argument("--max-postings", type=int, default=10_000, help="COMPETITOR_LEXICAL_MAX_POSTINGS")
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--words", type=int, default=12, help="description terms per startup")
+    parser.add_argument("--query-terms", type=int, default=3, help="description terms added to the name")
+    parser.add_argument("--noise", type=float, default=4.0, help="query vector noise (expected norm; vectors are unit length)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"dim={args.dim} queries={args.queries} k={args.k} candidates={args.candidates} max_postings={args.max_postings}")
+    print(f"{'corpus':>10} {'bm25 MB':>8} {'build s':>8} {'dense@k':>8} {'hybrid@k':>9} {'dense ms':>9} {'bm25 ms':>8} {'hybrid ms':>10}")
+    for n in args.sizes:
+        r = run(n, args, rng)
+        print(
+            f"{r['n']:>10,} {r['mb']:8.1f} {r['build']:8.1f} {r['dense']:8.3f} {r['hybrid']:9.3f} "
+            f"{r['dense_ms']:9.2f} {r['bm25_ms']:8.2f} {r['hybrid_ms']:10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
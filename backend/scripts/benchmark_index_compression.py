@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Memory per worker vs accuracy for compressed competitor index types.
+
+For each type the index is built, written and read back like the API does.
+The script reports:
+
+  bytes/vec    serialized index size per vector (what each worker holds in RAM)
+  index MB     file size of startup_index.faiss
+  load ms      faiss.read_index time
+  recall@k     overlap with the exact flat index's top-k
+  +rerank      recall@k after re-scoring k * --rerank candidates exactly against
+               the memory-mapped float32 vectors (COMPETITOR_RERANK_FACTOR)
+  qps          single-query searches per second, with re-ranking
+
+Re-ranking reads only the candidate rows of startup_vectors.f32 (k * factor *
+dim * 4 bytes per query) from the shared page cache; it adds no per-worker heap.
+
+Usage:
+    python scripts/benchmark_index_compression.py --n 200000
+    python scripts/benchmark_index_compression.py --vectors embeddings.npy --rerank 4 --types flat fp16 sq8 pq
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.startup_ingest import write_vectors  # noqa: E402
+from app.services.vector_index import INDEX_TYPES, build_index, configure_search, describe_index, rerank  # noqa: E402
+from benchmark_ann_index import normalize, recall_at_k, synthetic  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", help=".npy file of embeddings (default: synthetic)")
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=4, help="re-rank factor (candidates = k * factor)")
+    parser.add_argument("--pq-m", type=int, default=48, help="PQ bytes per vector")
+    parser.add_argument("--types", nargs="+", default=["flat", "fp16", "sq8", "pq", "ivf_pq"], choices=INDEX_TYPES)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        data = normalize(np.load(args.vectors))
+        rows = rng.permutation(len(data))
+        queries, corpus = data[rows[:args.queries]], data[rows[args.queries:]]
+    else:
+        data = synthetic(args.n + args.queries, args.dim, max(1, args.n // 10), 0.8, rng)
+        queries, corpus = data[:args.queries], data[args.queries:]
+    corpus = np.ascontiguousarray(corpus)
+    n, dim = corpus.shape
+    k, fetch = args.k, args.k * max(1, args.rerank)
+    print(f"corpus={n:,} dim={dim} queries={len(queries)} k={k} rerank candidates={fetch}")
+
+    exact = faiss.IndexFlatIP(dim)
+    exact.add(corpus)
+    _, truth = exact.search(queries, k)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vectors_file = os.path.join(tmp, "startup_vectors.f32")
+        write_vectors(corpus, vectors_file)
+        full = np.memmap(vectors_file, dtype=np.float32, mode="r").reshape(-1, dim)
+
+        print(f"{'index':<34} {'bytes/vec':>9} {'index MB':>9} {'load ms':>8} {'recall@' + str(k):>9} {'+rerank':>8} {'qps':>7}")
+        for index_type in args.types:
+            path = os.path.join(tmp, f"{index_type}.faiss")
+            faiss.write_index(build_index(corpus, index_type, pq_m=args.pq_m), path)
+            start = time.perf_counter()
+            index = faiss.read_index(path)
+            load_ms = (time.perf_counter() - start) * 1000
+            configure_search(index)
+            size = os.path.getsize(path)
+
+            _, found = index.search(queries, k)
+            scores, candidates = index.search(queries, fetch)
+            _, reranked = rerank(queries, scores, candidates, full)
+
+            start = time.perf_counter()
+            for q in queries:
+                q = q.reshape(1, -1)
+                s, c = index.search(q, fetch)
+                rerank(q, s, c, full)
+            qps = len(queries) / (time.perf_counter() - start)
+            print(
+                f"{describe_index(index):<34} {size / n:9.1f} {size / 2**20:9.1f} {load_ms:8.1f} "
+                f"{recall_at_k(found, truth):9.3f} {recall_at_k(reranked[:, :k], truth):8.3f} {qps:7.0f}"
+            )
+            del index
+
+
+if __name__ == "__main__":
+    main()
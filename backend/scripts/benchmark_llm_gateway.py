@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Compare per-call OpenAI() construction against the shared LLM gateway.
+
+Start the fake server first (scripts/fake_openai_server.py), then run:
+    python scripts/benchmark_llm_gateway.py --base-url http://127.0.0.1:8099/v1 --requests 200 --concurrency 16
+
+Reports p50/p95/mean latency and throughput for both modes. Both see the same
+fixed server delay, so the difference between the rows is client-side overhead
+(client setup, connection handshakes, pooling).
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import OpenAI  # noqa: E402
+
+from app.services.llm_gateway import LLMGateway  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Return ONLY valid JSON."}]
+API_KEY = "sk-fake-local-benchmark-key-000000"
+
+
+def per_call(base_url: str, model: str) -> None:
+    client = OpenAI(base_url=base_url, api_key=API_KEY)
+    client.chat.completions.create(model=model, messages=MESSAGES, max_tokens=16, temperature=0.0)
+
+
+def run(label: str, fn, requests: int, concurrency: int) -> None:
+    def timed(_):
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) * 1000.0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{label:<12} p50={p50:8.1f}ms  p95={p95:8.1f}ms  "
+        f"mean={statistics.mean(latencies):8.1f}ms  throughput={requests / elapsed:8.1f} req/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8099/v1")
+    parser.add_argument("--model", default="fake-model")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    gateway = LLMGateway(base_url=args.base_url, api_key=API_KEY, model=args.model)
+    # Warm both paths once so imports and the first pool connection are excluded
+    per_call(args.base_url, args.model)
+    gateway.complete(MESSAGES, max_tokens=16, temperature=0.0)
+
+    run("per-call", lambda: per_call(args.base_url, args.model), args.requests, args.concurrency)
+    run("gateway", lambda: gateway.complete(MESSAGES, max_tokens=16, temperature=0.0), args.requests, args.concurrency)
+    gateway.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Parity and throughput of the ONNX encoder against the PyTorch SentenceTransformer.
+
+Parity: every text is embedded by torch and by each ONNX variant (fp32,
+int8); the cosine similarity between the two (normalized) vectors is reported
+as mean / p1 / min. The script exits with status 1 when the minimum for any
+variant falls below --threshold, so it can gate a deploy that switches
+EMBEDDING_BACKEND to onnx.
+
+Throughput: texts per second and milliseconds per call at batch sizes 1, 8
+and 64 (one thread count for all backends, see --threads).
+
+Texts come from startup_metadata.csv (name + category + description, like
+competitor search) or a built-in sample if the CSV is missing.
+
+Usage:
+    python scripts/benchmark_onnx_encoder.py
+    python scripts/benchmark_onnx_encoder.py --texts 2000 --threshold 0.99 --threads 4
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.services.onnx_encoder import OnnxEncoder, onnx_model_dir  # noqa: E402
+from app.services.startup_ingest import metadata_path, startup_text  # noqa: E402
+
+BATCH_SIZES = (1, 8, 64)
+
+SAMPLE_TEXTS = [
+    "An AI tutor that adapts lessons to each student's pace",
+    "Payments platform for small online shops in emerging markets",
+    "Scheduling and patient intake software for independent clinics",
+    "Marketplace connecting freelance designers with startups",
+    "Cloud cost monitoring for engineering teams",
+    "Subscription meal kits built around local farms",
+]
+
+
+def load_texts(limit: int) -> list:
+    try:
+        with open(metadata_path(), newline="", encoding="utf-8") as f:
+            texts = [startup_text(row) for _, row in zip(range(limit), csv.DictReader(f))]
+    except FileNotFoundError:
+        texts = []
+    texts = texts or SAMPLE_TEXTS
+    return [texts[i % len(texts)] for i in range(limit)]
+
+
+def normalized(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+
+
+def throughput(model, texts: list, batch_size: int, seconds: float) -> tuple:
+    model.encode(texts[:batch_size], batch_size=batch_size, show_progress_bar=False)  # warm up
+    calls, done, start = 0, 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        batch = texts[done % len(texts):][:batch_size]
+        if len(batch) < batch_size:
+            batch = texts[:batch_size]
+        model.encode(batch, batch_size=batch_size, show_progress_bar=False)
+        calls += 1
+        done += len(batch)
+    elapsed = time.perf_counter() - start
+    return done / elapsed, elapsed / calls * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=settings.embedding_model)
+    parser.add_argument("--onnx-dir", help="export directory (default: EMBEDDING_ONNX_DIR or processed/onnx/<model>)")
+    parser.add_argument("--texts", type=int, default=1000, help="texts for the parity check")
+    parser.add_argument("--threshold", type=float, default=0.99, help="minimum torch/onnx cosine similarity")
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads for torch and onnxruntime (0 = default)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="time per throughput measurement")
+    args = parser.parse_args()
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    model_dir = args.onnx_dir or onnx_model_dir(args.model)
+    backends = {
+        "torch": SentenceTransformer(args.model, device="cpu"),
+        "onnx fp32": OnnxEncoder(model_dir, quantized=False, threads=args.threads),
+        "onnx int8": OnnxEncoder(model_dir, quantized=True, threads=args.threads),
+    }
+    texts = load_texts(args.texts)
+    print(f"model={args.model} onnx={model_dir} texts={len(texts)} threads={args.threads or 'default'}")
+
+    reference = normalized(backends["torch"].encode(texts, batch_size=64, show_progress_bar=False))
+    failed = False
+    print(f"\n{'backend':<10} {'mean cos':>9} {'p1 cos':>9} {'min cos':>9}")
+    for name, model in backends.items():
+        if name == "torch":
+            continue
+        cos = np.sum(reference * normalized(model.encode(texts, batch_size=64)), axis=1)
+        ok = cos.min() >= args.threshold
+        failed |= not ok
+        print(f"{name:<10} {cos.mean():9.5f} {np.percentile(cos, 1):9.5f} {cos.min():9.5f}  {'ok' if ok else 'FAIL'}")
+
+    print(f"\n{'backend':<10} {'batch':>5} {'texts/s':>9} {'ms/call':>9}")
+    for batch_size in BATCH_SIZES:
+        for name, model in backends.items():
+            rate, ms = throughput(model, texts, batch_size, args.seconds)
+            print(f"{name:<10} {batch_size:5d} {rate:9.1f} {ms:9.2f}")
+
+    if failed:
+        print(f"\nParity check failed: cosine similarity below {args.threshold}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark PartnerMatcher scoring at 20, 10k and 1M profiles.
+
+Profiles and their embeddings are synthetic (random unit vectors, industries
+round-robin), so no dataset or model download is needed for the scoring path.
+For each size it reports per-query latency of:
+
+  - legacy:    the previous per-profile Python loop (dict of vectors, one
+               cosine per profile, full sort)
+  - suggest:   the vectorized path used by suggest() (one matmul + argpartition)
+  - filtered:  the same with an industry filter (scores one row range)
+
+Usage:
+    python scripts/benchmark_partner_matcher.py --sizes 20 10000 1000000 --queries 50
+
+With --with-model the full suggest() call (including the user-text embedding,
+an embedding-cache hit after the first query) is timed as well; this needs the
+sentence-transformers model to be available. Supabase must be unconfigured so
+suggest() takes the dataset path.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.partner_matcher import PartnerMatcher  # noqa: E402
+
+INDUSTRIES = ["EdTech", "HealthTech", "FinTech", "AI/ML", "SaaS", "E-commerce"]
+USER_PROFILE = {"interests": ["education", "AI"], "skills": ["Python", "Product"], "business_focus": "EdTech"}
+
+
+def synthetic(n: int, dim: int, rng: np.random.Generator):
+    profiles = [
+        {
+            "name": f"Profile {i}",
+            "industry": INDUSTRIES[i % len(INDUSTRIES)],
+            "skills": ["Skill A", "Skill B"],
+            "expertise": "",
+            "linkedin_url": "",
+            "bio": "",
+            "experience_years": 0,
+        }
+        for i in range(n)
+    ]
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    return profiles, vectors
+
+
+def legacy_rank(profiles, embeddings: dict, user_vec: np.ndarray, limit: int, industry=None):
+    scored = []
+    for i, profile in enumerate(profiles):
+        if industry and profile["industry"].lower() != industry.lower():
+            continue
+        if i in embeddings:
+            vec = embeddings[i]
+            denom = (np.linalg.norm(user_vec) * np.linalg.norm(vec)) or 1.0
+            scored.append((float(np.dot(user_vec, vec) / denom), profile))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:limit]
+
+
+def timed(fn, queries) -> list:
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return sorted(latencies)
+
+
+def report(label: str, n: int, latencies: list) -> None:
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{n:>9,}  {label:<10} p50={p50:10.3f}ms  p95={p95:10.3f}ms  mean={statistics.mean(latencies):10.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 10_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--legacy-queries", type=int, default=3, help="queries for the slow loop at >100k profiles")
+    parser.add_argument("--with-model", action="store_true", help="also time full suggest() with the embedding model")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    for n in args.sizes:
+        profiles, vectors = synthetic(n, args.dim, rng)
+
+        start = time.perf_counter()
+        matcher = PartnerMatcher(profiles=profiles, vectors=vectors)
+        build_ms = (time.perf_counter() - start) * 1000.0
+        print(f"{n:>9,}  build      {build_ms:10.1f}ms  matrix={matcher.matrix.nbytes / 2**20:.1f} MiB")
+
+        legacy_embeddings = {i: vec for i, vec in enumerate(vectors)}
+        legacy_queries = queries if n <= 100_000 else queries[:args.legacy_queries]
+        report("legacy", n, timed(lambda q: legacy_rank(profiles, legacy_embeddings, q, args.limit), legacy_queries))
+        report("suggest", n, timed(lambda q: matcher.rank_vector(q, args.limit), queries))
+        report("filtered", n, timed(lambda q: matcher.rank_vector(q, args.limit, industry="FinTech"), queries))
+
+        # Sanity check: same top-k as the legacy loop
+        expected = [p["name"] for _, p in legacy_rank(profiles, legacy_embeddings, queries[0], args.limit)]
+        got = [p["name"] for _, p in matcher.rank_vector(queries[0], args.limit)]
+        if expected != got:
+            print(f"           [WARN] top-{args.limit} differs from legacy: {got} vs {expected}")
+
+        if args.with_model:
+            if matcher.embedder.dim != args.dim:
+                print(f"           skipping suggest(): model dim {matcher.embedder.dim} != --dim {args.dim}")
+            else:
+                matcher.suggest(USER_PROFILE, limit=args.limit)
+                report("suggest()", n, timed(lambda _: matcher.suggest(USER_PROFILE, limit=args.limit), queries))
+
+        del matcher, legacy_embeddings, profiles, vectors
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Build the professional_profiles embedding snapshot.
+
+Writes professional_profiles.embeddings.npy (grouped, L2-normalized float32
+matrix) and professional_profiles.embeddings.json (CSV sha256, model, shape)
+next to the CSV. The backend memory maps the .npy at startup and only
+re-encodes when the CSV or the encoder (model or EMBEDDING_BACKEND) changes,
+so running this as a deploy step keeps worker startup independent of encoder
+throughput.
+
+With --supabase, also re-encodes the stored embedding of every Supabase user
+whose profile_hash is missing or stale (e.g. after a model change) and writes
+them back in batches (migrations/003_set_profile_embeddings.sql). The backend
+only serves current rows and does the same in the background otherwise.
+
+Usage:
+    python scripts/build_profile_embeddings.py [--force] [--supabase]
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.services.embedding_snapshot import snapshot_paths  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true", help="re-encode even if the snapshot is current")
+    parser.add_argument("--supabase", action="store_true", help="also backfill stale Supabase profile embeddings")
+    args = parser.parse_args()
+
+    csv_path = os.path.join(settings.processed_dir, "professional_profiles.csv")
+    if args.force:
+        _, meta_path = snapshot_paths(csv_path)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+    from app.services.partner_matcher import PartnerMatcher
+
+    matcher = PartnerMatcher()
+    print(f"Profile embeddings ready: {matcher.matrix.shape[0]} x {matcher.matrix.shape[1]}")
+
+    if args.supabase:
+        from app.database import is_supabase_configured
+        from app.services.partner_matcher import get_profile_index
+
+        if not is_supabase_configured():
+            print("Supabase is not configured; skipping profile backfill")
+            return
+        written = get_profile_index().backfill()
+        print(f"Supabase profile embeddings backfilled: {written}")
+
+
+if __name__ == "__main__":
+    main()
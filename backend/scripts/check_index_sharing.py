@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Check that the competitor index is shared between worker processes.
+
+Starts --workers processes that each open startup_index.faiss the way the API
+does (vector_index.read_index) and search it until every page is touched,
+first as a private heap copy and then memory-mapped. While all of them are
+alive it reads /proc/<pid>/status and smaps_rollup and reports per worker:
+
+  private MB   anonymous memory added by loading + searching the index
+  file MB      resident file-backed pages (shared page cache)
+  pss MB       proportional set size (shared pages divided among the workers)
+
+Exits with status 1 when a memory-mapped worker adds more private memory than
+--max-private-mb (default: 5% of the index file + 16 MB), i.e. when memory
+would grow with every extra worker. Linux only.
+
+Usage:
+    python scripts/check_index_sharing.py --workers 4
+    python scripts/check_index_sharing.py --synthetic 500000 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.startup_ingest import index_path  # noqa: E402
+
+
+def memory() -> dict:
+    stats = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                stats[line.split(":")[0]] = int(line.split()[1]) / 1024
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                stats["Pss"] = int(line.split()[1]) / 1024
+    return stats
+
+
+def worker(path: str, mmap: bool, queries: int, results, done) -> None:
+    from app.services.vector_index import read_index
+
+    before = memory()
+    index = read_index(path, mmap=mmap)
+    rng = np.random.default_rng(os.getpid())
+    for _ in range(queries):
+        index.search(rng.standard_normal((1, index.d), dtype=np.float32), 10)
+    after = memory()
+    results.put({
+        "pid": os.getpid(),
+        "private": after["RssAnon"] - before["RssAnon"],
+        "file": after["RssFile"],
+        "pss": after["Pss"],
+    })
+    done.wait()  # stay alive so every worker is measured while the others hold the index
+
+
+def run(path: str, mmap: bool, workers: int, queries: int) -> list:
+    ctx = multiprocessing.get_context("spawn")
+    results, done = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=worker, args=(path, mmap, queries, results, done)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    stats = [results.get(timeout=600) for _ in procs]
+    done.set()
+    for p in procs:
+        p.join()
+    return stats
+
+
+def synthetic_index(n: int, dim: int, directory: str) -> str:
+    import faiss
+
+    vectors = np.random.default_rng(0).standard_normal((n, dim), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    path = os.path.join(directory, "startup_index.faiss")
+    faiss.write_index(index, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--index", help="index file (default: startup_index.faiss under PROCESSED_DIR)")
+    parser.add_argument("--synthetic", type=int, default=0, help="use a temporary flat index of this many vectors")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=20, help="searches per worker (flat scans touch every page)")
+    parser.add_argument("--max-private-mb", type=float, help="allowed private growth per memory-mapped worker")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = synthetic_index(args.synthetic, args.dim, tmp) if args.synthetic else (args.index or index_path())
+        size_mb = os.path.getsize(path) / 2**20
+        limit = args.max_private_mb if args.max_private_mb is not None else 0.05 * size_mb + 16
+        print(f"index={path} size={size_mb:.1f} MB workers={args.workers}")
+
+        failed = False
+        for mmap in (False, True):
+            stats = run(path, mmap, args.workers, args.queries)
+            label = "mmap" if mmap else "copy"
+            print(f"\n{label:<5} {'pid':>7} {'private MB':>11} {'file MB':>9} {'pss MB':>8}")
+            for s in stats:
+                print(f"{'':<5} {s['pid']:7d} {s['private']:11.1f} {s['file']:9.1f} {s['pss']:8.1f}")
+            worst = max(s["private"] for s in stats)
+            print(f"{'':<5} total pss {sum(s['pss'] for s in stats):.1f} MB, max private per worker {worst:.1f} MB")
+            if mmap and worst > limit:
+                failed = True
+                print(f"FAIL: memory-mapped workers add {worst:.1f} MB private memory each (limit {limit:.1f} MB)")
+
+    if failed:
+        sys.exit(1)
+    print(f"\nOK: memory-mapped workers share the index (private growth <= {limit:.1f} MB per worker)")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,13 @@ from pathlib import Path
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from app.config import settings
+from app.services.industry_classifier import (
+    DEFAULT_KEYWORDS,
+    compute_category_centroids,
+    save_category_centroids,
+)
+
 try:
     import faiss
     from sentence_transformers import SentenceTransformer
@@ -136,8 +143,10 @@ def download_kaggle_dataset():
 
 def create_startup_index():
     """Create FAISS index from startup data for competitor search."""
-    processed_dir = Path(__file__).parent.parent.parent / "datasets" / "processed"
+    processed_dir = Path(__file__).resolve().parent.parent.parent / "datasets" / "processed"
     processed_dir.mkdir(parents=True, exist_ok=True)
+    # The startup_ingest helpers resolve their paths from settings, not the current directory
+    settings.processed_dir = str(processed_dir)
     
     # Try Kaggle first, fallback to sample data
     kaggle_df = download_kaggle_dataset()
@@ -159,38 +168,78 @@ def create_startup_index():
     # Create DataFrame
     df = pd.DataFrame(startups)
     
-    # Save metadata CSV
+    # Metadata CSV is swapped in together with the index (ids = rows)
     metadata_path = processed_dir / "startup_metadata.csv"
-    df.to_csv(metadata_path, index=False)
-    print(f"Saved metadata to {metadata_path}")
+    metadata_tmp = processed_dir / f"startup_metadata.csv.tmp{os.getpid()}"
+    df.to_csv(metadata_tmp, index=False)
     
     # Create trend signals CSV
     trends_df = pd.DataFrame(TREND_SIGNALS)
     trends_path = processed_dir / "trend_signals.csv"
     trends_df.to_csv(trends_path, index=False)
     print(f"Saved trend signals to {trends_path}")
+
+    # Keyword table for the market-insight fallback classifier (edit to extend)
+    keywords_df = pd.DataFrame(DEFAULT_KEYWORDS, columns=["industry", "keyword", "weight"])
+    keywords_path = processed_dir / "industry_keywords.csv"
+    keywords_df.to_csv(keywords_path, index=False)
+    print(f"Saved industry keywords to {keywords_path}")
     
-    # Create FAISS index if available
-    if FAISS_AVAILABLE:
-        print("Creating FAISS index for competitor search...")
-        model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        
-        # Create embeddings from startup descriptions
-        texts = [f"{s.get('name', '')} {s.get('category', '')} {s.get('description', '')}" for s in startups]
-        embeddings = model.encode(texts, show_progress_bar=True)
-        embeddings = np.array(embeddings).astype('float32')
-        
-        # Create and save FAISS index
-        dim = embeddings.shape[1]
-        index = faiss.IndexFlatIP(dim)  # Inner product = cosine similarity for normalized vectors
-        faiss.normalize_L2(embeddings)
-        index.add(embeddings)
-        
-        index_path = processed_dir / "startup_index.faiss"
-        faiss.write_index(index, str(index_path))
-        print(f"Saved FAISS index to {index_path}")
-    else:
-        print("Skipping FAISS index creation (faiss-cpu not installed)")
+    try:
+        # Create FAISS index if available
+        if FAISS_AVAILABLE:
+            # These import faiss at module load, so only once it is known to be installed
+            from app.services.startup_ingest import (
+                archive_ingestion_log,
+                build_lexical_index,
+                build_metadata_store,
+                write_index,
+                write_vectors,
+                writer_lock,
+            )
+            from app.services.vector_index import build_index, describe_index
+
+            print("Creating FAISS index for competitor search...")
+            model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+            
+            # Create embeddings from startup descriptions
+            texts = [f"{s.get('name', '')} {s.get('category', '')} {s.get('description', '')}" for s in startups]
+            embeddings = model.encode(texts, show_progress_bar=True)
+            embeddings = np.array(embeddings).astype('float32')
+            
+            # Create and save FAISS index (COMPETITOR_INDEX_TYPE: flat, fp16, sq8, pq, ivf_flat, ivf_pq, hnsw)
+            faiss.normalize_L2(embeddings)  # Inner product = cosine similarity for normalized vectors
+            index = build_index(embeddings)
+            print(f"Built {describe_index(index)} over {index.ntotal} vectors")
+            
+            # Swap the metadata, index and full vectors (row = id, for re-ranking) together;
+            # ids from the old ingestion log no longer apply
+            index_path = processed_dir / "startup_index.faiss"
+            with writer_lock():
+                os.replace(metadata_tmp, metadata_path)
+                write_index(index, str(index_path))  # atomic: running workers may have it mapped
+                write_vectors(embeddings, str(processed_dir / "startup_vectors.f32"))
+                archive_ingestion_log()
+            print(f"Saved metadata to {metadata_path}")
+            print(f"Saved FAISS index to {index_path}")
+
+            # Per-category centroids for the embedding industry classifier
+            names, centroids = compute_category_centroids(embeddings, [s.get('category', 'General') for s in startups])
+            centroids_path = processed_dir / "category_centroids.npz"
+            save_category_centroids(str(centroids_path), names, centroids)
+            print(f"Saved {len(names)} category centroids to {centroids_path}")
+
+            build_metadata_store()
+            print("Saved memory-mapped metadata store")
+            build_lexical_index()
+            print("Saved BM25 keyword index")
+        else:
+            os.replace(metadata_tmp, metadata_path)
+            print(f"Saved metadata to {metadata_path}")
+            print("Skipping FAISS index creation (faiss-cpu not installed)")
+    finally:
+        if metadata_tmp.exists():
+            metadata_tmp.unlink()
     
     print(f"\n✅ Dataset processing complete!")
     print(f"   - {len(startups)} startups indexed")
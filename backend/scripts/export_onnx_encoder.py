@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Export the sentence embedding model to ONNX and quantize it to int8.
+
+Writes model.onnx (fp32), model.int8.onnx (dynamic int8 weights, what
+EMBEDDING_BACKEND=onnx loads by default), tokenizer.json and encoder.json
+(pooling, normalization, max sequence length) to the ONNX model directory
+(EMBEDDING_ONNX_DIR, default datasets/processed/onnx/<model>). Needs torch,
+sentence-transformers and onnx at export time only; the API then runs the
+model with onnxruntime + tokenizers.
+
+Check parity and speed afterwards with scripts/benchmark_onnx_encoder.py.
+
+Usage:
+    python scripts/export_onnx_encoder.py
+    python scripts/export_onnx_encoder.py --model sentence-transformers/all-MiniLM-L6-v2 --out /tmp/minilm-onnx
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.services.onnx_encoder import (  # noqa: E402
+    CONFIG_FILE,
+    MODEL_FILE,
+    QUANTIZED_MODEL_FILE,
+    TOKENIZER_FILE,
+    onnx_model_dir,
+)
+
+OPSET = 17
+
+
+def pooling_mode(config: dict) -> str:
+    mode = config.get("pooling_mode")
+    if mode is None:
+        mode = "cls" if config.get("pooling_mode_cls_token") else "mean"
+    if mode not in ("mean", "cls"):
+        raise SystemExit(f"Unsupported pooling mode {mode!r} (mean and cls are supported)")
+    return mode
+
+
+def export(model_name: str, out_dir: str) -> None:
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    modules = list(st)
+    transformer, pooling = modules[0], modules[1]
+    hf_model = getattr(transformer, "auto_model", None) or transformer.model
+    hf_model.eval()
+    tokenizer = st.tokenizer
+    if not getattr(tokenizer, "is_fast", False):
+        raise SystemExit("The model has no fast tokenizer (tokenizer.json); it cannot run without transformers")
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer.backend_tokenizer.save(os.path.join(out_dir, TOKENIZER_FILE))
+
+    sample = tokenizer(["an example sentence", "a second one"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class LastHidden(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    fp32_path = os.path.join(out_dir, MODEL_FILE)
+    axes = {name: {0: "batch", 1: "tokens"} for name in input_names}
+    # Newer torch defaults to the dynamo exporter; keep the TorchScript one
+    # where the argument exists (older releases only have TorchScript)
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHidden(hf_model),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={**axes, "last_hidden_state": {0: "batch", 1: "tokens"}},
+            opset_version=OPSET,
+            **legacy,
+        )
+    print(f"Saved {fp32_path}")
+
+    int8_path = os.path.join(out_dir, QUANTIZED_MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"Saved {int8_path}")
+
+    config = {
+        "model": model_name,
+        "dim": st.get_sentence_embedding_dimension(),
+        "max_seq_length": st.max_seq_length,
+        "pooling": pooling_mode(pooling.get_config_dict()),
+        "normalize": any(type(m).__name__ == "Normalize" for m in modules),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(os.path.join(out_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    print(f"Saved {CONFIG_FILE}: {config}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=settings.embedding_model)
+    parser.add_argument("--out", help="output directory (default: EMBEDDING_ONNX_DIR or processed/onnx/<model>)")
+    args = parser.parse_args()
+    export(args.model, args.out or onnx_model_dir(args.model))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Local fake OpenAI-compatible server for LLM latency benchmarks.
+
+Answers POST /v1/chat/completions with a canned JSON completion after a fixed
+delay, so client-side overhead (connection setup, pooling, concurrency caps)
+can be measured without calling OpenRouter. Requests with ``stream: true`` get
+the same content as SSE chunks spread over the delay.
+
+Usage:
+    python scripts/fake_openai_server.py --port 8099 --delay-ms 150
+
+Then point the backend at it:
+    OPENROUTER_BASE_URL=http://127.0.0.1:8099/v1
+    OPENROUTER_API_KEY=sk-fake-local-benchmark-key-000000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+CANNED_CONTENT = json.dumps({
+    "ideas": [
+        {"name": "FakeCo", "problem": "Benchmark problem.", "solution": "Benchmark solution.", "value_proposition": "Benchmark value."}
+    ],
+    "industry": "SaaS",
+    "top_trends": ["AI copilots for workflows", "Async-first collaboration tools"],
+    "customer_segments": ["Startups", "Enterprise"],
+    "opportunities": ["Benchmark opportunity one.", "Benchmark opportunity two."],
+    "risks": ["Benchmark risk one.", "Benchmark risk two."],
+    "mitigation": "Benchmark mitigation.",
+    "feasibility_score": 72,
+    "novelty_score": 64,
+    "market_readiness": "Medium",
+})
+
+
+def create_app(delay_ms: float) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+
+    async def stream_chunks(body: dict):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        pieces = [CANNED_CONTENT[i:i + 16] for i in range(0, len(CANNED_CONTENT), 16)]
+        for piece in pieces:
+            await asyncio.sleep(delay_ms / 1000.0 / len(pieces))
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake-model"),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if body.get("stream"):
+            return StreamingResponse(stream_chunks(body), media_type="text/event-stream")
+        await asyncio.sleep(delay_ms / 1000.0)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": CANNED_CONTENT},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay-ms", type=float, default=150.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.delay_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Append or delete competitor startups without rebuilding the index.
+
+New rows are encoded and added under fresh stable ids (deleted ids are never
+reused); metadata goes to
+datasets/processed/startup_metadata.log.jsonl and startup_index.faiss is
+replaced atomically. Running API workers pick the change up on their next
+refresh check (COMPETITOR_REFRESH_SECONDS).
+
+Usage:
+    python scripts/ingest_startups.py --csv new_startups.csv
+    python scripts/ingest_startups.py --name Acme --category SaaS --description "Workflow automation for clinics"
+    python scripts/ingest_startups.py --delete 12 40
+
+CSV columns: name, description, category, funding, url (only name and
+description are required).
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.startup_ingest import STARTUP_FIELDS, ingest_startups  # noqa: E402
+
+
+def read_csv(path: str) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [{k: (row.get(k) or None) for k in STARTUP_FIELDS} for row in csv.DictReader(f)]
+    return [row for row in rows if row["name"] and row["description"]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", help="CSV of startups to append")
+    parser.add_argument("--name")
+    parser.add_argument("--description")
+    parser.add_argument("--category", default="General")
+    parser.add_argument("--funding")
+    parser.add_argument("--url")
+    parser.add_argument("--delete", type=int, nargs="*", default=[], help="startup ids to delete")
+    args = parser.parse_args()
+
+    add = read_csv(args.csv) if args.csv else []
+    if args.name and args.description:
+        add.append({
+            "name": args.name,
+            "description": args.description,
+            "category": args.category,
+            "funding": args.funding,
+            "url": args.url,
+        })
+    if not add and not args.delete:
+        parser.error("nothing to do: pass --csv, --name/--description or --delete")
+
+    result = ingest_startups(add, args.delete)
+    print(f"Added ids: {result['added_ids']}")
+    print(f"Deleted ids: {result['deleted_ids']}")
+    print(f"Startups in index: {result['total']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,400 @@
+#!/usr/bin/env python3
 """
-Lightweight dataset processor for BizBloom AI.
-- Expects CSVs placed under datasets/ (manual step).
-- Produces embeddings index and metadata under datasets/processed/.
+Streaming dataset processor for BizBloom AI.
+
+Reads the raw CSVs under datasets/ in chunks, normalizes them to the startup
+metadata columns (name, category, description, funding, url), drops
+duplicates (same name + description) and encodes the rows in fixed-size
+batches on a process pool. Every --shard-rows rows the vectors, metadata and
+dedup keys are written as a shard under datasets/processed/build/ and a
+checkpoint records the input position, so a killed run resumes from the last
+shard when started again with the same inputs.
+
+The shards are then merged into the files the API loads:
+startup_index.faiss (COMPETITOR_INDEX_TYPE; IVF types are trained on a sample
+and filled shard by shard), startup_vectors.f32 (full vectors for re-ranking
+compressed indexes), startup_metadata.csv with its column store and BM25
+keyword index (startup_lexical.bm25), trend_signals.csv and category_centroids.npz. Row i of the CSV is id i in the
+index. A full rebuild reassigns ids, so the ingestion log is archived.
+
+Usage:
+    python scripts/process_datasets.py
+    python scripts/process_datasets.py --workers 4 --batch-size 256 --shard-rows 100000
+    python scripts/process_datasets.py --inputs ../datasets/extra.csv --restart
 """
 
 import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
+import faiss
+import numpy as np
 import pandas as pd
-from annoy import AnnoyIndex
-from sentence_transformers import SentenceTransformer
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.services.industry_classifier import save_category_centroids  # noqa: E402
+from app.services.onnx_encoder import OnnxEncoder, onnx_model_dir  # noqa: E402
+from app.services.startup_ingest import (  # noqa: E402
+    STARTUP_FIELDS,
+    archive_ingestion_log,
+    build_lexical_index,
+    build_metadata_store,
+    index_path,
+    metadata_path,
+    startup_text,
+    vectors_path,
+    writer_lock,
+)
+from app.services.vector_index import describe_index, new_index, training_size  # noqa: E402
 
 DATASET_DIR = Path(__file__).resolve().parents[2] / "datasets"
 PROCESSED_DIR = DATASET_DIR / "processed"
 
+# Known dataset filenames; pass --inputs for others
+CANDIDATES = [
+    "business-ideas-generated-with-gpt3.csv",
+    "startup-success-prediction.csv",
+    "global-startup-success-dataset.csv",
+]
+
+# Raw column name fragments for each metadata field (first match wins)
+COLUMN_HINTS = {
+    "name": ("name",),
+    "category": ("industry", "category", "market"),
+    "description": ("description", "desc"),
+    "funding": ("funding",),
+    "url": ("url", "homepage"),
+}
+
+TRENDS_PER_INDUSTRY = 2
+
+
+# --- Encoding (runs in worker processes) ---
+
+_model = None
+
+
+def _init_encoder(model_name: str, threads: int, onnx_dir: Optional[str]) -> None:
+    global _model
+    if onnx_dir:
+        _model = OnnxEncoder(onnx_dir, settings.embedding_onnx_quantized, threads)
+        return
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _model = SentenceTransformer(model_name)
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    vectors = _model.encode(texts, batch_size=len(texts), show_progress_bar=False, normalize_embeddings=True)
+    return np.asarray(vectors, dtype="float32")
+
+
+# --- Reading ---
+
+def _column(columns: List[str], hints: Tuple[str, ...]) -> Optional[str]:
+    return next((c for c in columns if any(h in c for h in hints)), None)
+
+
+def normalize(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Map a raw chunk onto STARTUP_FIELDS; rows without a description are dropped."""
+    chunk = chunk.rename(columns=lambda c: str(c).strip().lower())
+    columns = list(chunk.columns)
+    out = pd.DataFrame(index=chunk.index)
+    for field in STARTUP_FIELDS:
+        source = _column(columns, COLUMN_HINTS[field])
+        out[field] = chunk[source].str.strip() if source else ""
+    out.loc[out["name"] == "", "name"] = "Unknown"
+    out.loc[out["category"] == "", "category"] = "General"
+    return out[out["description"] != ""]
+
+
+def read_chunks(paths: List[Path], chunk_rows: int, position: Tuple[int, int]) -> Iterator[Tuple[int, int, pd.DataFrame]]:
+    """
+    Yield ``(file number, raw rows read from that file, normalized chunk)``
+    starting after ``position`` (file number, rows already consumed).
+    """
+    start_file, skip = position
+    for file_no, path in enumerate(paths):
+        if file_no < start_file:
+            continue
+        done = 0
+        try:
+            reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows, on_bad_lines="skip")
+            for chunk in reader:
+                done += len(chunk)
+                if file_no == start_file and done <= skip:
+                    continue
+                if file_no == start_file and done - len(chunk) < skip:
+                    chunk = chunk.iloc[skip - (done - len(chunk)):]
+                yield file_no, done, normalize(chunk)
+        except (pd.errors.ParserError, UnicodeDecodeError) as e:
+            print(f"[WARN] Stopped reading {path} after {done} rows: {e}")
+
+
+def row_key(name: str, description: str) -> int:
+    """64-bit dedup key of the case/whitespace-normalized name + description."""
+    text = f"{' '.join(name.lower().split())}\x1f{' '.join(description.lower().split())}"
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# --- Shards and checkpoint ---
+
+class BuildState:
+    """Shard files and checkpoint under the work directory."""
+
+    def __init__(self, work_dir: Path, config: dict) -> None:
+        self.work_dir = work_dir
+        self.config = config
+        self.checkpoint_path = work_dir / "checkpoint.json"
+        self.shards: List[int] = []
+        self.position = (0, 0)
+        self.dim: Optional[int] = None
+
+    def load(self) -> bool:
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+        except FileNotFoundError:
+            return False
+        if checkpoint["config"] != self.config:
+            raise SystemExit(
+                f"{self.checkpoint_path} is from a different build (inputs or model changed); "
+                "pass --restart to discard it"
+            )
+        self.shards = checkpoint["shards"]
+        self.position = tuple(checkpoint["position"])
+        self.dim = checkpoint["dim"]
+        return True
 
-def load_raw_datasets() -> pd.DataFrame:
-    # Try to merge known dataset filenames; adjust as needed.
-    candidates = [
-        "business-ideas-generated-with-gpt3.csv",
-        "startup-success-prediction.csv",
-        "global-startup-success-dataset.csv",
-    ]
-    frames: List[pd.DataFrame] = []
-    for name in candidates:
-        path = DATASET_DIR / name
-        if path.exists():
-            try:
-                frames.append(pd.read_csv(path))
-            except Exception:
-                continue
-    if not frames:
-        raise FileNotFoundError("No expected dataset CSVs found in datasets/.")
-    return pd.concat(frames, ignore_index=True)
-
-
-def normalize(df: pd.DataFrame) -> pd.DataFrame:
-    # Keep basic fields for embeddings
-    df = df.rename(columns=str.lower)
-    name_col = next((c for c in df.columns if "name" in c), "name")
-    desc_col = next((c for c in df.columns if "description" in c or "desc" in c), "description")
-    success_col = next((c for c in df.columns if "success" in c), "success_flag")
-    industry_col = next((c for c in df.columns if "industry" in c), "industry")
-
-    df["name"] = df.get(name_col, "Unknown")
-    df["description"] = df.get(desc_col, "No description")
-    df["success_flag"] = df.get(success_col, 0)
-    df["industry"] = df.get(industry_col, "General")
-    df = df[["name", "description", "success_flag", "industry"]].dropna()
-    return df
-
-
-def build_index(df: pd.DataFrame, model_name: str = "sentence-transformers/all-MiniLM-L6-v2") -> None:
-    model = SentenceTransformer(model_name)
-    dim = model.get_sentence_embedding_dimension()
-    index = AnnoyIndex(dim, "angular")
-
-    vectors = model.encode(df["description"].tolist())
-    for i, vec in enumerate(vectors):
-        index.add_item(i, vec.tolist())
-    index.build(20)
-
-    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    index.save(str(PROCESSED_DIR / "startup_index.ann"))
-    df.to_csv(PROCESSED_DIR / "startup_metadata.csv", index=False)
-
-    # Also save simple trend signals for market insights
-    trends = df.groupby("industry").head(2)[["industry", "description"]].copy()
-    trends = trends.rename(columns={"description": "trend"})
-    trends.to_csv(PROCESSED_DIR / "trend_signals.csv", index=False)
+    def shard_path(self, shard: int, suffix: str) -> Path:
+        return self.work_dir / f"shard_{shard:05d}{suffix}"
+
+    def seen_keys(self) -> Set[int]:
+        seen: Set[int] = set()
+        for shard in self.shards:
+            seen.update(np.load(self.shard_path(shard, ".keys.npy")).tolist())
+        return seen
+
+    def shard_rows(self, shard: int) -> int:
+        return len(np.load(self.shard_path(shard, ".npy"), mmap_mode="r"))
+
+    def write_shard(self, rows: pd.DataFrame, vectors: np.ndarray, keys: List[int], position: Tuple[int, int]) -> None:
+        shard = len(self.shards)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        _atomic(self.shard_path(shard, ".npy"), lambda f: np.save(f, vectors))
+        _atomic(self.shard_path(shard, ".keys.npy"), lambda f: np.save(f, np.asarray(keys, dtype=np.uint64)))
+        _atomic(self.shard_path(shard, ".csv"), lambda f: rows.to_csv(f, index=False))
+        self.shards.append(shard)
+        self.position = position
+        self.dim = vectors.shape[1]
+        checkpoint = {"config": self.config, "shards": self.shards, "position": list(position), "dim": self.dim}
+        _atomic(self.checkpoint_path, lambda f: f.write(json.dumps(checkpoint, indent=2).encode("utf-8")))
+
+
+def _atomic(path: Path, write) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def input_config(paths: List[Path], model: str, backend: str) -> dict:
+    inputs = []
+    for path in paths:
+        st = path.stat()
+        inputs.append([str(path), st.st_size, st.st_mtime_ns])
+    return {"inputs": inputs, "model": model, "backend": backend}
+
+
+# --- Pipeline ---
+
+def encode_shards(state: BuildState, paths: List[Path], args) -> None:
+    seen = state.seen_keys()
+    done_rows = sum(state.shard_rows(s) for s in state.shards)
+    if state.shards:
+        print(f"[INFO] Resuming after {len(state.shards)} shards ({done_rows:,} rows) at input position {state.position}")
+
+    workers = max(1, args.workers)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    onnx_dir = onnx_model_dir(args.model) if args.backend == "onnx" else None
+    if workers == 1:
+        _init_encoder(args.model, threads, onnx_dir)
+        pool, encode_map = None, map
+    else:
+        pool = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_encoder,
+            initargs=(args.model, threads, onnx_dir),
+        )
+        encode_map = pool.map
+
+    pending_rows: List[pd.DataFrame] = []
+    pending_vectors: List[np.ndarray] = []
+    pending_keys: List[int] = []
+    started = time.perf_counter()
+    encoded = 0
+    try:
+        for file_no, consumed, chunk in read_chunks(paths, args.chunk_rows, state.position):
+            if len(chunk):
+                keys = [row_key(n, d) for n, d in zip(chunk["name"], chunk["description"])]
+                keep = []
+                for key in keys:
+                    keep.append(key not in seen)
+                    seen.add(key)
+                chunk = chunk[keep]
+                keys = [key for key, kept in zip(keys, keep) if kept]
+            if len(chunk):
+                texts = [startup_text(row) for row in chunk.to_dict(orient="records")]
+                batches = [texts[i:i + args.batch_size] for i in range(0, len(texts), args.batch_size)]
+                pending_vectors.append(np.concatenate(list(encode_map(_encode, batches))))
+                pending_rows.append(chunk)
+                pending_keys.extend(keys)
+                encoded += len(chunk)
+
+            # Shards end on chunk boundaries so the checkpoint position is exact
+            if len(pending_keys) >= args.shard_rows:
+                state.write_shard(pd.concat(pending_rows), np.concatenate(pending_vectors), pending_keys, (file_no, consumed))
+                rate = encoded / (time.perf_counter() - started)
+                print(f"[INFO] Shard {state.shards[-1]}: {done_rows + encoded:,} rows ({rate:,.0f} rows/s)")
+                pending_rows, pending_vectors, pending_keys = [], [], []
+
+        if pending_keys:
+            state.write_shard(pd.concat(pending_rows), np.concatenate(pending_vectors), pending_keys, (len(paths), 0))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _training_sample(state: BuildState, counts: List[int], size: int) -> np.ndarray:
+    total = sum(counts)
+    rows = np.sort(np.random.default_rng(0).choice(total, size=min(size, total), replace=False))
+    starts = np.cumsum([0] + counts)
+    parts = []
+    for shard, lo, hi in zip(state.shards, starts[:-1], starts[1:]):
+        local = rows[(rows >= lo) & (rows < hi)] - lo
+        if len(local):
+            parts.append(np.load(state.shard_path(shard, ".npy"), mmap_mode="r")[local])
+    return np.ascontiguousarray(np.concatenate(parts), dtype="float32")
+
+
+def merge_shards(state: BuildState, args) -> int:
+    counts = [state.shard_rows(s) for s in state.shards]
+    total = sum(counts)
+    if not total:
+        raise SystemExit("No rows with a description found in the input CSVs.")
+
+    index = new_index(state.dim, total, args.index_type)
+    size = training_size(index)
+    if size:
+        print(f"[INFO] Training {describe_index(index)} on {min(size, total):,} sampled vectors")
+        index.train(_training_sample(state, counts, size))
+
+    index_tmp = f"{index_path()}.tmp{os.getpid()}"
+    csv_tmp = f"{metadata_path()}.tmp{os.getpid()}"
+    vectors_tmp = f"{vectors_path()}.tmp{os.getpid()}"
+    sums: Dict[str, np.ndarray] = {}
+    counts_by_category: Dict[str, int] = {}
+    trends: Dict[str, List[str]] = {}
+    try:
+        with open(csv_tmp, "w", encoding="utf-8", newline="") as out, open(vectors_tmp, "wb") as raw:
+            for i, shard in enumerate(state.shards):
+                vectors = np.ascontiguousarray(np.load(state.shard_path(shard, ".npy")), dtype="float32")
+                rows = pd.read_csv(state.shard_path(shard, ".csv"), dtype=str, keep_default_na=False)
+                index.add(vectors)
+                raw.write(vectors.tobytes())
+                rows.to_csv(out, index=False, header=i == 0)
+
+                categories, inverse = np.unique(rows["category"].to_numpy(), return_inverse=True)
+                shard_sums = np.zeros((len(categories), vectors.shape[1]), dtype="float64")
+                np.add.at(shard_sums, inverse, vectors)
+                for category, vector_sum, count in zip(categories, shard_sums, np.bincount(inverse)):
+                    sums[category] = sums.get(category, 0) + vector_sum
+                    counts_by_category[category] = counts_by_category.get(category, 0) + int(count)
+                for category, description in zip(rows["category"], rows["description"]):
+                    examples = trends.setdefault(category, [])
+                    if len(examples) < TRENDS_PER_INDUSTRY:
+                        examples.append(description)
+        faiss.write_index(index, index_tmp)
+
+        # Swap the index and metadata together; ids from the old ingestion log no longer apply
+        with writer_lock():
+            os.replace(index_tmp, index_path())
+            os.replace(csv_tmp, metadata_path())
+            os.replace(vectors_tmp, vectors_path())
+            archive_ingestion_log()
+    finally:
+        for tmp in (index_tmp, csv_tmp, vectors_tmp):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    build_metadata_store()
+    build_lexical_index()
+    print(f"Saved {describe_index(index)} over {index.ntotal:,} vectors to {index_path()}")
+
+    names = sorted(sums)
+    centroids = np.stack([sums[n] / counts_by_category[n] for n in names]).astype("float32")
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    save_category_centroids(os.path.join(settings.processed_dir, "category_centroids.npz"), names, centroids)
+
+    trend_rows = [{"industry": k, "trend": t} for k, examples in trends.items() for t in examples]
+    pd.DataFrame(trend_rows, columns=["industry", "trend"]).to_csv(
+        os.path.join(settings.processed_dir, "trend_signals.csv"), index=False
+    )
+    return total
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--inputs", nargs="+", help=f"raw CSVs (default: {', '.join(CANDIDATES)} under datasets/)")
+    parser.add_argument("--processed-dir", default=str(PROCESSED_DIR))
+    parser.add_argument("--work-dir", help="shards + checkpoint (default: <processed-dir>/build)")
+    parser.add_argument("--chunk-rows", type=int, default=50_000, help="CSV rows read at a time")
+    parser.add_argument("--batch-size", type=int, default=256, help="texts per encode call")
+    parser.add_argument("--shard-rows", type=int, default=100_000, help="rows per checkpointed shard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="encoder processes")
+    parser.add_argument("--backend", default=settings.embedding_backend, choices=("torch", "onnx"),
+                        help="encoder (onnx uses the scripts/export_onnx_encoder.py export)")
+    parser.add_argument("--index-type", help="override COMPETITOR_INDEX_TYPE")
+    parser.add_argument("--restart", action="store_true", help="discard an existing checkpoint")
+    parser.add_argument("--keep-work", action="store_true", help="keep shards after merging")
     args = parser.parse_args()
 
-    df_raw = load_raw_datasets()
-    df = normalize(df_raw)
-    build_index(df, model_name=args.model)
-    print(f"Processed {len(df)} rows. Files stored in {PROCESSED_DIR}")
+    settings.processed_dir = args.processed_dir
+    os.makedirs(args.processed_dir, exist_ok=True)
+    work_dir = Path(args.work_dir or os.path.join(args.processed_dir, "build"))
+
+    paths = [Path(p) for p in args.inputs] if args.inputs else [DATASET_DIR / name for name in CANDIDATES]
+    paths = [p for p in paths if p.exists()]
+    if not paths:
+        raise SystemExit("No expected dataset CSVs found in datasets/.")
+
+    if args.restart:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    state = BuildState(work_dir, input_config(paths, args.model, args.backend))
+    if state.load() and state.position[0] >= len(paths):
+        print(f"[INFO] All inputs already encoded into {len(state.shards)} shards; merging")
+    else:
+        encode_shards(state, paths, args)
+    total = merge_shards(state, args)
+
+    if not args.keep_work:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(f"Processed {total:,} rows. Files stored in {args.processed_dir}")
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,9 +1,14 @@
+-- pgvector, for stored profile embeddings
+create extension if not exists vector;
+
 -- Create the users table
 create table public.users (
   id uuid not null primary key default gen_random_uuid(),
   email text not null unique,
   hashed_password text not null,
   profile jsonb default '{}'::jsonb,
+  profile_embedding vector(384),
+  profile_hash text,
   created_at timestamp with time zone default timezone('utc'::text, now()) not null
 );
 
@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect } from "react";
-import { api } from "../services/api";
+import { streamEvents } from "../services/api";
 
 export default function Chatbot() {
     const [isOpen, setIsOpen] = useState(false);
@@ -36,13 +36,29 @@ export default function Chatbot() {
         setInput("");
         setLoading(true);
 
+        let started = false;
         try {
-            const { data } = await api.post("/chat", { message: text });
-            setMessages(prev => [...prev, { role: "assistant", content: data.response }]);
+            // Append tokens to the last assistant message as they stream in
+            await streamEvents("/chat/stream", { message: text }, (event, data) => {
+                if (event !== "token") return;
+                if (!started) {
+                    started = true;
+                    setLoading(false);
+                    setMessages(prev => [...prev, { role: "assistant", content: data.delta }]);
+                    return;
+                }
+                setMessages(prev => {
+                    const last = prev[prev.length - 1];
+                    return [...prev.slice(0, -1), { ...last, content: last.content + data.delta }];
+                });
+            });
+            if (!started) throw new Error("Empty chat stream");
         } catch (err) {
             // Fallback responses if API fails
-            const fallbackResponse = getFallbackResponse(text);
-            setMessages(prev => [...prev, { role: "assistant", content: fallbackResponse }]);
+            if (!started) {
+                const fallbackResponse = getFallbackResponse(text);
+                setMessages(prev => [...prev, { role: "assistant", content: fallbackResponse }]);
+            }
         }
         setLoading(false);
     };
@@ -1,5 +1,5 @@
 import { useState } from "react";
-import { api } from "../services/api";
+import { api, streamEvents } from "../services/api";
 import IdeaCard from "../components/IdeaCard";
 import MarketInsights from "../components/MarketInsights";
 import CompetitorPanel from "../components/CompetitorPanel";
@@ -28,23 +28,36 @@ export default function Dashboard() {
   const [selectedIdea, setSelectedIdea] = useState(null);
   const [insights, setInsights] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
   const [error, setError] = useState(null);
   const [activeTab, setActiveTab] = useState("market");
 
   const generateIdeas = async () => {
     if (!ideaText.trim() || !selectedIndustry) return;
     setLoading(true);
+    setStreaming(true);
     setError(null);
+    setIdeas([]);
+    let received = 0;
     try {
-      const { data } = await api.post("/ideas/generate", {
+      // Ideas arrive one by one; show the first as soon as it is ready
+      await streamEvents("/ideas/generate/stream", {
         idea: `[Industry: ${selectedIndustry.name}] ${ideaText}`
+      }, (event, data) => {
+        if (event !== "idea") return;
+        received += 1;
+        setIdeas((prev) => [...prev, data.idea]);
+        if (received === 1) {
+          setLoading(false);
+          setStep(2);
+        }
       });
-      setIdeas(data.ideas || []);
-      setStep(2);
+      if (received === 0) throw new Error("No ideas received");
     } catch (err) {
       console.error("Generation failed:", err);
       setError("Failed to generate ideas. Please try again.");
     }
+    setStreaming(false);
     setLoading(false);
   };
 
@@ -62,26 +75,10 @@ export default function Dashboard() {
         value_proposition: idea.value_proposition,
       };
 
-      // Make API calls sequentially to avoid issues
-      console.log("[DEBUG] Fetching market insights...");
-      const marketRes = await api.post("/ideas/insights", ideaPayload);
-      console.log("[DEBUG] Market insights:", marketRes.data);
-
-      console.log("[DEBUG] Fetching competitors...");
-      const compRes = await api.post("/ideas/competitors", ideaPayload);
-      console.log("[DEBUG] Competitors:", compRes.data);
-
-      console.log("[DEBUG] Fetching risk assessment...");
-      const riskRes = await api.post("/ideas/assessment", ideaPayload);
-      console.log("[DEBUG] Risks:", riskRes.data);
-
-      console.log("[DEBUG] Fetching validation score...");
-      const validateRes = await api.post("/ideas/validate", {
-        idea: ideaPayload,
-        market: marketRes.data,
-        competitors: compRes.data,
-      });
-      console.log("[DEBUG] Validation:", validateRes.data);
+      // One call returns market, competitors, risks and scores
+      console.log("[DEBUG] Fetching combined analysis...");
+      const analysisRes = await api.post("/ideas/analyze", ideaPayload);
+      console.log("[DEBUG] Analysis:", analysisRes.data);
 
       console.log("[DEBUG] Fetching partner suggestions...");
       let partnersData = [];
@@ -93,10 +90,10 @@ export default function Dashboard() {
       }
 
       setInsights({
-        market: marketRes.data,
-        competitors: compRes.data,
-        risks: riskRes.data,
-        scores: validateRes.data,
+        market: analysisRes.data.market,
+        competitors: analysisRes.data.competitors,
+        risks: analysisRes.data.risks,
+        scores: analysisRes.data.scores,
         partners: partnersData,
         industry: selectedIndustry,
       });
@@ -258,6 +255,12 @@ export default function Dashboard() {
                 selected={selectedIdea === idea}
               />
             ))}
+            {streaming && ideas.length < 3 && (
+              <div className="card flex items-center justify-center">
+                <span className="spinner" style={{ width: 20, height: 20 }}></span>
+                <span className="text-muted">Generating more ideas...</span>
+              </div>
+            )}
           </div>
 
           {loading && (
@@ -17,4 +17,44 @@ api.interceptors.response.use(
   }
 );
 
-export { api };
+// POST to a server-sent-events endpoint and call onEvent(event, data) for each
+// message as it arrives. axios buffers whole responses, so this uses fetch.
+const streamEvents = async (path, body, onEvent) => {
+  const headers = { 'Content-Type': 'application/json' };
+  const auth = api.defaults.headers.common?.Authorization;
+  if (auth) headers.Authorization = auth;
+
+  const response = await fetch(`${api.defaults.baseURL}${path}`, {
+    method: 'POST',
+    headers,
+    body: JSON.stringify(body),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Stream request failed: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+};
+
+export { api, streamEvents };